@@ -0,0 +1,135 @@
+"""
+Spoken acknowledgments that cover the wait for a reply.
+
+After the user stops speaking, nothing is heard until Gemini has answered and
+Bulbul has voiced it. When that wait is expected to be long, the gateway
+plays a short acknowledgment ("Mm-hmm.", "Okay, let me think about that.")
+first, so the silence reads as listening rather than as a dropped call.
+
+The phrases (acknowledgments.txt, `language_code|text` per line) are
+synthesized per language and speaker at startup with the usual Bulbul
+settings and kept in memory with their durations.
+
+StageLatency keeps a moving average of each pipeline stage as it is observed
+(Gemini queue wait and first token, TTS queue wait and synthesis), so the
+expected wait tracks both provider speed and local load. Nothing is played
+below the threshold; above it, choose() picks a phrase short enough to finish
+before the reply is expected, longer ones for longer waits, without repeating
+the session's previous one. The reply audio is queued behind it on the client.
+"""
+import io
+import base64
+import random
+import asyncio
+import logging
+import wave
+from dataclasses import dataclass
+
+log = logging.getLogger("mindwell.acks")
+
+# Fraction of the expected wait an acknowledgment may fill, so the reply
+# seldom has to wait for it to finish playing
+FILL = 0.7
+
+
+def wav_duration_s(audio_base64: str):
+    """Length of a base64 WAV clip, or None if it isn't one."""
+    try:
+        with wave.open(io.BytesIO(base64.b64decode(audio_base64)), "rb") as reader:
+            return reader.getnframes() / reader.getframerate()
+    except (wave.Error, EOFError, ValueError, ZeroDivisionError):
+        return None
+
+
+class StageLatency:
+    """Exponential moving average of stage durations, per language and over all languages."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._averages = {}      # (stage, language or None) -> seconds
+
+    def observe(self, stage: str, language: str, outcome: str, duration_s: float):
+        # Cache hits, errors and cancellations say nothing about the next upstream call
+        if outcome != "ok":
+            return
+        for key in ((stage, language), (stage, None)):
+            average = self._averages.get(key)
+            self._averages[key] = duration_s if average is None else average + self.alpha * (duration_s - average)
+
+    def get(self, stage: str, language: str = None):
+        return self._averages.get((stage, language), self._averages.get((stage, None)))
+
+    def expected_s(self, stages, language: str = None) -> float:
+        """Sum of the averages of `stages`; stages not seen yet count as 0."""
+        return sum(self.get(stage, language) or 0.0 for stage in stages)
+
+
+@dataclass
+class Acknowledgment:
+    text: str
+    audio_base64: str
+    duration_s: float
+
+
+class AcknowledgmentLibrary:
+    def __init__(self, seed: int = None):
+        self._acks = {}          # (language_code, speaker) -> [Acknowledgment], shortest first
+        self._rng = random.Random(seed)
+        self.stats = {"sent": 0, "fast": 0, "no_fit": 0, "missing": 0}
+
+    def __len__(self):
+        return sum(len(acks) for acks in self._acks.values())
+
+    def put(self, language_code: str, speaker: str, text: str, audio_base64: str) -> bool:
+        duration_s = wav_duration_s(audio_base64)
+        if duration_s is None:
+            log.warning(f"[ACK] Skipping {text!r} ({language_code}): audio is not WAV")
+            return False
+        acks = self._acks.setdefault((language_code, speaker), [])
+        acks[:] = [ack for ack in acks if ack.text != text]
+        acks.append(Acknowledgment(text, audio_base64, duration_s))
+        acks.sort(key=lambda ack: ack.duration_s)
+        return True
+
+    def choose(self, language_code: str, speaker: str, expected_s: float, threshold_s: float,
+               previous: str = None):
+        """
+        An acknowledgment for a reply expected in expected_s, or None when the
+        wait is under threshold_s or nothing fits. Picks among the longer
+        phrases that fit, avoiding `previous` (the session's last one).
+        """
+        if expected_s < threshold_s:
+            self.stats["fast"] += 1
+            return None
+        acks = self._acks.get((language_code, speaker))
+        if not acks:
+            self.stats["missing"] += 1
+            return None
+        fitting = [ack for ack in acks if ack.duration_s <= expected_s * FILL]
+        if not fitting:
+            self.stats["no_fit"] += 1
+            return None
+        longest = fitting[-1].duration_s
+        candidates = [ack for ack in fitting if ack.duration_s >= longest / 2 and ack.text != previous]
+        ack = self._rng.choice(candidates or fitting)
+        self.stats["sent"] += 1
+        return ack
+
+    async def build(self, phrases, speakers, synthesize, concurrency: int = 4):
+        """
+        Synthesize every (language, text) phrase for each speaker with
+        synthesize(text, language_code, speaker) -> base64 WAV. Failures are
+        logged and skipped; a language without phrases just gets no acknowledgments.
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def fill(language_code: str, text: str, speaker: str):
+            async with slots:
+                try:
+                    self.put(language_code, speaker, text, await synthesize(text, language_code, speaker))
+                except Exception as e:
+                    log.warning(f"[ACK] Could not synthesize {text!r} ({language_code}, {speaker}): {e}")
+
+        await asyncio.gather(*(fill(language_code, text, speaker)
+                               for language_code, text in phrases for speaker in speakers))
+        log.info(f"[ACK] {len(self)} acknowledgments ready")
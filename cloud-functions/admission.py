@@ -0,0 +1,270 @@
+"""
+Admission control and upstream call scheduling for the gateway.
+
+Every Gemini, Sarvam TTS and Sarvam REST STT call takes a slot from its
+provider's UpstreamLimiter first:
+
+* concurrency — at most `concurrency` calls in flight per provider
+* rate        — a token bucket caps calls started per second (0 = unlimited)
+* priority    — waiters are served crisis first, then interactive turns, then
+                background work (memory summaries, warm-ups, batch screening).
+                The level is a contextvar, so it follows a turn into the tasks
+                it spawns:
+
+                    with upstream_priority(CRISIS):
+                        await crisis_response(...)
+
+* shedding    — once `max_waiting` calls are queued, further non-crisis calls
+                fail fast with Overloaded instead of growing the queue. Crisis
+                calls always queue.
+
+AdmissionController sits in front of the sessions themselves: a new
+WebSocket session or REST request is refused while the session cap is reached
+or any upstream queue is more than `shed_pressure` full, so a saturated
+gateway turns new users away with a retry hint (WebSocket close 1013, HTTP
+503 + Retry-After) and keeps serving the sessions it already has. REST
+callers are also capped at `max_client_inflight` concurrent requests each
+(429); a WebSocket session already runs one turn at a time (TurnQueue).
+
+Everything here runs on the event loop, so no locks are needed; limits are
+per worker process.
+"""
+import time
+import heapq
+import asyncio
+import itertools
+import contextvars
+import logging
+from contextlib import asynccontextmanager, contextmanager
+
+log = logging.getLogger("mindwell.admission")
+
+CRISIS, INTERACTIVE, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = {CRISIS: "crisis", INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+_priority = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def upstream_priority(level: int):
+    """Upstream calls made inside the block (and tasks it creates) queue at `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class Overloaded(Exception):
+    """The gateway is refusing work; retry after `retry_after_s`."""
+
+    def __init__(self, reason: str, retry_after_s: float, status: int = 503):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+        self.status_code = status
+
+
+class TokenBucket:
+    """`rate` acquisitions per second on average, up to `burst` at once. rate <= 0 means unlimited."""
+
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def wait_s(self) -> float:
+        """Seconds until the next token, 0 if one is available now."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while not self.try_take():
+                await asyncio.sleep(self.wait_s())
+
+
+class UpstreamLimiter:
+    def __init__(self, name: str, concurrency: int, rate_per_s: float = 0.0, max_waiting: int = 0,
+                 retry_after_s: float = 2.0):
+        """max_waiting <= 0 leaves the queue unbounded (nothing is shed)."""
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.bucket = TokenBucket(rate_per_s)
+        self.max_waiting = max_waiting
+        self.retry_after_s = retry_after_s
+        self.inflight = 0
+        self.waiting = 0
+        self._waiters = []           # heap of [priority, seq, future]
+        self._seq = itertools.count()
+        self._timer = None
+        self.stats = {"granted": 0, "queued": 0, "shed": 0, "cancelled": 0}
+
+    @property
+    def pressure(self) -> float:
+        """Queue fill, 0..1 (and 1 past the shedding point); 0 for an unbounded queue."""
+        if self.max_waiting <= 0:
+            return 0.0
+        return min(1.0, self.waiting / self.max_waiting)
+
+    def waiting_by_priority(self) -> dict:
+        counts = dict.fromkeys(PRIORITY_NAMES.values(), 0)
+        for priority, _, future in self._waiters:
+            if not future.done():
+                counts[PRIORITY_NAMES[priority]] += 1
+        return counts
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self):
+        priority = _priority.get()
+        if not self.waiting and self.inflight < self.concurrency and self.bucket.try_take():
+            self.inflight += 1
+            self.stats["granted"] += 1
+            return
+
+        if priority != CRISIS and 0 < self.max_waiting <= self.waiting:
+            self.stats["shed"] += 1
+            log.warning(f"[ADMISSION] Shed {PRIORITY_NAMES[priority]} {self.name} call "
+                        f"({self.inflight} in flight, {self.waiting} queued)")
+            raise Overloaded(f"{self.name} is saturated", self.retry_after_s)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, [priority, next(self._seq), future])
+        self.waiting += 1
+        self.stats["queued"] += 1
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                # Still queued: _dispatch skips the dead entry
+                self.waiting -= 1
+                self.stats["cancelled"] += 1
+            else:
+                # Granted in the same tick we were cancelled: hand the slot on
+                self.release()
+            raise
+
+    def release(self):
+        self.inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._waiters and self.inflight < self.concurrency:
+            future = self._waiters[0][2]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self.bucket.try_take():
+                self._wake_in(self.bucket.wait_s())
+                return
+            heapq.heappop(self._waiters)
+            self.waiting -= 1
+            self.inflight += 1
+            self.stats["granted"] += 1
+            future.set_result(None)
+
+    def _wake_in(self, delay_s: float):
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(delay_s, self._on_timer)
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+
+class AdmissionController:
+    def __init__(self, limiters, max_sessions: int = 0, shed_pressure: float = 0.5,
+                 max_client_inflight: int = 0, retry_after_s: float = 5.0):
+        """max_sessions / max_client_inflight <= 0 disable that cap."""
+        self.limiters = list(limiters)
+        self.max_sessions = max_sessions
+        self.shed_pressure = shed_pressure
+        self.max_client_inflight = max_client_inflight
+        self.retry_after_s = retry_after_s
+        self.sessions = 0
+        self._client_inflight = {}
+        self.rejected = {"sessions": 0, "saturated": 0, "client_inflight": 0}
+
+    @property
+    def pressure(self) -> float:
+        return max((limiter.pressure for limiter in self.limiters), default=0.0)
+
+    def check(self):
+        """Raise Overloaded if new work should be turned away right now."""
+        pressure = self.pressure
+        if pressure >= self.shed_pressure:
+            self.rejected["saturated"] += 1
+            raise Overloaded(f"upstream queues {pressure:.0%} full", self.retry_after_s)
+
+    def admit_session(self):
+        """Admit one WebSocket session; returns the function that ends it."""
+        if 0 < self.max_sessions <= self.sessions:
+            self.rejected["sessions"] += 1
+            raise Overloaded(f"{self.sessions} sessions open", self.retry_after_s)
+        self.check()
+        self.sessions += 1
+        return _once(self._end_session)
+
+    def _end_session(self):
+        self.sessions -= 1
+
+    def admit_request(self, client: str):
+        """
+        Admit one REST request from `client`; returns an idempotent release
+        function, so a streamed response can release from more than one place.
+        """
+        self.check()
+        inflight = self._client_inflight.get(client, 0)
+        if 0 < self.max_client_inflight <= inflight:
+            self.rejected["client_inflight"] += 1
+            raise Overloaded(f"{inflight} requests already in flight for this client", 1.0, status=429)
+        self._client_inflight[client] = inflight + 1
+        return _once(lambda: self._end_request(client))
+
+    def _end_request(self, client: str):
+        remaining = self._client_inflight[client] - 1
+        if remaining:
+            self._client_inflight[client] = remaining
+        else:
+            del self._client_inflight[client]
+
+
+def _once(fn):
+    """fn, made safe to call more than once."""
+    called = False
+
+    def wrapper():
+        nonlocal called
+        if not called:
+            called = True
+            fn()
+
+    return wrapper
@@ -0,0 +1,186 @@
+"""
+Compressed reply audio: Bulbul WAV → Opus (in WebM) or MP3.
+
+Bulbul returns uncompressed WAV, and base64 inflates it by another third, so a
+spoken reply costs hundreds of KB — painful on mobile data. Clients that can
+play compressed audio ask for it (?audio=opus|mp3&bitrate=<kbps> on
+/ws/conversation, or the audio_format form field on REST) and replies are
+re-encoded with ffmpeg at the negotiated bitrate.
+
+Encoding runs in an ffmpeg child process, driven from a small thread pool, so
+neither the event loop nor the GIL pays for it. Recently encoded clips are
+kept in a small LRU: the TTS cache hands back the same WAV for common phrases
+and the crisis message, and those needn't be re-encoded every time.
+
+The same workers decode compressed REST uploads (WebM/Opus, MP3, ...) into
+16 kHz mono PCM WAV, so they get the WAV duration limit and segmenting.
+
+Without an ffmpeg binary (FFMPEG_BIN) the gateway keeps sending WAV, and
+non-WAV uploads go to Saaras undecoded, in one request.
+"""
+import shutil
+import struct
+import asyncio
+import hashlib
+import logging
+import tempfile
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+log = logging.getLogger("mindwell.audio")
+
+WAV_MIME = "audio/wav"
+
+# codec -> (MIME type the browser's MediaSource needs, ffmpeg output args)
+CODECS = {
+    "opus": ('audio/webm; codecs="opus"', ["-c:a", "libopus", "-application", "voip", "-f", "webm"]),
+    "mp3": ("audio/mpeg", ["-c:a", "libmp3lame", "-f", "mp3"]),
+}
+
+MIN_BITRATE_KBPS = 12
+MAX_BITRATE_KBPS = 128
+ENCODE_TIMEOUT_S = 30
+DECODE_TIMEOUT_S = 30
+DECODE_RATE = 16000        # Saaras' native rate; 16-bit mono
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    codec: str = "wav"           # wav | opus | mp3
+    bitrate_kbps: int = 32
+
+    @classmethod
+    def negotiate(cls, codec: str = None, bitrate_kbps=None, default_bitrate_kbps: int = 32) -> "AudioFormat":
+        """Client's requested codec/bitrate; unknown codecs get WAV, bitrates are clamped."""
+        codec = (codec or "wav").lower()
+        if codec not in CODECS:
+            return cls()
+        try:
+            bitrate = int(bitrate_kbps) if bitrate_kbps else default_bitrate_kbps
+        except (TypeError, ValueError):
+            bitrate = default_bitrate_kbps
+        return cls(codec, max(MIN_BITRATE_KBPS, min(MAX_BITRATE_KBPS, bitrate)))
+
+    @property
+    def compressed(self) -> bool:
+        return self.codec != "wav"
+
+    @property
+    def mime(self) -> str:
+        return CODECS[self.codec][0] if self.compressed else WAV_MIME
+
+
+def ffmpeg_command(ffmpeg: str, fmt: AudioFormat) -> list:
+    return [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+            "-vn", "-ac", "1", "-b:a", f"{fmt.bitrate_kbps}k", *CODECS[fmt.codec][1], "pipe:1"]
+
+
+def encode_wav(wav: bytes, fmt: AudioFormat, ffmpeg: str = "ffmpeg") -> bytes:
+    """Blocking: one ffmpeg run, WAV on stdin, encoded audio on stdout."""
+    done = subprocess.run(ffmpeg_command(ffmpeg, fmt), input=wav, capture_output=True,
+                          timeout=ENCODE_TIMEOUT_S)
+    if done.returncode != 0:
+        raise RuntimeError(f"ffmpeg exited {done.returncode}: {done.stderr.decode(errors='replace').strip()}")
+    return done.stdout
+
+
+def pcm_wav_header(data_bytes: int, rate: int = DECODE_RATE) -> bytes:
+    """44-byte header of a 16-bit mono PCM WAV holding data_bytes of samples."""
+    return struct.pack("<4sI4s4sIHHIIHH4sI", b"RIFF", 36 + data_bytes, b"WAVE", b"fmt ", 16, 1, 1,
+                       rate, rate * 2, 2, 16, b"data", data_bytes)
+
+
+def decode_to_wav(file, max_s: float, ffmpeg: str = "ffmpeg"):
+    """
+    Blocking: one ffmpeg run from the upload's file to a 16 kHz mono PCM WAV
+    temp file, which the caller closes. At most max_s + 1 seconds are decoded,
+    enough to tell an over-long recording without decoding all of it.
+    """
+    out = tempfile.TemporaryFile()
+    try:
+        out.write(pcm_wav_header(0))
+        out.flush()
+        file.seek(0)
+        done = subprocess.run(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-i", "pipe:0", "-vn", "-ac", "1",
+             "-ar", str(DECODE_RATE), "-t", f"{max_s + 1:g}", "-f", "s16le", "pipe:1"],
+            stdin=file, stdout=out, stderr=subprocess.PIPE, timeout=DECODE_TIMEOUT_S)
+        if done.returncode != 0:
+            raise RuntimeError(f"ffmpeg exited {done.returncode}: {done.stderr.decode(errors='replace').strip()}")
+        data_bytes = out.seek(0, 2) - 44
+        if data_bytes <= 0:
+            raise RuntimeError("no audio stream")
+        out.seek(0)
+        out.write(pcm_wav_header(data_bytes))
+        out.seek(0)
+        return out
+    except BaseException:
+        out.close()
+        raise
+    finally:
+        file.seek(0)
+
+
+class AudioEncoder:
+    def __init__(self, ffmpeg: str = "ffmpeg", workers: int = 4, cache_entries: int = 256):
+        self.ffmpeg = shutil.which(ffmpeg)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audio-encode")
+        self._lru = OrderedDict()     # (wav digest, format) -> encoded bytes
+        self.cache_entries = cache_entries
+        self.stats = {"encoded": 0, "cache_hits": 0, "failed": 0, "unavailable": 0,
+                      "decoded": 0, "decode_failed": 0}
+        if self.ffmpeg is None:
+            log.warning(f"[AUDIO] {ffmpeg} not found; replies stay WAV, non-WAV uploads are not decoded")
+
+    @property
+    def available(self) -> bool:
+        return self.ffmpeg is not None
+
+    async def encode(self, wav: bytes, fmt: AudioFormat):
+        """(audio bytes, mime). Falls back to the WAV itself if encoding isn't possible."""
+        if not fmt.compressed:
+            return wav, WAV_MIME
+        if not self.available:
+            self.stats["unavailable"] += 1
+            return wav, WAV_MIME
+
+        key = (hashlib.sha1(wav).digest(), fmt)
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached, fmt.mime
+
+        try:
+            encoded = await asyncio.get_running_loop().run_in_executor(
+                self._pool, encode_wav, wav, fmt, self.ffmpeg)
+        except Exception as e:
+            self.stats["failed"] += 1
+            log.warning(f"[AUDIO] {fmt.codec} encode failed, sending WAV: {e}")
+            return wav, WAV_MIME
+
+        self.stats["encoded"] += 1
+        self._lru[key] = encoded
+        while len(self._lru) > self.cache_entries:
+            self._lru.popitem(last=False)
+        return encoded, fmt.mime
+
+    async def decode(self, file, max_s: float):
+        """The upload decoded to a 16 kHz mono PCM WAV temp file, or None if it can't be."""
+        if not self.available:
+            self.stats["decode_failed"] += 1
+            return None
+        try:
+            decoded = await asyncio.get_running_loop().run_in_executor(
+                self._pool, decode_to_wav, file, max_s, self.ffmpeg)
+        except Exception as e:
+            self.stats["decode_failed"] += 1
+            log.warning(f"[AUDIO] Upload decode failed: {e}")
+            return None
+        self.stats["decoded"] += 1
+        return decoded
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,151 @@
+"""
+Ingest stage between /ws/conversation clients and the Saaras streaming socket.
+
+The browser sends a PCM frame roughly every 85 ms (4096 samples at 48 kHz,
+downsampled to 16 kHz), and most of a conversation is the user listening or
+thinking. Forwarding each frame as it arrives means a dozen small upstream
+messages a second per session, most of them silence. PCMIngest sits in
+between:
+
+* coalescing — frames are copied into one preallocated int16 buffer (a
+  zero-copy np.frombuffer view, then a single copy) and sent upstream as
+  packets of packet_ms.
+* silence gate — each packet's RMS level (dBFS) and zero-crossing rate are
+  computed in a couple of vectorized passes. A packet is speech if it is
+  louder than silence_dbfs, or within 10 dB of it with a high zero-crossing
+  rate (quiet fricatives such as "s" or "f"). Silence after speech is still
+  forwarded for hangover_ms so the Saaras VAD sees the pause that ends an
+  utterance; after that it is held back. The last preroll_ms of held-back
+  silence is sent ahead of the next speech packet, so the VAD hears the onset
+  in context, and older silence is dropped. During a long silence one packet
+  goes out every keepalive_ms so the upstream socket is never idle.
+
+INGEST_STATS counts frames and bytes in against packets and bytes out across
+all sessions; the difference is what the gateway no longer sends.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+INGEST_STATS = {"frames_in": 0, "bytes_in": 0, "packets_out": 0, "bytes_out": 0, "silence_dropped_bytes": 0}
+
+# Quieter than silence_dbfs by at most this much still counts as speech when
+# the zero-crossing rate is high (unvoiced consonants)
+FRICATIVE_MARGIN_DB = 10.0
+
+
+class PCMIngest:
+    """One session's upstream audio: 16-bit little-endian mono PCM in, packets out."""
+
+    def __init__(self, sample_rate: int = 16000, packet_ms: int = 100, gate: bool = True,
+                 silence_dbfs: float = -50.0, zcr_threshold: float = 0.25, preroll_ms: int = 300,
+                 hangover_ms: int = 1000, keepalive_ms: int = 5000):
+        """packet_ms <= 0 forwards each frame as it arrives (still gated); keepalive_ms <= 0 disables keepalives."""
+        self.sample_rate = sample_rate
+        self.packet_samples = sample_rate * packet_ms // 1000 if packet_ms > 0 else 0
+        self.gate = gate
+        self.silence_dbfs = silence_dbfs
+        self.zcr_threshold = zcr_threshold
+        self.preroll_samples = sample_rate * preroll_ms // 1000
+        self.hangover_samples = sample_rate * hangover_ms // 1000
+        self.keepalive_samples = sample_rate * keepalive_ms // 1000 if keepalive_ms > 0 else 0
+
+        self._buffer = np.empty(self.packet_samples, dtype=np.int16)
+        self._filled = 0
+        self._work = np.empty(self.packet_samples, dtype=np.float32)
+        self._preroll = deque()          # held-back silent packets (bytes), oldest first
+        self._preroll_bytes = 0
+        self._quiet_samples = self.hangover_samples + 1   # start gated: nothing heard yet
+        self._since_sent = 0
+        self._odd_byte = b""
+
+    @property
+    def pending(self) -> bool:
+        """Audio is buffered that a flush() would send."""
+        return self._filled > 0
+
+    @property
+    def flush_after_s(self) -> float:
+        """How long a partial packet may wait for more frames before it is flushed."""
+        return max(self.packet_samples, 1) / self.sample_rate
+
+    def feed(self, pcm: bytes) -> list:
+        """Add one client frame; returns the packets (bytes) to send upstream now."""
+        INGEST_STATS["frames_in"] += 1
+        INGEST_STATS["bytes_in"] += len(pcm)
+        if self._odd_byte:
+            pcm, self._odd_byte = self._odd_byte + pcm, b""
+        if len(pcm) % 2:
+            pcm, self._odd_byte = pcm[:-1], pcm[-1:]
+        samples = np.frombuffer(pcm, dtype="<i2")
+        if not self.packet_samples:
+            return self._gated(samples) if len(samples) else []
+
+        packets = []
+        offset = 0
+        while offset < len(samples):
+            take = min(self.packet_samples - self._filled, len(samples) - offset)
+            self._buffer[self._filled:self._filled + take] = samples[offset:offset + take]
+            self._filled += take
+            offset += take
+            if self._filled == self.packet_samples:
+                packets.extend(self._gated(self._buffer))
+                self._filled = 0
+        return packets
+
+    def flush(self) -> list:
+        """Send whatever partial packet is buffered (the client paused mid-packet)."""
+        if not self._filled:
+            return []
+        packet, self._filled = self._buffer[:self._filled], 0
+        return self._gated(packet)
+
+    def is_speech(self, packet: np.ndarray) -> bool:
+        work = self._work[:len(packet)] if len(packet) <= len(self._work) else np.empty(len(packet), np.float32)
+        np.multiply(packet, 1 / 32768, out=work, casting="unsafe")
+        np.square(work, out=work)
+        power = float(work.mean())
+        dbfs = 10 * math.log10(power) if power > 0 else -math.inf
+        if dbfs >= self.silence_dbfs:
+            return True
+        if dbfs < self.silence_dbfs - FRICATIVE_MARGIN_DB:
+            return False
+        signs = np.signbit(packet)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / max(len(packet) - 1, 1)
+        return zcr >= self.zcr_threshold
+
+    def _gated(self, packet: np.ndarray) -> list:
+        data = packet.tobytes()
+        if not self.gate:
+            return self._sent([data])
+        n = len(packet)
+        if self.is_speech(packet):
+            self._quiet_samples = 0
+            return self._sent(self._take_preroll() + [data])
+
+        self._quiet_samples += n
+        if self._quiet_samples <= self.hangover_samples:
+            return self._sent([data])
+        if self.keepalive_samples and self._since_sent + n >= self.keepalive_samples:
+            return self._sent(self._take_preroll() + [data])
+
+        # Held back: keep the newest preroll_samples of silence, drop the rest
+        self._preroll.append(data)
+        self._preroll_bytes += len(data)
+        self._since_sent += n
+        while self._preroll and self._preroll_bytes - len(self._preroll[0]) >= self.preroll_samples * 2:
+            dropped = self._preroll.popleft()
+            self._preroll_bytes -= len(dropped)
+            INGEST_STATS["silence_dropped_bytes"] += len(dropped)
+        return []
+
+    def _take_preroll(self) -> list:
+        preroll, self._preroll, self._preroll_bytes = list(self._preroll), deque(), 0
+        return preroll
+
+    def _sent(self, packets: list) -> list:
+        self._since_sent = 0
+        INGEST_STATS["packets_out"] += len(packets)
+        INGEST_STATS["bytes_out"] += sum(len(p) for p in packets)
+        return packets
@@ -0,0 +1,271 @@
+"""
+Batch screening: score stored transcripts through the Gemini reply path, text only.
+
+Clinical QA re-scores stored transcripts whenever the system prompt changes.
+Each input line is one JSON object; only transcript is required, and id
+defaults to the line number:
+
+    {"id": "s-001", "transcript": "...", "language_code": "en-IN", "chat_history": []}
+
+Results are produced in completion order, one JSON object per item:
+
+    {"id": "s-001", "line": 1, "status": "ok", "spoken_response": "...",
+     "telemetry": {...}, "attempts": 1, "latency_ms": 812}
+
+status is ok, error (a non-retryable failure, or retries ran out) or invalid
+(the line couldn't be parsed and was never sent upstream). No STT or TTS runs,
+so a batch costs Gemini quota only.
+
+BatchRunner bounds the work three ways: at most `concurrency` items in flight,
+a token bucket capping the request rate (retries included), and exponential
+backoff with jitter on transient failures (429/5xx, timeouts, malformed model
+JSON). Input is read only as fast as it's scored, so memory stays flat however
+long the file is.
+
+The runner backs POST /api/v1/batch-screen (JSONL body in, JSONL streamed back)
+and this CLI. The CLI checkpoints: each result is appended to the output file
+as it completes, and a rerun with the same output skips every item already
+there, so a crashed run resumes where it stopped.
+
+Usage:
+    python batch.py transcripts.jsonl -o scores.jsonl
+    python batch.py transcripts.jsonl -o scores.jsonl --concurrency 32 --rate 20
+    python batch.py transcripts.jsonl -o scores.jsonl --retry-failed     # resume, redoing errors
+    PROVIDERS=fake python batch.py transcripts.jsonl -o /tmp/scores.jsonl  # no quota used
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+
+from admission import TokenBucket
+
+log = logging.getLogger("mindwell.batch")
+
+DEFAULT_LANGUAGE = "en-IN"
+RETRYABLE_STATUS = {408, 429}
+FSYNC_EVERY = 100
+
+
+def is_retryable(e: Exception) -> bool:
+    """Transient upstream failures are retried; other 4xx (bad request, auth) would only fail again."""
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    if isinstance(code, int) and 400 <= code < 500:
+        return code in RETRYABLE_STATUS
+    if isinstance(e, json.JSONDecodeError):
+        return True        # the model occasionally returns broken JSON
+    return not isinstance(e, (ValueError, TypeError, KeyError))
+
+
+def parse_item(line: str, number: int) -> dict:
+    """One input line -> {id, transcript, language_code, chat_history}. Raises ValueError."""
+    item = json.loads(line)
+    if not isinstance(item, dict):
+        raise ValueError("item must be a JSON object")
+    transcript = item.get("transcript")
+    if not isinstance(transcript, str) or not transcript.strip():
+        raise ValueError("transcript is required")
+    history = item.get("chat_history") or []
+    if not isinstance(history, list) or not all(isinstance(m, dict) for m in history):
+        raise ValueError("chat_history must be a list of {sender, text} objects")
+    return {
+        "id": str(item.get("id", number)),
+        "transcript": transcript.strip(),
+        "language_code": item.get("language_code") or DEFAULT_LANGUAGE,
+        "chat_history": history,
+    }
+
+
+async def file_lines(f):
+    """(line number, text) from an open text file: the CLI's input, or a spooled request body."""
+    for number, line in enumerate(f, 1):
+        yield number, line
+
+
+class BatchRunner:
+    def __init__(self, score, concurrency: int = 8, rate_per_s: float = 0.0, retries: int = 4,
+                 backoff_s: float = 1.0, max_backoff_s: float = 30.0, bucket: TokenBucket = None):
+        """
+        await score(item) -> dict of result fields, raising on failure.
+        Pass a shared `bucket` to rate-limit several runners together.
+        """
+        self.score = score
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.bucket = bucket or TokenBucket(rate_per_s)
+        self.stats = {"ok": 0, "error": 0, "invalid": 0, "skipped": 0, "retries": 0}
+
+    async def run(self, lines, skip_ids=frozenset()):
+        """
+        Score every (line number, text) from the async iterable `lines`,
+        yielding results in completion order. Items whose id is in skip_ids
+        (already scored in an earlier run) are passed over.
+        """
+        pending = asyncio.Queue(maxsize=self.concurrency * 2)
+        results = asyncio.Queue()
+
+        async def feed():
+            async for number, line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    item, problem = parse_item(line, number), None
+                except ValueError as e:
+                    item, problem = {"id": str(number)}, str(e)
+                if item["id"] in skip_ids:
+                    self.stats["skipped"] += 1
+                    continue
+                await pending.put((number, item, problem))
+            for _ in range(self.concurrency):
+                await pending.put(None)
+
+        async def work():
+            while (job := await pending.get()) is not None:
+                await results.put(await self._process(*job))
+
+        async def supervise():
+            try:
+                await asyncio.gather(feeder, *workers)
+            except Exception as e:
+                await results.put(e)
+            else:
+                await results.put(None)
+
+        feeder = asyncio.create_task(feed())
+        workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+        supervisor = asyncio.create_task(supervise())
+        tasks = [feeder, *workers, supervisor]
+        try:
+            while (result := await results.get()) is not None:
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _process(self, number: int, item: dict, problem: str = None) -> dict:
+        head = {"id": item["id"], "line": number}
+        if problem:
+            self.stats["invalid"] += 1
+            return {**head, "status": "invalid", "error": problem, "attempts": 0}
+
+        start = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.bucket.acquire()
+            try:
+                fields = await self.score(item)
+            except Exception as e:
+                if attempt > self.retries or not is_retryable(e):
+                    self.stats["error"] += 1
+                    log.warning(f"[BATCH] {item['id']} failed after {attempt} attempt(s): {e}")
+                    return {**head, "status": "error", "error": str(e) or type(e).__name__,
+                            "attempts": attempt}
+                self.stats["retries"] += 1
+                delay = min(self.max_backoff_s, self.backoff_s * 2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(delay / 2, delay))
+                continue
+            self.stats["ok"] += 1
+            return {**head, "status": "ok", **fields, "attempts": attempt,
+                    "latency_ms": round((time.perf_counter() - start) * 1000)}
+
+
+# ═══════════════════════════════════════════
+# ═══ CHECKPOINTED CLI ═══
+# ═══════════════════════════════════════════
+
+def load_checkpoint(path: str, retry_failed: bool = False) -> set:
+    """
+    Ids already recorded in an output file. A torn last line (the process died
+    mid-write) is truncated away so appending resumes on a clean line.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        offset = 0
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                f.truncate(offset)
+                log.warning(f"[BATCH] Dropped a partial line at the end of {path}")
+                break
+            offset += len(raw)
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if record.get("status") == "ok" or not retry_failed:
+                done.add(str(record.get("id")))
+    return done
+
+
+def count_items(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+
+async def run_cli(args):
+    # The gateway module owns the clients, prompt cache and reply pipeline
+    import main
+
+    if not args.verbose:
+        logging.getLogger("mindwell").setLevel(logging.WARNING)
+
+    done = load_checkpoint(args.output, args.retry_failed)
+    total = count_items(args.input)
+    runner = BatchRunner(main.score_transcript, concurrency=args.concurrency, rate_per_s=args.rate,
+                         retries=args.retries)
+    if done:
+        print(f"resuming: {len(done)} items already in {args.output}", file=sys.stderr)
+
+    start = time.perf_counter()
+    last_report = start
+    written = 0
+    with open(args.input, encoding="utf-8") as src, open(args.output, "a", encoding="utf-8") as out:
+        async for result in runner.run(file_lines(src), skip_ids=done):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            written += 1
+            if written % FSYNC_EVERY == 0:
+                os.fsync(out.fileno())
+
+            now = time.perf_counter()
+            if now - last_report >= args.progress_s:
+                last_report = now
+                finished = len(done) + written
+                print(f"{finished}/{total} items  {written / (now - start):.1f}/s  "
+                      f"errors {runner.stats['error']}  retries {runner.stats['retries']}", file=sys.stderr)
+        os.fsync(out.fileno())
+
+    elapsed = time.perf_counter() - start
+    stats = runner.stats
+    print(f"done in {elapsed:.1f}s: {stats['ok']} ok, {stats['error']} error, {stats['invalid']} invalid, "
+          f"{stats['skipped']} skipped, {stats['retries']} retries", file=sys.stderr)
+    return 1 if stats["error"] or stats["invalid"] else 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input", help="JSONL file, one transcript item per line")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results; also the resume checkpoint")
+    parser.add_argument("--concurrency", type=int, default=16,
+                        help="items in flight (Gemini calls are also capped by GEMINI_MAX_CONCURRENCY)")
+    parser.add_argument("--rate", type=float, default=0, help="max Gemini requests per second (0 = unlimited)")
+    parser.add_argument("--retries", type=int, default=4, help="retries per item on transient failures")
+    parser.add_argument("--retry-failed", action="store_true", help="on resume, redo items that errored")
+    parser.add_argument("--progress-s", type=float, default=5.0, help="seconds between progress lines")
+    parser.add_argument("--verbose", action="store_true", help="keep the gateway's INFO logs")
+    sys.exit(asyncio.run(run_cli(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,139 @@
+"""
+Reply audio benchmark: bytes per turn and encode cost, WAV vs Opus vs MP3.
+
+Encodes one reply-length clip per format/bitrate through the same
+AudioEncoder the gateway uses and reports:
+
+  bytes        encoded audio (what the binary protocol sends)
+  json         the same as base64 inside JSON (the default text protocol)
+  encode       wall time per clip, median over --iterations
+  cpu          ffmpeg CPU seconds per clip (child rusage), and as a share of
+               the clip's duration
+  clips/s      throughput with --concurrency encodes in flight
+
+The clip is synthetic voiced speech (harmonics over a wandering pitch, with
+pauses) unless --wav points at a real Bulbul reply; silence would flatter
+every codec.
+
+Usage:
+    python bench_audio.py
+    python bench_audio.py --wav reply.wav --iterations 20 --concurrency 8
+    FFMPEG_BIN=/opt/ffmpeg/bin/ffmpeg python bench_audio.py
+"""
+import io
+import os
+import sys
+import math
+import time
+import wave
+import array
+import random
+import asyncio
+import argparse
+import resource
+
+from audio_codec import AudioEncoder, AudioFormat
+
+FORMATS = [("wav", None), ("opus", 16), ("opus", 24), ("opus", 32), ("mp3", 32), ("mp3", 48)]
+
+
+def speech_like_wav(seconds: float = 12.0, sample_rate: int = 22050, seed: int = 0) -> bytes:
+    """Mono 16-bit WAV: syllable-length voiced bursts with pitch drift, separated by short pauses."""
+    rng = random.Random(seed)
+    samples = array.array("h")
+    total = int(seconds * sample_rate)
+    phase = 0.0
+    while len(samples) < total:
+        # one syllable, then sometimes a pause
+        length = int(rng.uniform(0.12, 0.3) * sample_rate)
+        f0 = rng.uniform(140, 230)
+        formant = rng.uniform(500, 2500)
+        for n in range(length):
+            t = n / length
+            pitch = f0 * (1 + 0.08 * math.sin(2 * math.pi * t))
+            phase += 2 * math.pi * pitch / sample_rate
+            envelope = math.sin(math.pi * t) ** 0.5
+            value = sum(math.sin(k * phase) / k * (1.5 if abs(k * pitch - formant) < 300 else 1.0)
+                        for k in range(1, 9))
+            value += rng.uniform(-0.05, 0.05)
+            samples.append(int(max(-1.0, min(1.0, 0.25 * envelope * value)) * 32767))
+        if rng.random() < 0.3:
+            samples.extend([0] * int(rng.uniform(0.05, 0.25) * sample_rate))
+    del samples[total:]
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(samples.tobytes())
+    return buf.getvalue()
+
+
+def clip_seconds(wav: bytes) -> float:
+    with wave.open(io.BytesIO(wav)) as clip:
+        return clip.getnframes() / clip.getframerate()
+
+
+def child_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+async def measure(encoder: AudioEncoder, wav: bytes, fmt: AudioFormat, iterations: int, concurrency: int):
+    encoder.cache_entries = 0       # every run must really encode
+    walls = []
+    cpu_before = child_cpu_seconds()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        encoded, _ = await encoder.encode(wav, fmt)
+        walls.append(time.perf_counter() - start)
+    cpu = (child_cpu_seconds() - cpu_before) / iterations
+
+    start = time.perf_counter()
+    await asyncio.gather(*(encoder.encode(wav, fmt) for _ in range(concurrency * 2)))
+    throughput = concurrency * 2 / (time.perf_counter() - start)
+    return len(encoded), sorted(walls)[len(walls) // 2], cpu, throughput
+
+
+async def run(args):
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            wav = f.read()
+    else:
+        wav = speech_like_wav(args.seconds, args.sample_rate)
+    duration = clip_seconds(wav)
+
+    encoder = AudioEncoder(ffmpeg=args.ffmpeg, workers=args.concurrency)
+    if not encoder.available:
+        sys.exit(f"ffmpeg not found ({args.ffmpeg}); set FFMPEG_BIN or pass --ffmpeg")
+
+    print(f"clip: {duration:.1f}s, {len(wav) / 1024:.0f} KB WAV; "
+          f"{args.iterations} iterations, concurrency {args.concurrency}")
+    print(f"{'format':<10}{'bytes':>10}{'json':>10}{'vs wav':>9}{'encode':>10}{'cpu':>10}{'cpu/rt':>9}{'clips/s':>9}")
+    for codec, bitrate in FORMATS:
+        fmt = AudioFormat.negotiate(codec, bitrate)
+        name = codec if not fmt.compressed else f"{codec}/{fmt.bitrate_kbps}k"
+        if not fmt.compressed:
+            size, wall, cpu, throughput = len(wav), 0.0, 0.0, float("nan")
+        else:
+            size, wall, cpu, throughput = await measure(encoder, wav, fmt, args.iterations, args.concurrency)
+        json_size = 4 * math.ceil(size / 3)
+        print(f"{name:<10}{size / 1024:>8.1f}KB{json_size / 1024:>8.1f}KB{size / len(wav):>8.1%}"
+              f"{wall * 1000:>8.0f}ms{cpu * 1000:>8.0f}ms{cpu / duration:>8.1%}{throughput:>9.1f}")
+    encoder.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--wav", help="encode this WAV instead of the synthetic clip")
+    parser.add_argument("--seconds", type=float, default=12.0, help="synthetic clip length (~40 spoken words)")
+    parser.add_argument("--sample-rate", type=int, default=22050)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--ffmpeg", default=os.getenv("FFMPEG_BIN", "ffmpeg"))
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
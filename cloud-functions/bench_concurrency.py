@@ -0,0 +1,106 @@
+"""
+Regression benchmark: concurrent /ws/conversation sessions must not serialize.
+
+Runs the real gateway (uvicorn, in-process) against fake Gemini/Sarvam clients
+with a fixed LLM latency, then times one session against N concurrent ones.
+If anything on the turn path blocks the event loop, N sessions take ~N times
+as long as one and the script exits non-zero.
+
+Usage:
+    python bench_concurrency.py --sessions 20 --llm-latency 1.0
+"""
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import argparse
+import threading
+
+os.environ.setdefault("SARVAM_API_KEY", "bench")
+os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+import uvicorn
+import websockets
+
+import main
+from fake_providers import FakeGeminiClient, FakeSarvamClient, speech_pcm
+
+CHUNKS_PER_UTTERANCE = 5
+CHUNK_SAMPLES = 1024
+SPEECH_CHUNK = base64.b64encode(speech_pcm(CHUNK_SAMPLES)).decode("ascii")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_session(url: str) -> float:
+    """Stream one utterance and wait for the response; returns seconds taken."""
+    start = time.perf_counter()
+    async with websockets.connect(url) as ws:
+        for _ in range(CHUNKS_PER_UTTERANCE):
+            await ws.send(json.dumps({"type": "audio", "audio": SPEECH_CHUNK}))
+        while True:
+            msg = json.loads(await ws.recv())
+            if msg["type"] == "ready":
+                break
+            if msg["type"] == "error":
+                raise RuntimeError(msg["detail"])
+        await ws.send(json.dumps({"type": "end"}))
+    return time.perf_counter() - start
+
+
+async def run_batch(url: str, sessions: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(url) for _ in range(sessions)))
+    return time.perf_counter() - start
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--max-ratio", type=float, default=2.0,
+                        help="fail if N sessions take more than this multiple of one session")
+    args = parser.parse_args()
+
+    main.gemini_client = FakeGeminiClient(latency_s=args.llm_latency)
+    main.sarvam_client = FakeSarvamClient(utterance_s=CHUNKS_PER_UTTERANCE * CHUNK_SAMPLES / 16000)
+
+    port = _free_port()
+    server = start_server(port)
+    url = f"ws://127.0.0.1:{port}/ws/conversation"
+
+    try:
+        single = asyncio.run(run_batch(url, 1))
+        concurrent = asyncio.run(run_batch(url, args.sessions))
+    finally:
+        server.should_exit = True
+
+    ratio = concurrent / single
+    print(f"1 session:          {single:.2f}s")
+    print(f"{args.sessions} sessions:        {concurrent:.2f}s")
+    print(f"ratio:              {ratio:.2f}x (limit {args.max_ratio:.1f}x)")
+
+    if ratio > args.max_ratio:
+        print("[FAIL] Concurrent sessions are serializing — something blocks the event loop")
+        sys.exit(1)
+    print("[PASS] Concurrent sessions overlap")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,119 @@
+"""
+Crisis detector benchmark: precision/recall on a labelled corpus, and throughput.
+
+Every line of crisis_corpus.jsonl is {"language", "crisis", "text"}; crisis
+says whether the fast path should fire. The corpus deliberately includes
+hard negatives (negations, third-person mentions, idioms) and indirect
+crisis statements no phrase list can catch — those are Gemini's job, so
+recall is expected to sit below 1. Precision is what the fast path must
+not give up; the script exits non-zero below --min-precision or
+--min-recall, or if a transcript takes longer than --max-us on average.
+
+Usage:
+    python bench_crisis.py
+    python bench_crisis.py --show-misses --iterations 2000
+    python bench_crisis.py --lexicon my_lexicon.txt --corpus my_corpus.jsonl
+"""
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+
+from crisis_detector import CrisisDetector, DEFAULT_LEXICON_PATH
+
+DEFAULT_CORPUS_PATH = "crisis_corpus.jsonl"
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def score(detector: CrisisDetector, corpus: list):
+    """Per-language confusion counts {language: {tp, fp, fn, tn}}, and the misclassified items."""
+    counts = defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0, "tn": 0})
+    misses = []
+    for item in corpus:
+        fired = detector.detect(item["text"]).high
+        key = ("tp" if fired else "fn") if item["crisis"] else ("fp" if fired else "tn")
+        counts[item["language"]][key] += 1
+        if key in ("fp", "fn"):
+            misses.append((key, item))
+    return counts, misses
+
+
+def ratio(numerator: int, denominator: int) -> float:
+    return numerator / denominator if denominator else float("nan")
+
+
+def throughput(detector: CrisisDetector, texts: list, iterations: int):
+    """Mean microseconds per detect() call, and calls per second."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            detector.detect(text)
+    elapsed = time.perf_counter() - start
+    calls = iterations * len(texts)
+    return elapsed / calls * 1e6, calls / elapsed
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lexicon", default=DEFAULT_LEXICON_PATH)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_PATH)
+    parser.add_argument("--iterations", type=int, default=500, help="passes over the corpus for timing")
+    parser.add_argument("--min-precision", type=float, default=0.98)
+    parser.add_argument("--min-recall", type=float, default=0.85)
+    parser.add_argument("--max-us", type=float, default=500.0, help="mean detect() budget per transcript")
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    detector = CrisisDetector.from_file(args.lexicon)
+    build_ms = (time.perf_counter() - start) * 1000
+    corpus = load_corpus(args.corpus)
+    counts, misses = score(detector, corpus)
+
+    print(f"lexicon: {len(detector)} phrases, {len(detector._matcher)} automaton states, built in {build_ms:.1f}ms")
+    print(f"corpus:  {len(corpus)} transcripts, {sum(1 for i in corpus if i['crisis'])} crisis\n")
+    print(f"{'language':<10}{'n':>5}{'tp':>5}{'fp':>5}{'fn':>5}{'precision':>11}{'recall':>9}")
+    total = {"tp": 0, "fp": 0, "fn": 0, "tn": 0}
+    for language in sorted(counts):
+        c = counts[language]
+        for key in total:
+            total[key] += c[key]
+        print(f"{language:<10}{sum(c.values()):>5}{c['tp']:>5}{c['fp']:>5}{c['fn']:>5}"
+              f"{ratio(c['tp'], c['tp'] + c['fp']):>11.2f}{ratio(c['tp'], c['tp'] + c['fn']):>9.2f}")
+    precision = ratio(total["tp"], total["tp"] + total["fp"])
+    recall = ratio(total["tp"], total["tp"] + total["fn"])
+    print(f"{'all':<10}{len(corpus):>5}{total['tp']:>5}{total['fp']:>5}{total['fn']:>5}"
+          f"{precision:>11.2f}{recall:>9.2f}")
+
+    if args.show_misses and misses:
+        print()
+        for key, item in misses:
+            print(f"{key.upper()} {item['language']}: {item['text']}")
+
+    texts = [item["text"] for item in corpus]
+    mean_us, per_s = throughput(detector, texts, args.iterations)
+    long_text = " ".join(texts[:40])     # a long monologue, ~25 s of speech or more
+    long_us, _ = throughput(detector, [long_text], max(1, args.iterations // 10))
+    print(f"\nthroughput: {mean_us:.1f}us per transcript ({per_s:,.0f}/s), "
+          f"{long_us:.0f}us for a {len(long_text.split())}-word transcript")
+
+    failures = []
+    if precision < args.min_precision:
+        failures.append(f"precision {precision:.2f} < {args.min_precision}")
+    if recall < args.min_recall:
+        failures.append(f"recall {recall:.2f} < {args.min_recall}")
+    if mean_us > args.max_us:
+        failures.append(f"{mean_us:.0f}us per transcript > {args.max_us:.0f}us")
+    if failures:
+        print(f"[FAIL] {'; '.join(failures)}")
+        sys.exit(1)
+    print("[PASS] Crisis detector within precision, recall and latency limits")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,291 @@
+"""
+Load harness: simulated /ws/conversation clients plus REST /api/v1/voice-turn traffic.
+
+Starts the gateway in a child process with PROVIDERS=fake (see providers.py),
+so no Gemini/Sarvam quota is used, then runs N WebSocket sessions that stream
+PCM at real-time pace for several turns each, alongside REST clients posting
+WAV uploads. Reports p50/p95/p99 per stage, turns per second, errors, and the
+server's resident memory per concurrent session (Linux /proc).
+
+Stages, as the client sees them:
+  stt          last audio frame sent → "processing" (final transcript reached a worker)
+  first_audio  "processing" → first reply audio (response_chunk, or response)
+  turn         last audio frame sent → "ready"
+  rest         one POST /api/v1/voice-turn request
+
+Usage:
+    python bench_load.py --sessions 50 --turns 3 --rest-clients 5
+    python bench_load.py --stream --binary --llm-latency lognormal:1.5:0.5 --error-rate 0.02
+    python bench_load.py --model-latency gemini-2.5-flash-lite=lognormal:0.4:0.1   # fast routing tier
+    python bench_load.py --url http://127.0.0.1:8000 --sessions 10   # an already running server
+"""
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import argparse
+import itertools
+import subprocess
+
+import httpx
+import websockets
+
+from fake_providers import silent_wav_base64, speech_pcm
+
+BINARY_SUBPROTOCOL = "mindwell.binary.v1"
+REST_UPLOADS = itertools.count()
+
+# 4096 samples captured at 48 kHz, downsampled to 16 kHz by the browser
+FRAME_SAMPLES = 1366
+FRAME_INTERVAL_S = FRAME_SAMPLES / 16000
+TURN_TIMEOUT_S = 60
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+class Results:
+    def __init__(self):
+        self.stages = {"stt": [], "first_audio": [], "turn": [], "rest": []}
+        self.turns = 0
+        self.errors = {}
+
+    def error(self, kind: str):
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+# ═══════════════════════════════════════════
+# ═══ CLIENTS ═══
+# ═══════════════════════════════════════════
+
+async def receive_turn(ws, sent_at: float, results: Results):
+    """Read one turn's replies, recording stage timings, until ready/error."""
+    processing_at = None
+    first_audio = False
+    while True:
+        raw = await ws.recv()
+        if isinstance(raw, bytes):
+            continue
+        msg = json.loads(raw)
+        now = time.perf_counter()
+        kind = msg["type"]
+        if kind == "processing":
+            processing_at = now
+            results.stages["stt"].append(now - sent_at)
+        elif kind in ("response_chunk", "response") and not first_audio:
+            if msg.get("audio_bytes") or msg.get("audio_base64"):
+                first_audio = True
+                if processing_at is not None:
+                    results.stages["first_audio"].append(now - processing_at)
+        elif kind == "ready":
+            results.stages["turn"].append(now - sent_at)
+            results.turns += 1
+            return
+        elif kind == "error":
+            results.error("ws_turn")
+            return
+
+
+async def ws_session(url: str, args, results: Results, start_delay: float):
+    await asyncio.sleep(start_delay)
+    pcm = speech_pcm(FRAME_SAMPLES)
+    if args.binary:
+        frame, subprotocols = pcm, [BINARY_SUBPROTOCOL]
+    else:
+        frame = json.dumps({"type": "audio", "audio": base64.b64encode(pcm).decode("ascii")})
+        subprotocols = None
+
+    try:
+        async with websockets.connect(url, subprotocols=subprotocols, max_size=None) as ws:
+            for _ in range(args.turns):
+                for i in range(args.chunks_per_utterance):
+                    if i and args.frame_interval:
+                        await asyncio.sleep(args.frame_interval)
+                    await ws.send(frame)
+                try:
+                    await asyncio.wait_for(
+                        receive_turn(ws, time.perf_counter(), results), TURN_TIMEOUT_S)
+                except asyncio.TimeoutError:
+                    results.error("ws_timeout")
+            await ws.send(json.dumps({"type": "end"}))
+    except Exception as e:
+        results.error(f"ws_{type(e).__name__}")
+
+
+async def rest_client(base_url: str, args, results: Results, start_delay: float):
+    await asyncio.sleep(start_delay)
+    async with httpx.AsyncClient(base_url=base_url, timeout=TURN_TIMEOUT_S) as http:
+        for _ in range(args.rest_requests):
+            # A sample longer each time: identical uploads would be answered
+            # from the gateway's idempotency and transcript caches
+            wav = base64.b64decode(silent_wav_base64(duration_s=2.0 + next(REST_UPLOADS) / 16000))
+            start = time.perf_counter()
+            try:
+                response = await http.post(
+                    "/api/v1/voice-turn",
+                    files={"audio": ("turn.wav", wav, "audio/wav")},
+                    data={"chat_history": "[]"},
+                )
+            except httpx.HTTPError as e:
+                results.error(f"rest_{type(e).__name__}")
+                continue
+            if response.status_code == 200:
+                results.stages["rest"].append(time.perf_counter() - start)
+                results.turns += 1
+            else:
+                results.error(f"rest_{response.status_code}")
+
+
+async def sample_memory(pid: int, peak: list, stop: asyncio.Event):
+    while not stop.is_set():
+        peak[0] = max(peak[0], rss_bytes(pid))
+        try:
+            await asyncio.wait_for(stop.wait(), 0.25)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_load(base_url: str, args, server_pid: int = None):
+    ws_url = base_url.replace("http", "ws", 1) + "/ws/conversation"
+    if args.stream:
+        ws_url += "?stream=1"
+    results = Results()
+
+    # Warm-up turn so imports and first-call setup don't land in the numbers
+    warm = argparse.Namespace(**{**vars(args), "turns": 1, "frame_interval": 0})
+    await ws_session(ws_url, warm, Results(), 0)
+
+    baseline = rss_bytes(server_pid) if server_pid else 0
+    peak, stop = [baseline], asyncio.Event()
+    sampler = asyncio.create_task(sample_memory(server_pid, peak, stop)) if server_pid else None
+
+    ramp = args.ramp / max(1, args.sessions)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(ws_session(ws_url, args, results, i * ramp) for i in range(args.sessions)),
+        *(rest_client(base_url, args, results, i * ramp) for i in range(args.rest_clients)),
+    )
+    elapsed = time.perf_counter() - started
+
+    if sampler:
+        stop.set()
+        await sampler
+    return results, elapsed, baseline, peak[0]
+
+
+def report(args, results: Results, elapsed: float, baseline: int, peak: int):
+    print(f"\n{args.sessions} WS sessions x {args.turns} turns, "
+          f"{args.rest_clients} REST clients x {args.rest_requests} requests "
+          f"(stream={args.stream}, binary={args.binary})")
+    print(f"{'stage':<14}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, values in results.stages.items():
+        if not values:
+            continue
+        print(f"{stage:<14}{len(values):>6}"
+              + "".join(f"{percentile(values, p) * 1000:>8.0f}ms" for p in (50, 95, 99)))
+    print(f"turns/s:      {results.turns / elapsed:.2f} ({results.turns} turns in {elapsed:.1f}s)")
+    if results.errors:
+        print("errors:       " + ", ".join(f"{k}={v}" for k, v in sorted(results.errors.items())))
+    if peak:
+        per_session = (peak - baseline) / max(1, args.sessions)
+        print(f"server RSS:   {baseline / 2**20:.0f} MB idle, {peak / 2**20:.0f} MB peak, "
+              f"{per_session / 1024:.0f} KB per session")
+
+
+# ═══════════════════════════════════════════
+# ═══ CLI ═══
+# ═══════════════════════════════════════════
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--rest-clients", type=int, default=2)
+    parser.add_argument("--rest-requests", type=int, default=5)
+    parser.add_argument("--stream", action="store_true", help="streamed replies (?stream=1)")
+    parser.add_argument("--binary", action="store_true", help="binary audio subprotocol")
+    parser.add_argument("--chunks-per-utterance", type=int, default=12)
+    parser.add_argument("--frame-interval", type=float, default=FRAME_INTERVAL_S,
+                        help="seconds between PCM frames (default: real time, 0 = as fast as possible)")
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which clients start")
+    parser.add_argument("--url", help="target a running gateway instead of starting one")
+    fakes = parser.add_argument_group("fake providers (ignored with --url)")
+    fakes.add_argument("--llm-latency", default="lognormal:1.0:0.3")
+    fakes.add_argument("--model-latency", default="",
+                       help='per-model LLM latency, e.g. "gemini-2.5-flash-lite=lognormal:0.4:0.1"')
+    fakes.add_argument("--tts-latency", default="lognormal:0.4:0.1")
+    fakes.add_argument("--stt-latency", default="lognormal:0.3:0.1")
+    fakes.add_argument("--error-rate", type=float, default=0.0)
+    fakes.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.url:
+        results, elapsed, baseline, peak = asyncio.run(run_load(args.url.rstrip("/"), args))
+        report(args, results, elapsed, baseline, peak)
+        return
+
+    port = _free_port()
+    env = {
+        **os.environ,
+        "PROVIDERS": "fake",
+        "SARVAM_API_KEY": os.getenv("SARVAM_API_KEY", "bench"),
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", "bench"),
+        "FAKE_LLM_LATENCY": args.llm_latency,
+        "FAKE_LLM_MODEL_LATENCY": args.model_latency,
+        "FAKE_TTS_LATENCY": args.tts_latency,
+        "FAKE_STT_LATENCY": args.stt_latency,
+        "FAKE_ERROR_RATE": str(args.error_rate),
+        "FAKE_SEED": str(args.seed),
+        "FAKE_UTTERANCE_S": str(args.chunks_per_utterance * FRAME_SAMPLES / 16000),
+        "TTS_PREWARM_FILE": "",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "error"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), env=env, stdout=subprocess.DEVNULL)
+    try:
+        for _ in range(200):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    sys.exit("Gateway failed to start")
+                time.sleep(0.1)
+
+        results, elapsed, baseline, peak = asyncio.run(
+            run_load(f"http://127.0.0.1:{port}", args, server_pid=server.pid))
+        report(args, results, elapsed, baseline, peak)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,132 @@
+"""
+Throughput benchmark: JSON/base64 vs binary /ws/conversation protocol.
+
+Starts the gateway in a child process with fake Gemini/Sarvam clients, drives
+the same workload over each protocol (N sessions, each streaming PCM frames
+the size the browser sends and receiving a WAV reply), and reports server CPU
+time per session and bytes on the wire. Server CPU is read from
+/proc/<pid>/stat, so this runs on Linux.
+
+Usage:
+    python bench_protocol.py --sessions 20 --turns 3
+"""
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import asyncio
+import argparse
+import subprocess
+
+import websockets
+
+BINARY_SUBPROTOCOL = "mindwell.binary.v1"
+
+# 4096 samples captured at 48 kHz, downsampled to 16 kHz by the browser
+FRAME_SAMPLES = 1366
+FRAMES_PER_TURN = 60          # ~5 s of speech per utterance
+REPLY_SECONDS = 6.0           # length of the fake Bulbul reply
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(port: int):
+    """Child process: the real app with zero-latency fake providers."""
+    os.environ.setdefault("SARVAM_API_KEY", "bench")
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    import uvicorn
+    import main
+    from fake_providers import FakeGeminiClient, FakeSarvamClient, silent_wav_base64
+
+    main.gemini_client = FakeGeminiClient(latency_s=0.0)
+    main.sarvam_client = FakeSarvamClient(tts_latency_s=0.0, connect_latency_s=0.0,
+                                          utterance_s=FRAMES_PER_TURN * FRAME_SAMPLES / 16000)
+    main.sarvam_client.audio_base64 = silent_wav_base64(REPLY_SECONDS, sample_rate=22050)
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="error")
+
+
+def cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    utime, stime = int(fields[11]), int(fields[12])
+    return (utime + stime) / os.sysconf("SC_CLK_TCK")
+
+
+async def run_session(url: str, binary: bool, turns: int, stats: dict):
+    pcm = os.urandom(FRAME_SAMPLES * 2)
+    if binary:
+        frame = pcm
+    else:
+        frame = json.dumps({"type": "audio", "audio": base64.b64encode(pcm).decode("ascii")})
+    subprotocols = [BINARY_SUBPROTOCOL] if binary else None
+
+    async with websockets.connect(url, subprotocols=subprotocols, max_size=None) as ws:
+        for _ in range(turns):
+            for _ in range(FRAMES_PER_TURN):
+                await ws.send(frame)
+                stats["up"] += len(frame)
+            while True:
+                msg = await ws.recv()
+                stats["down"] += len(msg)
+                if isinstance(msg, bytes):
+                    continue
+                if json.loads(msg)["type"] == "ready":
+                    break
+        await ws.send(json.dumps({"type": "end"}))
+
+
+async def run_protocol(url: str, binary: bool, sessions: int, turns: int) -> dict:
+    stats = {"up": 0, "down": 0}
+    await asyncio.gather(*(run_session(url, binary, turns, stats) for _ in range(sessions)))
+    return stats
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return
+
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, __file__, "--serve", str(port)],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL)
+    url = f"ws://127.0.0.1:{port}/ws/conversation"
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+        asyncio.run(run_protocol(url, False, 1, 1))   # warm-up
+        print(f"{'protocol':<10}{'cpu/session':>14}{'upstream':>14}{'downstream':>14}")
+        for name, binary in (("json", False), ("binary", True)):
+            before = cpu_seconds(server.pid)
+            stats = asyncio.run(run_protocol(url, binary, args.sessions, args.turns))
+            cpu = (cpu_seconds(server.pid) - before) / args.sessions
+            print(f"{name:<10}{cpu * 1000:>11.1f} ms"
+                  f"{stats['up'] / args.sessions / 1024:>11.0f} KB"
+                  f"{stats['down'] / args.sessions / 1024:>11.0f} KB")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,146 @@
+"""
+Cold-start benchmark: gateway import time, and time to /healthz and /readyz.
+
+The import profile comes from `python -X importtime -c "import main"` in a
+fresh interpreter (best of --runs, so the first run's bytecode compile does
+not count), with PROVIDERS=live and placeholder keys. It lists the heaviest
+modules main pulls in and exits non-zero if the import takes longer than
+--max-import-ms, or if a module that should be deferred (the google-genai
+and sarvamai SDKs, see CLIENT_WARMUP in main.py) is imported at all.
+
+It then starts uvicorn and polls the probes: /healthz should answer as soon
+as the app is up, /readyz once the background client warm-up has finished.
+No provider is called, so no quota is used.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --max-import-ms 600 --top 30
+    python bench_startup.py --skip-server
+"""
+import os
+import sys
+import time
+import socket
+import argparse
+import subprocess
+
+import httpx
+
+DEFERRED_MODULES = ("google.genai", "sarvamai")
+
+ENV = {
+    "PROVIDERS": "live",
+    "SARVAM_API_KEY": "bench",
+    "GEMINI_API_KEY": "bench",
+    "CLIENT_WARMUP": "background",
+    "TTS_PREWARM_FILE": "",
+    "ACK_PHRASES_FILE": "",
+    "STT_POOL_SIZE": "0",
+    "LOG_LEVEL": "WARNING",
+}
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def parse_importtime(stderr: str) -> list:
+    """`-X importtime` output -> [(module, depth, self_us, cumulative_us)] in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def profile_import(env: dict) -> list:
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=HERE, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import main failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def time_probes(env: dict, timeout_s: float = 60.0):
+    """Seconds from process start until /healthz, then /readyz, first return 200."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "error"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL)
+    times = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            for probe in ("/healthz", "/readyz"):
+                while time.perf_counter() - started < timeout_s:
+                    try:
+                        if client.get(probe).status_code == 200:
+                            times[probe] = time.perf_counter() - started
+                            break
+                    except httpx.TransportError:
+                        pass
+                    time.sleep(0.005)
+    finally:
+        server.terminate()
+        server.wait()
+    return times
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="import profiles to take; the fastest is reported")
+    parser.add_argument("--top", type=int, default=15, help="heaviest modules to list")
+    parser.add_argument("--max-import-ms", type=float, default=900.0, help="budget for `import main`")
+    parser.add_argument("--max-healthz-s", type=float, default=3.0,
+                        help="budget from process start to the first /healthz 200")
+    parser.add_argument("--skip-server", action="store_true", help="import profile only")
+    args = parser.parse_args()
+
+    env = {**os.environ, **ENV}
+    rows = min((profile_import(env) for _ in range(max(1, args.runs))),
+               key=lambda rows: next(cum for name, _, _, cum in rows if name == "main"))
+    import_ms = next(cum for name, _, _, cum in rows if name == "main") / 1000
+
+    print(f"import main: {import_ms:.0f}ms (best of {args.runs}), {len(rows)} modules\n")
+    print(f"{'module':<44}{'self ms':>9}{'cum ms':>9}")
+    # Direct imports of main, plus anything heavy further down
+    heavy = sorted((row for row in rows if row[0] != "main" and row[1] <= 1),
+                   key=lambda row: row[3], reverse=True)[:args.top]
+    for name, _, self_us, cumulative_us in heavy:
+        print(f"{name:<44}{self_us / 1000:>9.1f}{cumulative_us / 1000:>9.1f}")
+
+    deferred = sorted({name for name, _, _, _ in rows
+                       if any(name == module or name.startswith(module + ".") for module in DEFERRED_MODULES)})
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import main {import_ms:.0f}ms > {args.max_import_ms:.0f}ms")
+    if deferred:
+        failures.append(f"imported at startup: {', '.join(deferred[:5])}{' ...' if len(deferred) > 5 else ''}")
+
+    if not args.skip_server:
+        times = time_probes(env)
+        healthz_s, readyz_s = times.get("/healthz"), times.get("/readyz")
+        print(f"\n/healthz: {f'{healthz_s:.2f}s' if healthz_s else 'no answer'} after process start")
+        print(f"/readyz:  {f'{readyz_s:.2f}s' if readyz_s else 'no answer'} (clients warmed in the background)")
+        if healthz_s is None or healthz_s > args.max_healthz_s:
+            failures.append(f"/healthz took {f'{healthz_s:.2f}s' if healthz_s else 'too long'} "
+                            f"(budget {args.max_healthz_s:.1f}s)")
+        if readyz_s is None:
+            failures.append("/readyz never became ready")
+
+    print()
+    if failures:
+        print(f"[FAIL] {'; '.join(failures)}")
+        sys.exit(1)
+    print("[PASS] Cold start within budget")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,153 @@
+"""
+Telemetry store benchmark: write throughput and query latency at scale.
+
+Generates --turns synthetic turns (sessions of a few dozen turns, spread over
+--days day partitions, with a realistic language and risk mix), appends them
+through the store's own PartitionWriter in batches, then times:
+
+  cohort       risk distribution by language over every partition
+  trajectory   one session's turns, looked up across every partition
+  record()     the sink's per-turn cost on the event loop
+
+and exits non-zero if a query exceeds its budget. The data goes to a
+temporary directory unless --dir is given (rerun with --reuse to skip
+generation).
+
+Usage:
+    python bench_telemetry.py
+    python bench_telemetry.py --turns 5000000 --days 60
+    python bench_telemetry.py --dir /tmp/telemetry-bench --reuse
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+
+from telemetry_store import PartitionWriter, TelemetryQuery, TelemetrySink, RISK_LEVELS, partition_files
+
+LANGUAGES = ("hi-IN", "en-IN", "bn-IN", "ta-IN", "te-IN", "mr-IN", "gu-IN", "kn-IN", "ml-IN", "pa-IN", "od-IN")
+EMOTIONS = ("stress", "anxiety", "sadness", "loneliness", "anger", "hopelessness", "calm", "guilt")
+DAY_S = 86400
+
+
+def synthetic_turns(turns: int, days: int, seed: int = 0):
+    """One list of (ts, session_id, channel, language, telemetry) records per day, oldest first."""
+    rng = random.Random(seed)
+    start = time.time() - days * DAY_S
+    per_day = turns // days
+    session = 0
+    for day in range(days):
+        batch = []
+        day_start = start + day * DAY_S
+        while len(batch) < per_day:
+            session += 1
+            language = rng.choices(LANGUAGES, weights=(30, 25, 8, 8, 7, 6, 5, 4, 3, 2, 2))[0]
+            risk = rng.choices(range(4), weights=(60, 28, 9, 3))[0]
+            ts = day_start + rng.uniform(0, DAY_S - 3600)
+            for _ in range(min(rng.randint(3, 40), per_day - len(batch))):
+                ts += rng.uniform(5, 60)
+                risk = min(3, max(0, risk + rng.choice((-1, 0, 0, 0, 1))))
+                batch.append((ts, f"s{session:012x}", "ws", language, {
+                    "phq9_risk_indicator": RISK_LEVELS[risk],
+                    "gad7_risk_indicator": RISK_LEVELS[min(3, max(0, risk + rng.choice((-1, 0, 1))))],
+                    "requires_crisis_intervention": risk == 3 and rng.random() < 0.3,
+                    "detected_emotions": rng.sample(EMOTIONS, rng.randint(0, 3)),
+                    "recommended_resource": None,
+                }))
+        yield batch
+
+
+def generate(directory: str, turns: int, days: int, batch_size: int):
+    writer = PartitionWriter(directory, shard="bench")
+    started = time.perf_counter()
+    written = 0
+    for records in synthetic_turns(turns, days):
+        for i in range(0, len(records), batch_size):
+            writer.append(records[i:i + batch_size])
+        written += len(records)
+    writer.close()
+    elapsed = time.perf_counter() - started
+    print(f"write:       {written:,} turns in {elapsed:.1f}s ({written / elapsed:,.0f} turns/s, "
+          f"batches of {batch_size})")
+
+
+def pick_session(directory: str) -> str:
+    """A session id from the middle partition."""
+    paths = partition_files(directory)
+    db = sqlite3.connect(paths[len(paths) // 2])
+    try:
+        return db.execute("SELECT value FROM labels WHERE kind = 'session' ORDER BY id LIMIT 1 OFFSET 100").fetchone()[0]
+    finally:
+        db.close()
+
+
+async def record_cost(iterations: int) -> float:
+    """Mean seconds per TelemetrySink.record() call (queue only, no writer running)."""
+    with tempfile.TemporaryDirectory() as directory:
+        sink = TelemetrySink(directory, max_queue=iterations)
+        telemetry = {"phq9_risk_indicator": "low", "gad7_risk_indicator": "moderate",
+                     "requires_crisis_intervention": False, "detected_emotions": ["stress"]}
+        started = time.perf_counter()
+        for _ in range(iterations):
+            sink.record("s1", "ws", "hi-IN", telemetry)
+        return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dir", help="keep the generated partitions here (default: a temporary directory)")
+    parser.add_argument("--reuse", action="store_true", help="query the partitions already in --dir")
+    parser.add_argument("--max-cohort-s", type=float, default=3.0)
+    parser.add_argument("--max-trajectory-ms", type=float, default=250.0)
+    args = parser.parse_args()
+
+    tmp = None
+    directory = args.dir
+    if directory is None:
+        tmp = tempfile.TemporaryDirectory()
+        directory = tmp.name
+    try:
+        if not args.reuse:
+            generate(directory, args.turns, args.days, args.batch_size)
+        session_id = pick_session(directory)
+        size = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory))
+        print(f"storage:     {size / 1e6:.0f} MB in {len(os.listdir(directory))} files")
+
+        query = TelemetryQuery(directory)
+        started = time.perf_counter()
+        cohorts = query.cohort(days=args.days + 1)
+        cohort_s = time.perf_counter() - started
+        total = sum(c["turns"] for c in cohorts.values())
+        print(f"cohort:      {cohort_s:.2f}s over {total:,} turns, {len(cohorts)} languages")
+
+        started = time.perf_counter()
+        turns = query.trajectory(session_id, days=args.days + 1)
+        trajectory_ms = (time.perf_counter() - started) * 1000
+        print(f"trajectory:  {trajectory_ms:.1f}ms for {len(turns)} turns across {args.days} partitions")
+
+        record_us = asyncio.run(record_cost(100_000)) * 1e6
+        print(f"record():    {record_us:.2f}us per turn on the event loop")
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    failures = []
+    if cohort_s > args.max_cohort_s:
+        failures.append(f"cohort {cohort_s:.2f}s > {args.max_cohort_s}s")
+    if trajectory_ms > args.max_trajectory_ms:
+        failures.append(f"trajectory {trajectory_ms:.0f}ms > {args.max_trajectory_ms}ms")
+    if failures:
+        print(f"[FAIL] {'; '.join(failures)}")
+        sys.exit(1)
+    print("[PASS] Telemetry queries within budget")
+
+
+if __name__ == "__main__":
+    main()
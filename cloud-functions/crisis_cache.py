@@ -0,0 +1,130 @@
+"""
+Pre-translated, pre-synthesized Tele-MANAS crisis message cache.
+
+The crisis message is constant, so its translation and Bulbul audio can be
+built ahead of time instead of on the one turn where latency matters most.
+Texts are keyed by language code; audio by (language code, speaker).
+
+Build offline (writes crisis_assets.json next to main.py):
+    python crisis_cache.py --speakers ritu,anushka
+"""
+import os
+import json
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+
+log = logging.getLogger("mindwell.crisis")
+
+
+DEFAULT_ASSETS_PATH = os.path.join(os.path.dirname(__file__), "crisis_assets.json")
+
+
+@dataclass
+class CrisisAsset:
+    text: str
+    audio_base64: str
+
+
+class CrisisAssetCache:
+    def __init__(self):
+        self._texts = {}      # language_code -> translated text
+        self._audio = {}      # (language_code, speaker) -> base64 WAV
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._audio)
+
+    def text(self, language_code: str):
+        return self._texts.get(language_code)
+
+    def has(self, language_code: str, speaker: str) -> bool:
+        return (language_code, speaker) in self._audio
+
+    def get(self, language_code: str, speaker: str):
+        """Text + audio for this language/speaker, or None on a miss."""
+        text = self._texts.get(language_code)
+        audio = self._audio.get((language_code, speaker))
+        if text is None or audio is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CrisisAsset(text=text, audio_base64=audio)
+
+    def put(self, language_code: str, speaker: str, text: str, audio_base64: str = None):
+        self._texts[language_code] = text
+        if audio_base64 is not None:
+            self._audio[(language_code, speaker)] = audio_base64
+
+    # ─── Persistence ───
+
+    def load(self, path: str = DEFAULT_ASSETS_PATH) -> bool:
+        if not os.path.exists(path):
+            return False
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self._texts.update(data.get("texts", {}))
+        for key, audio in data.get("audio", {}).items():
+            language_code, speaker = key.split("|", 1)
+            self._audio[(language_code, speaker)] = audio
+        return True
+
+    def save(self, path: str = DEFAULT_ASSETS_PATH):
+        data = {
+            "texts": self._texts,
+            "audio": {f"{lang}|{speaker}": audio for (lang, speaker), audio in self._audio.items()},
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+async def build(cache: CrisisAssetCache, translate, synthesize, languages, speakers,
+                concurrency: int = 4):
+    """
+    Fill every missing (language, speaker) entry.
+
+    translate(language_code) -> text and synthesize(text, language_code, speaker)
+    -> base64 audio are supplied by the caller. Failures are logged and skipped,
+    so a partial build is still usable; missing entries fall back to live calls.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def fill(language_code: str):
+        async with slots:
+            try:
+                text = cache.text(language_code) or await translate(language_code)
+                cache.put(language_code, None, text)
+                for speaker in speakers:
+                    if not cache.has(language_code, speaker):
+                        cache.put(language_code, speaker, text, await synthesize(text, language_code, speaker))
+            except Exception as e:
+                log.warning(f"[CRISIS] Could not build asset for {language_code}: {e}")
+
+    await asyncio.gather(*(fill(language_code) for language_code in languages))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the crisis message asset cache.")
+    parser.add_argument("--speakers", default="ritu", help="comma-separated Bulbul speakers")
+    parser.add_argument("--out", default=DEFAULT_ASSETS_PATH)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    import main
+
+    cache = CrisisAssetCache()
+    cache.load(args.out)
+    asyncio.run(build(
+        cache,
+        translate=main.crisis_text_for,
+        synthesize=main.synthesize_speech,
+        languages=main.LANGUAGE_NAMES.keys(),
+        speakers=[s.strip() for s in args.speakers.split(",") if s.strip()],
+        concurrency=args.concurrency,
+    ))
+    cache.save(args.out)
+    print(f"[CRISIS] Wrote {len(cache)} crisis assets to {args.out}")
@@ -0,0 +1,227 @@
+"""
+Local crisis-phrase detector: runs on the STT transcript before any LLM call.
+
+Crisis handling otherwise waits on Gemini's requires_crisis_intervention flag,
+so even an unambiguous "I want to kill myself" sits through a full LLM round
+trip before the safety message starts. The detector matches the transcript
+against a curated lexicon (crisis_lexicon.txt) with one Aho-Corasick
+automaton covering every language at once — STT's language detection is
+unreliable on code-mixed speech, and romanized Hinglish comes back as en-IN —
+in a single pass over the text, tens of microseconds per transcript.
+
+Lexicon lines are `language_code|kind|phrase`:
+
+  high      first-person intent ("kill myself", "marna chahta"); a hit fires
+            the crisis fast path
+  signal    crisis vocabulary that isn't intent on its own ("suicide"); reported,
+            never fires
+  negation  single words that cancel a nearby hit ("never", "नहीं")
+  boundary  words that start a new clause ("but", "लेकिन") for the negation window
+  exclude   benign idioms containing a high phrase ("kill myself laughing")
+
+A phrase ending in `*` matches as a word prefix, for agglutinative forms
+(Tamil, Kannada, Malayalam, ... suffix the verb). Matching is on normalized
+text: casefolded, NFC, nukta/chandrabindu folded, zero-width joiners and
+apostrophes dropped, punctuation collapsed. Matches never span a clause
+(.,!?; and the danda), and a negation within NEGATION_WINDOW words either
+side in the same clause suppresses a hit: English negates before the verb,
+most Indian languages after it.
+
+The lexicon is tuned for precision: the fast path only ever adds a safety
+message, and anything it misses still reaches Gemini.
+bench_crisis.py measures precision/recall on crisis_corpus.jsonl and throughput.
+"""
+import os
+import re
+import logging
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+
+log = logging.getLogger("mindwell.crisis")
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(__file__), "crisis_lexicon.txt")
+KINDS = ("high", "signal", "negation", "boundary", "exclude")
+NEGATION_WINDOW = 3
+CLAUSE = "|"
+
+_CLAUSE_PUNCT = re.compile(r"[.!?;:,\n।॥؟،۔]+")
+# apostrophes, ZWNJ/ZWJ, and the nukta in Devanagari/Bengali/Gurmukhi/Gujarati/Odia
+_DROP = dict.fromkeys(map(ord, "'\u2019\u02bc\u200c\u200d\u093c\u09bc\u0a3c\u0abc\u0b3c"), None)
+# chandrabindu -> anusvara in the same scripts; atomic Malayalam chillus ->
+# consonant + virama, which is what the older ZWJ spelling becomes once ZWJ is dropped
+_FOLD = {0x0901: "\u0902", 0x0981: "\u0982", 0x0a01: "\u0a02", 0x0a81: "\u0a82", 0x0b01: "\u0b02",
+         0x0d7a: "\u0d23\u0d4d", 0x0d7b: "\u0d28\u0d4d", 0x0d7c: "\u0d30\u0d4d",
+         0x0d7d: "\u0d32\u0d4d", 0x0d7e: "\u0d33\u0d4d", 0x0d7f: "\u0d15\u0d4d"}
+
+
+def _is_word_char(ch: str) -> bool:
+    # Indic vowel signs and viramas are combining marks, not alphanumerics
+    return ch.isalnum() or unicodedata.category(ch).startswith("M")
+
+
+def normalize(text: str) -> str:
+    """Text as matched: words separated by single spaces, clauses by ` | `."""
+    text = unicodedata.normalize("NFC", text).casefold().translate(_DROP).translate(_FOLD)
+    text = _CLAUSE_PUNCT.sub(f" {CLAUSE} ", text)
+    words = ("".join(ch if _is_word_char(ch) or ch == CLAUSE else " " for ch in text)).split()
+    return " ".join(words)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: every occurrence of every pattern in one pass over the text."""
+
+    def __init__(self, patterns):
+        """patterns: iterable of (pattern string, value)."""
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]             # state -> [(pattern length, value)]
+        for pattern, value in patterns:
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), value))
+
+        # Breadth-first, so a state's failure target is complete before its children's
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self._goto)
+
+    def finditer(self, text: str):
+        """(start, end, value) for every match, in order of end position."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in out[state]:
+                yield i + 1 - length, i + 1, value
+
+
+@dataclass(frozen=True)
+class Phrase:
+    text: str                    # normalized, without the trailing *
+    language: str
+    kind: str
+    prefix: bool = False
+
+
+@dataclass(frozen=True)
+class CrisisMatch:
+    phrase: str
+    language: str
+    kind: str                    # high | signal
+
+
+@dataclass
+class Detection:
+    matches: list = field(default_factory=list)
+    negated: int = 0             # high hits suppressed by a nearby negation
+    excluded: int = 0            # high hits inside a benign idiom
+
+    @property
+    def high(self) -> bool:
+        return any(m.kind == "high" for m in self.matches)
+
+    @property
+    def languages(self) -> list:
+        return sorted({m.language for m in self.matches if m.kind == "high"})
+
+
+class CrisisDetector:
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        self._negations = {p.text for p in self.phrases if p.kind == "negation"}
+        self._boundaries = {p.text for p in self.phrases if p.kind == "boundary"}
+        self._matcher = AhoCorasick(
+            (p.text, p) for p in self.phrases if p.kind in ("high", "signal", "exclude"))
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_LEXICON_PATH) -> "CrisisDetector":
+        return cls(load_lexicon(path))
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def detect(self, transcript: str) -> Detection:
+        text = normalize(transcript)
+        hits, excludes = [], []
+        for start, end, phrase in self._matcher.finditer(text):
+            if not self._at_word_boundaries(text, start, end, phrase.prefix):
+                continue
+            (excludes if phrase.kind == "exclude" else hits).append((start, end, phrase))
+
+        detection = Detection()
+        for start, end, phrase in hits:
+            if phrase.kind == "high":
+                if any(s < end and start < e for s, e, _ in excludes):
+                    detection.excluded += 1
+                    continue
+                if self._negated(text, start, end):
+                    detection.negated += 1
+                    continue
+            match = CrisisMatch(phrase.text, phrase.language, phrase.kind)
+            if match not in detection.matches:
+                detection.matches.append(match)
+        return detection
+
+    @staticmethod
+    def _at_word_boundaries(text: str, start: int, end: int, prefix: bool) -> bool:
+        if start > 0 and text[start - 1] != " ":
+            return False
+        return prefix or end == len(text) or text[end] == " "
+
+    def _negated(self, text: str, start: int, end: int) -> bool:
+        clause_start = text.rfind(CLAUSE, 0, start) + 1
+        clause_end = text.find(CLAUSE, end)
+        before = text[clause_start:start].split()
+        after = text[end:clause_end if clause_end >= 0 else len(text)].split()
+        if end < len(text) and text[end] != " ":
+            after = after[1:]        # the rest of a prefix match's word
+        return self._window_negated(reversed(before)) or self._window_negated(after)
+
+    def _window_negated(self, words) -> bool:
+        for i, word in enumerate(words):
+            if i >= NEGATION_WINDOW or word in self._boundaries:
+                return False
+            if word in self._negations:
+                return True
+        return False
+
+
+def load_lexicon(path: str) -> list:
+    """`language_code|kind|phrase` per line; blank lines and # comments are skipped."""
+    phrases = []
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = [part.strip() for part in line.split("|", 2)]
+            if len(parts) != 3 or parts[1] not in KINDS:
+                log.warning(f"[CRISIS] {path}:{number}: expected language|kind|phrase, skipped")
+                continue
+            language, kind, raw = parts
+            prefix = raw.endswith("*")
+            text = normalize(raw.rstrip("*"))
+            if text:
+                phrases.append(Phrase(text, language, kind, prefix))
+    return phrases
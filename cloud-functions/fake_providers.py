@@ -0,0 +1,381 @@
+"""
+Local stand-ins for the Gemini and Sarvam SDK clients.
+
+They expose the same attribute paths main.py uses (gemini_client.aio.models,
+sarvam_client.text_to_speech, sarvam_client.speech_to_text_streaming, ...)
+so benchmarks can swap them in without touching the pipeline code, and
+PROVIDERS=fake runs the whole gateway on them (see providers.py). FakeRedis
+stands in for a Redis session store (SESSION_STORE=fake-redis, see sessions.py).
+
+Latencies are a number of seconds or a Latency distribution; together with
+error_rate they are drawn from a seeded RNG, so a load test replays the same
+sequence of delays and failures on every run.
+"""
+import io
+import json
+import time
+import wave
+import math
+import random
+import base64
+import asyncio
+from array import array
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+
+FAKE_GEMINI_REPLY = {
+    "spoken_response": "I am here for you. Can you tell me more?",
+    "clinical_telemetry": {
+        "detected_emotions": ["stress"],
+        "phq9_risk_indicator": "low",
+        "gad7_risk_indicator": "moderate",
+        "requires_crisis_intervention": False,
+        "recommended_resource": None,
+    },
+}
+
+
+class FakeProviderError(Exception):
+    """Injected upstream failure (error_rate)."""
+
+
+class Latency:
+    """
+    A latency distribution, in seconds.
+    fixed: always mean_s; uniform: mean_s ± jitter_s; normal: mean_s with
+    standard deviation jitter_s; lognormal: median mean_s with a long tail
+    (sigma = jitter_s / mean_s), which is what real provider latencies look like.
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, mean_s: float, jitter_s: float = 0.0, distribution: str = "fixed"):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.mean_s = mean_s
+        self.jitter_s = jitter_s
+        self.distribution = distribution
+
+    @classmethod
+    def parse(cls, spec) -> "Latency":
+        """"0.8", "uniform:0.8:0.2", "lognormal:1.2:0.4" or an existing Latency."""
+        if isinstance(spec, Latency):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls(float(spec))
+        parts = str(spec).split(":")
+        if len(parts) == 1:
+            return cls(float(parts[0]))
+        return cls(float(parts[1]), float(parts[2]) if len(parts) > 2 else 0.0, parts[0])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == "fixed" or not self.jitter_s or not self.mean_s:
+            value = self.mean_s
+        elif self.distribution == "uniform":
+            value = rng.uniform(self.mean_s - self.jitter_s, self.mean_s + self.jitter_s)
+        elif self.distribution == "normal":
+            value = rng.gauss(self.mean_s, self.jitter_s)
+        else:
+            value = rng.lognormvariate(math.log(self.mean_s), self.jitter_s / self.mean_s)
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"Latency({self.distribution}:{self.mean_s}:{self.jitter_s})"
+
+
+class _Behaviour:
+    """Seeded latency + error injection shared by one fake client's stages."""
+
+    def __init__(self, error_rate: float, seed: int):
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.errors = 0
+
+    def delay(self, latency) -> float:
+        return Latency.parse(latency).sample(self.rng)
+
+    def maybe_fail(self, stage: str):
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise FakeProviderError(f"Injected {stage} failure")
+
+
+def silent_wav_base64(duration_s: float = 0.5, sample_rate: int = 16000) -> str:
+    """A short silent WAV, standing in for Bulbul output."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b"\x00\x00" * int(duration_s * sample_rate))
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
+def speech_pcm(samples: int, sample_rate: int = 16000) -> bytes:
+    """A steady tone, loud enough to pass the ingest silence gate, standing in for speech."""
+    return array("h", (int(3000 * math.sin(2 * math.pi * 220 * i / sample_rate))
+                       for i in range(samples))).tobytes()
+
+
+# ═══════════════════════════════════════════
+# ═══ GEMINI ═══
+# ═══════════════════════════════════════════
+
+class _FakeModels:
+    """Blocking generate_content, like genai.Client().models."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    def generate_content(self, model, contents, config=None):
+        time.sleep(self._owner.behaviour.delay(self._owner.latency_for(model)))
+        self._owner.behaviour.maybe_fail("llm")
+        return self._owner.make_response(contents)
+
+
+class _FakeAsyncModels:
+    """Non-blocking generate_content, like genai.Client().aio.models."""
+
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        await asyncio.sleep(self._owner.behaviour.delay(self._owner.latency_for(model)))
+        self._owner.behaviour.maybe_fail("llm")
+        return self._owner.make_response(contents)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        """The reply JSON in small slices, with one latency sample spread across them; usage on the last."""
+        self._owner.behaviour.maybe_fail("llm")
+        response = self._owner.make_response(contents)
+        text = response.text
+        size = self._owner.stream_chunk_chars
+        slices = [text[i:i + size] for i in range(0, len(text), size)]
+        latency_s = self._owner.behaviour.delay(self._owner.latency_for(model))
+
+        async def iterate():
+            for index, piece in enumerate(slices):
+                await asyncio.sleep(latency_s / len(slices))
+                last = index == len(slices) - 1
+                yield SimpleNamespace(text=piece, usage_metadata=response.usage_metadata if last else None)
+
+        return iterate()
+
+
+class FakeGeminiClient:
+    def __init__(self, latency_s=1.0, reply: dict = None, stream_chunk_chars: int = 8,
+                 error_rate: float = 0.0, seed: int = 0, unique_replies: bool = False,
+                 model_latency_s: dict = None):
+        self.latency_s = latency_s
+        # Per-model overrides of latency_s, so routing between models can be load tested
+        self.model_latency_s = model_latency_s or {}
+        self.calls_by_model = {}
+        self.stream_chunk_chars = stream_chunk_chars
+        # Number each reply so load tests don't turn every TTS call into a cache hit
+        self.unique_replies = unique_replies
+        self.behaviour = _Behaviour(error_rate, seed)
+        self.reply = reply or FAKE_GEMINI_REPLY
+        self.calls = 0
+        self.models = _FakeModels(self)
+        self.aio = SimpleNamespace(models=_FakeAsyncModels(self))
+
+    def latency_for(self, model: str):
+        self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+        return self.model_latency_s.get(model, self.latency_s)
+
+    def make_response(self, contents):
+        self.calls += 1
+        prompt_tokens = sum(len(str(c).encode("utf-8")) // 4 for c in contents)
+        reply = self.reply
+        if self.unique_replies:
+            reply = {**reply, "spoken_response": f"{reply['spoken_response']} (reply {self.calls})"}
+        return SimpleNamespace(
+            text=json.dumps(reply),
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                cached_content_token_count=0,
+                candidates_token_count=60,
+            ),
+        )
+
+
+# ═══════════════════════════════════════════
+# ═══ SARVAM ═══
+# ═══════════════════════════════════════════
+
+class FakeSTTSocket:
+    """
+    Streaming STT socket. Once it has received `utterance_s` seconds of audio
+    it emits START_SPEECH, END_SPEECH and a final transcript, the way Saaras
+    does once its VAD closes an utterance. Counting audio rather than messages
+    keeps utterances the same length however the gateway packetizes them.
+    """
+
+    def __init__(self, transcript: str, language_code: str, utterance_s: float, owner=None):
+        self._owner = owner
+        self.transcript = transcript
+        self.language_code = language_code
+        self.utterance_s = utterance_s
+        self.chunks_received = 0
+        self._utterance_samples = 0
+        self._events = asyncio.Queue()
+        self._finalizing = set()
+
+    async def transcribe(self, audio: str, encoding: str = "audio/wav", sample_rate: int = 16000):
+        self.chunks_received += 1
+        if not self._utterance_samples:
+            self._events.put_nowait(SimpleNamespace(
+                type="events", data=SimpleNamespace(signal_type="START_SPEECH")))
+        self._utterance_samples += len(base64.b64decode(audio)) // 2
+        if self._utterance_samples >= round(self.utterance_s * sample_rate):
+            self._utterance_samples = 0
+            self._events.put_nowait(SimpleNamespace(
+                type="events", data=SimpleNamespace(signal_type="END_SPEECH")))
+            if self._owner is None:
+                self._events.put_nowait(self._final())
+            else:
+                task = asyncio.create_task(self._finalize())
+                self._finalizing.add(task)
+                task.add_done_callback(self._finalizing.discard)
+
+    def _final(self):
+        return SimpleNamespace(
+            type="data",
+            data=SimpleNamespace(transcript=self.transcript, language_code=self.language_code))
+
+    async def _finalize(self):
+        """The final transcript lands stt_latency_s after END_SPEECH, or as an error event."""
+        behaviour = self._owner.behaviour
+        await asyncio.sleep(behaviour.delay(self._owner.stt_latency_s))
+        try:
+            behaviour.maybe_fail("stt")
+        except FakeProviderError as e:
+            self._events.put_nowait(SimpleNamespace(type="error", data=SimpleNamespace(error=str(e))))
+            return
+        self._events.put_nowait(self._final())
+
+    async def flush(self):
+        pass
+
+    async def recv(self):
+        return await self._events.get()
+
+
+class _FakeSTTStreaming:
+    def __init__(self, owner):
+        self._owner = owner
+
+    @asynccontextmanager
+    async def connect(self, **kwargs):
+        await asyncio.sleep(self._owner.behaviour.delay(self._owner.connect_latency_s))
+        self._owner.behaviour.maybe_fail("stt connect")
+        yield FakeSTTSocket(
+            transcript=self._owner.transcript,
+            language_code=self._owner.language_code,
+            utterance_s=self._owner.utterance_s,
+            owner=self._owner,
+        )
+
+
+class _FakeSTT:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def transcribe(self, file, model=None, language_code=None, mode=None):
+        await asyncio.sleep(self._owner.behaviour.delay(self._owner.stt_latency_s))
+        self._owner.behaviour.maybe_fail("stt")
+        return SimpleNamespace(transcript=self._owner.transcript, language_code=self._owner.language_code)
+
+
+class _FakeTTS:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def convert(self, text, target_language_code, speaker, model=None, pace=1.0,
+                      enable_preprocessing=True):
+        await asyncio.sleep(self._owner.behaviour.delay(self._owner.tts_latency_s))
+        self._owner.behaviour.maybe_fail("tts")
+        self._owner.tts_calls += 1
+        return SimpleNamespace(audios=[self._owner.audio_base64])
+
+
+class FakeSarvamClient:
+    def __init__(self, tts_latency_s=0.2, stt_latency_s=0.2, connect_latency_s=0.05,
+                 utterance_s: float = 0.32,
+                 transcript: str = "Mujhe exams ki bahut tension ho rahi hai",
+                 language_code: str = "hi-IN", error_rate: float = 0.0, seed: int = 0):
+        self.behaviour = _Behaviour(error_rate, seed)
+        self.tts_latency_s = tts_latency_s
+        self.stt_latency_s = stt_latency_s
+        self.connect_latency_s = connect_latency_s
+        self.utterance_s = utterance_s
+        self.transcript = transcript
+        self.language_code = language_code
+        self.audio_base64 = silent_wav_base64()
+        self.tts_calls = 0
+        self.text_to_speech = _FakeTTS(self)
+        self.speech_to_text = _FakeSTT(self)
+        self.speech_to_text_streaming = _FakeSTTStreaming(self)
+
+
+class _FakeRedisPipeline:
+    def __init__(self, owner):
+        self._owner = owner
+        self._commands = []
+
+    def set(self, key, value, ex=None):
+        self._commands.append((key, value, ex))
+        return self
+
+    async def execute(self):
+        await asyncio.sleep(self._owner.latency_s)
+        for key, value, ex in self._commands:
+            self._owner._set(key, value, ex)
+        results, self._commands = [True] * len(self._commands), []
+        return results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+
+
+class FakeRedis:
+    """
+    In-process stand-in for the redis.asyncio client, covering the calls the
+    session store makes (get / set with ex / delete / pipeline). One round
+    trip of `latency_s` per call, like a store across the network.
+    """
+
+    def __init__(self, latency_s: float = 0.001):
+        self.latency_s = latency_s
+        self._data = {}          # key -> (value, expires_at or None)
+
+    def _set(self, key, value, ex=None):
+        self._data[key] = (value.encode() if isinstance(value, str) else value,
+                           time.monotonic() + ex if ex else None)
+
+    async def get(self, key):
+        await asyncio.sleep(self.latency_s)
+        value, expires_at = self._data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        await asyncio.sleep(self.latency_s)
+        self._set(key, value, ex)
+        return True
+
+    async def delete(self, *keys):
+        await asyncio.sleep(self.latency_s)
+        return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction: bool = True):
+        return _FakeRedisPipeline(self)
+
+    async def aclose(self):
+        pass
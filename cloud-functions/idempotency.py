@@ -0,0 +1,181 @@
+"""
+Idempotent retries for POST /api/v1/voice-turn.
+
+Mobile clients on bad networks resend a voice turn when the response is
+slow or lost, and each resend used to run STT, Gemini and TTS again on the
+same audio. Every request now has a key: the client's Idempotency-Key
+header when it sends one, otherwise a fingerprint of the audio bytes and
+every form field that shapes the reply (language, voice, history, audio
+format, session).
+
+* A request whose key is still running joins that run. It is sent the events
+  produced so far, then the rest as they arrive. The run belongs to no single
+  request, so a client that drops its connection and retries still gets the
+  original turn, and its upstream calls are made once.
+* A finished run is kept in a TTLCache (bounded by entry count), and a retry
+  within the TTL is replayed from it. Joins and replays make no upstream
+  calls.
+* A failed run is not kept, so a retry runs the turn again. The gateway's
+  transcript cache (a TTLCache keyed by audio hash and requested language)
+  lets it skip STT when only a later stage failed.
+
+A header key reused with a different request raises KeyConflict instead of
+returning someone else's turn.
+"""
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+
+log = logging.getLogger("mindwell.idempotency")
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of a request's identifying parts (None counts as empty)."""
+    raw = "\x1f".join("" if part is None else str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class KeyConflict(Exception):
+    """An Idempotency-Key already used for a different request."""
+
+
+class TTLCache:
+    """LRU bounded by entry count; entries expire ttl_s after they were stored."""
+
+    def __init__(self, max_entries: int = 256, ttl_s: float = 600.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._clock = clock
+        self._entries = OrderedDict()     # key -> (expires at, value)
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def put(self, key, value):
+        if self.max_entries <= 0 or self.ttl_s <= 0:
+            return
+        self._entries.pop(key, None)
+        self._entries[key] = (self._clock() + self.ttl_s, value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+
+class Run:
+    """One execution of a request: the events it has produced so far, and how it ended."""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.events = []
+        self.error = None
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def _emit(self, event):
+        self.events.append(event)
+        self._wake()
+
+    def _finish(self, error: BaseException = None):
+        self.error = error
+        self.done = True
+        self._wake()
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self):
+        """Every event so far, then the rest as they arrive; re-raises the run's error at the end."""
+        index = 0
+        while True:
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await self._changed.wait()
+
+
+class IdempotentRequests:
+    def __init__(self, max_results: int = 128, ttl_s: float = 600.0):
+        self._results = TTLCache(max_results, ttl_s)   # key -> finished Run
+        self._running = {}                             # key -> Run in progress
+        self._tasks = set()
+        self.stats = {"executed": 0, "joined": 0, "replayed": 0, "failed": 0, "conflicts": 0}
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def find(self, key: str, request_fingerprint: str):
+        """The run to answer this request from (in progress or finished), or None to start one."""
+        run = self._running.get(key)
+        outcome = "joined"
+        if run is None:
+            run, outcome = self._results.get(key), "replayed"
+        if run is None:
+            return None
+        if run.fingerprint != request_fingerprint:
+            self.stats["conflicts"] += 1
+            raise KeyConflict("Idempotency-Key was already used for a different request")
+        self.stats[outcome] += 1
+        log.info(f"[IDEMPOTENCY] Retry {outcome} ({len(run.events)} events ready)")
+        return run
+
+    def start(self, key: str, request_fingerprint: str, events, on_done=None) -> Run:
+        """
+        Drive the async iterator `events` to the end in a task of its own,
+        whether or not anyone is still listening; on_done() runs after it.
+        """
+        run = Run(request_fingerprint)
+        self._running[key] = run
+        self.stats["executed"] += 1
+        task = asyncio.create_task(self._drive(key, run, events, on_done))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return run
+
+    async def _drive(self, key: str, run: Run, events, on_done):
+        error = None
+        try:
+            async for event in events:
+                run._emit(event)
+        except asyncio.CancelledError:
+            error = RuntimeError("The turn was cancelled")
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            self._running.pop(key, None)
+            if error is None:
+                self._results.put(key, run)
+            else:
+                self.stats["failed"] += 1
+            run._finish(error)
+            if on_done is not None:
+                on_done()
+
+    async def close(self):
+        """Cancel runs still in progress (shutdown)."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
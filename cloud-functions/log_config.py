@@ -0,0 +1,108 @@
+"""
+Non-blocking structured logging for the gateway.
+
+Log calls on the event loop only enqueue the record (QueueHandler); a
+QueueListener thread formats it and does the actual stdout write, so a slow
+terminal or log collector never stalls a turn. Every record is tagged with the
+turn it belongs to (turn_id, a contextvar set per turn), and may carry more
+structured fields (stage, duration_ms, ...) passed via `extra=`. LOG_FORMAT
+picks plain text for development or one JSON object per line for collectors.
+
+    LOG_LEVEL=INFO|DEBUG   (DEBUG adds a line per span)
+    LOG_FORMAT=text|json
+"""
+import os
+import sys
+import json
+import uuid
+import queue
+import atexit
+import logging
+import contextvars
+import logging.handlers
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+# Turn being processed in the current task (and the tasks it spawns)
+current_turn_id = contextvars.ContextVar("current_turn_id", default=None)
+
+
+def new_turn_id() -> str:
+    turn_id = uuid.uuid4().hex[:12]
+    current_turn_id.set(turn_id)
+    return turn_id
+
+
+class TurnIdFilter(logging.Filter):
+    """Stamp records with the current turn id. Runs in the caller, before the queue."""
+
+    def filter(self, record):
+        if getattr(record, "turn_id", None) is None:
+            record.turn_id = current_turn_id.get()
+        return True
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS and v is not None}
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = None, fmt: str = None):
+    """Route the "mindwell" logger tree through a queue to a background writer thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+    stream = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream.setFormatter(JSONFormatter())
+    else:
+        stream.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(message)s", "%H:%M:%S"))
+
+    records = queue.SimpleQueue()
+    logger = logging.getLogger("mindwell")
+    logger.setLevel(level)
+    handler = logging.handlers.QueueHandler(records)
+    handler.addFilter(TurnIdFilter())
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(records, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
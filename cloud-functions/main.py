@@ -1,22 +1,130 @@
+import io
 import os
 import json
+import math
+import time
 import asyncio
 import base64
-import traceback
+import logging
+import secrets
+import tempfile
+from datetime import datetime
 from dotenv import load_dotenv
 
 # Load environment variables from .env (checks local directory and parent directory)
 load_dotenv()
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, AsyncExitStack
+
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from google import genai
-from google.genai import types
-from sarvamai import AsyncSarvamAI
+from starlette.datastructures import Headers
+
+from streaming import SpokenResponseExtractor, SentenceSplitter, JSONFlagWatcher
+from ws_protocol import ClientConnection
+from memory import ConversationMemory
+from sessions import make_store, new_session_id, new_token
+from telemetry_store import TelemetryQuery, TelemetrySink
+from turns import TurnQueue, TurnProgress, BARGE_IN_STATS, record_cancellation
+from tts_cache import TTSCache, cache_key as tts_cache_key, load_phrase_list
+from acknowledgments import AcknowledgmentLibrary, StageLatency
+from crisis_cache import CrisisAssetCache, DEFAULT_ASSETS_PATH, build as build_crisis_assets
+from crisis_detector import CrisisDetector, DEFAULT_LEXICON_PATH
+from stt_pool import STTConnectionPool
+from audio_ingest import PCMIngest, INGEST_STATS
+from routing import ModelTier, Route, Router, parse_prices
+from audio_codec import AudioEncoder, AudioFormat, WAV_MIME
+from uploads import (UploadLimitMiddleware, WavSegmenter, read_wav_info, transcribe_segments,
+                     file_digest, detach_upload)
+from idempotency import IdempotentRequests, KeyConflict, TTLCache, fingerprint
+from batch import BatchRunner, file_lines
+from admission import (AdmissionController, Overloaded, TokenBucket, UpstreamLimiter,
+                       upstream_priority, CRISIS, BACKGROUND)
+from providers import LazyModule, make_clients, warm as warm_providers, is_ready as providers_ready
+from log_config import setup_logging, new_turn_id
+from metrics import (REGISTRY, ACTIVE_SESSIONS, TIME_TO_FIRST_AUDIO, span, observe_stage,
+                     add_stage_listener, render as render_metrics)
+
+setup_logging()
+log = logging.getLogger("mindwell.gateway")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: load the crisis asset cache, start background warm-ups and the session / telemetry writers."""
+    if crisis_assets.load(CRISIS_ASSETS_PATH):
+        log.info(f"[CRISIS] Loaded {len(crisis_assets)} crisis assets from {CRISIS_ASSETS_PATH}")
+
+    global client_warmup
+    if CLIENT_WARMUP == "background":
+        client_warmup = asyncio.create_task(warm_clients())
 
-app = FastAPI(title="MindWell AI Core Gateway")
+    # Warm-ups run in the background so startup never waits on Gemini/Sarvam,
+    # and at background priority so they never delay a live turn.
+    warmups = [client_warmup] if client_warmup else []
+    with upstream_priority(BACKGROUND):
+        if CRISIS_CACHE_WARM:
+            warmups.append(asyncio.create_task(after_client_warmup(build_crisis_assets(
+                crisis_assets,
+                translate=crisis_text_for,
+                synthesize=synthesize_speech,
+                languages=LANGUAGE_NAMES.keys(),
+                speakers=CRISIS_CACHE_SPEAKERS,
+            ))))
+        if TTS_PREWARM_FILE and os.path.exists(TTS_PREWARM_FILE):
+            phrases = load_phrase_list(TTS_PREWARM_FILE)
+            warmups.append(asyncio.create_task(after_client_warmup(tts_cache.prewarm(
+                [(text, lang, speaker) for lang, text in phrases for speaker in TTS_PREWARM_SPEAKERS],
+                synthesize=synthesize_speech,
+            ))))
+        if ACK_PHRASES_FILE and os.path.exists(ACK_PHRASES_FILE):
+            warmups.append(asyncio.create_task(after_client_warmup(acknowledgments.build(
+                load_phrase_list(ACK_PHRASES_FILE),
+                speakers=ACK_SPEAKERS,
+                synthesize=synthesize_speech,
+            ))))
+
+    warmups.append(asyncio.create_task(after_client_warmup(stt_pool.start())))
+    session_store.start()
+    if telemetry_sink:
+        telemetry_sink.start()
+
+    yield
+
+    for task in warmups:
+        if not task.done():
+            task.cancel()
+    await idempotent_requests.close()
+    await stt_pool.close()
+    await session_store.close()
+    if telemetry_sink:
+        await telemetry_sink.close()
+    tts_cache.close()
+    audio_encoder.close()
+
+
+async def warm_clients():
+    """Import the SDKs and build the clients in a worker thread, so the event loop keeps serving."""
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(warm_providers, types, sarvam_client, gemini_client)
+    except Exception as e:
+        # Left to the first call that needs a client, which will retry the build
+        log.exception(f"[STARTUP] Client warm-up failed: {e}")
+        return
+    log.info(f"[STARTUP] Clients warm in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+async def after_client_warmup(coro):
+    """Run a startup warm-up once the clients are built, so it never builds them on the event loop."""
+    if client_warmup is not None:
+        await asyncio.shield(client_warmup)
+    return await coro
+
+
+app = FastAPI(title="MindWell AI Core Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,12 +134,122 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize SDK Clients
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """Admission refusals: 503 (or 429) with a Retry-After hint."""
+    log.warning(f"[ADMISSION] {request.url.path} refused: {exc.reason}")
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": "The service is busy. Please retry shortly.", "retry_after_s": exc.retry_after_s},
+        headers={"Retry-After": str(math.ceil(exc.retry_after_s))},
+    )
+
+
+# Initialize SDK Clients (PROVIDERS=fake swaps in local stand-ins, see providers.py)
 SARVAM_API_KEY = os.getenv("SARVAM_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
-sarvam_client = AsyncSarvamAI(api_subscription_key=SARVAM_API_KEY)
-gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+# Cold start: importing google-genai and sarvamai and building their clients
+# is most of the gateway's startup time, so by default it happens after the
+# app is up, in a worker thread, with /readyz answering 503 until it is done
+# (CLIENT_WARMUP=background). "lazy" builds them on first use instead (the
+# first turn pays for it); "eager" builds them at import, before anything is
+# served.
+CLIENT_WARMUP = os.getenv("CLIENT_WARMUP", "background").lower()
+
+sarvam_client, gemini_client = make_clients(SARVAM_API_KEY, GEMINI_API_KEY, lazy=CLIENT_WARMUP != "eager")
+types = LazyModule("google.genai.types")
+if CLIENT_WARMUP == "eager":
+    warm_providers(types)
+client_warmup = None     # background warm-up task, while it runs
+
+# Gemini calls go through the SDK's async client (gemini_client.aio) so a slow
+# generation never stalls the event loop.
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+
+# Model routing (see routing.py): routine turns go to GEMINI_FAST_MODEL, turns
+# with elevated PHQ-9/GAD-7 (>= ROUTER_ESCALATE_AT), a crisis or a lexicon
+# signal go to GEMINI_MODEL. Each tier has its own latency budget (whole call,
+# or first streamed chunk); a timeout, 429 or 5xx moves the turn on to the
+# other tier, then GEMINI_FALLBACK_MODEL if set. An empty GEMINI_FAST_MODEL
+# sends every turn to GEMINI_MODEL.
+GEMINI_TIMEOUT_S = float(os.getenv("GEMINI_TIMEOUT_S", "10"))
+GEMINI_FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", "gemini-2.5-flash-lite")
+GEMINI_FAST_TIMEOUT_S = float(os.getenv("GEMINI_FAST_TIMEOUT_S", "5"))
+GEMINI_FALLBACK_MODEL = os.getenv("GEMINI_FALLBACK_MODEL", "")
+GEMINI_FALLBACK_TIMEOUT_S = float(os.getenv("GEMINI_FALLBACK_TIMEOUT_S", "10"))
+ROUTER_ESCALATE_AT = os.getenv("ROUTER_ESCALATE_AT", "moderate")
+# USD per million tokens (input/output/cached input) for the per-turn cost estimate
+GEMINI_PRICES = parse_prices(os.getenv(
+    "GEMINI_PRICES", "gemini-2.5-flash=0.30/2.50/0.03,gemini-2.5-flash-lite=0.10/0.40/0.01"
+))
+
+
+def model_tier(name: str, model: str, timeout_s: float):
+    if not model:
+        return None
+    return ModelTier(name, model, timeout_s, GEMINI_PRICES.get(model, (0.0, 0.0, 0.0)))
+
+
+model_router = Router(
+    fast=model_tier("fast", GEMINI_FAST_MODEL, GEMINI_FAST_TIMEOUT_S),
+    strong=model_tier("strong", GEMINI_MODEL, GEMINI_TIMEOUT_S),
+    fallback=model_tier("fallback", GEMINI_FALLBACK_MODEL, GEMINI_FALLBACK_TIMEOUT_S),
+    escalate_at=ROUTER_ESCALATE_AT,
+)
+
+# ═══════════════════════════════════════════
+# ═══ ADMISSION CONTROL ═══
+# ═══════════════════════════════════════════
+
+# Per-provider concurrency, rate and queue limits for upstream calls (see
+# admission.py). A call arriving with *_MAX_WAITING calls already queued is
+# shed unless it is part of a crisis turn. Streaming STT sockets are one per
+# session, so MAX_SESSIONS is their cap.
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+GEMINI_RATE_PER_S = float(os.getenv("GEMINI_RATE_PER_S", "0"))
+GEMINI_MAX_WAITING = int(os.getenv("GEMINI_MAX_WAITING", "128"))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "32"))
+TTS_RATE_PER_S = float(os.getenv("TTS_RATE_PER_S", "0"))
+TTS_MAX_WAITING = int(os.getenv("TTS_MAX_WAITING", "128"))
+STT_MAX_CONCURRENCY = int(os.getenv("STT_MAX_CONCURRENCY", "16"))
+STT_RATE_PER_S = float(os.getenv("STT_RATE_PER_S", "0"))
+STT_MAX_WAITING = int(os.getenv("STT_MAX_WAITING", "64"))
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "200"))
+ADMISSION_SHED_PRESSURE = float(os.getenv("ADMISSION_SHED_PRESSURE", "0.5"))
+REST_MAX_INFLIGHT_PER_CLIENT = int(os.getenv("REST_MAX_INFLIGHT_PER_CLIENT", "2"))
+ADMISSION_RETRY_AFTER_S = float(os.getenv("ADMISSION_RETRY_AFTER_S", "5"))
+WS_TRY_AGAIN_LATER = 1013
+
+gemini_limiter = UpstreamLimiter("gemini", GEMINI_MAX_CONCURRENCY, GEMINI_RATE_PER_S, GEMINI_MAX_WAITING)
+tts_limiter = UpstreamLimiter("tts", TTS_MAX_CONCURRENCY, TTS_RATE_PER_S, TTS_MAX_WAITING)
+stt_limiter = UpstreamLimiter("stt", STT_MAX_CONCURRENCY, STT_RATE_PER_S, STT_MAX_WAITING)
+upstream_limiters = (gemini_limiter, tts_limiter, stt_limiter)
+admission = AdmissionController(
+    upstream_limiters,
+    max_sessions=MAX_SESSIONS,
+    shed_pressure=ADMISSION_SHED_PRESSURE,
+    max_client_inflight=REST_MAX_INFLIGHT_PER_CLIENT,
+    retry_after_s=ADMISSION_RETRY_AFTER_S,
+)
+
+
+@asynccontextmanager
+async def upstream_slot(limiter: UpstreamLimiter):
+    """A slot from `limiter`; time spent queued is observed as the <provider>_queue stage."""
+    started = time.perf_counter()
+    try:
+        await limiter.acquire()
+    except Overloaded:
+        observe_stage(f"{limiter.name}_queue", time.perf_counter() - started, outcome="shed")
+        raise
+    observe_stage(f"{limiter.name}_queue", time.perf_counter() - started)
+    try:
+        yield
+    finally:
+        limiter.release()
+
 
 # ═══════════════════════════════════════════
 # ═══ SYSTEM PROMPT & CONFIG ═══
@@ -80,6 +298,17 @@ LANGUAGE_NAMES = {
     'mai-IN': 'Maithili', 'doi-IN': 'Dogri',
 }
 
+
+def language_label(code) -> str:
+    """
+    Metric label for a language code. Codes can come from clients (REST and
+    batch form fields), so anything outside LANGUAGE_NAMES is "other" and
+    /metrics keeps a bounded set of series.
+    """
+    if not code or code == "unknown":
+        return "unknown"
+    return code if code in LANGUAGE_NAMES else "other"
+
 VALID_SPEAKERS = {
     'anushka', 'abhilash', 'manisha', 'vidya', 'arya', 'karun', 'hitesh',
     'aditya', 'ritu', 'priya', 'neha', 'rahul', 'pooja', 'rohan', 'simran',
@@ -94,88 +323,669 @@ VALID_SPEAKERS = {
 # ═══ SHARED PROCESSING PIPELINE ═══
 # ═══════════════════════════════════════════
 
-async def process_transcript(transcript: str, detected_lang: str, chat_history: list, voice_id: str = "ritu"):
+async def generate_gemini(contents, config, model: str = GEMINI_MODEL, timeout_s: float = None):
     """
-    Shared pipeline: Gemini reasoning + TTS synthesis.
-    Returns a dict with spoken_response, audio_base64, telemetry, detected_language.
+    Non-blocking Gemini call, scheduled by the Gemini limiter.
+    Callers queue by priority instead of piling onto the upstream API.
+    timeout_s bounds the upstream call only, not the wait for a slot.
     """
-    detected_lang_name = LANGUAGE_NAMES.get(detected_lang, detected_lang)
+    async with upstream_slot(gemini_limiter):
+        return await asyncio.wait_for(gemini_client.aio.models.generate_content(
+            model=model,
+            contents=contents,
+            config=config
+        ), timeout_s)
+
+
+CRISIS_MESSAGE = (
+    "I hear how much pain you are in right now. Please know you are not alone. "
+    "Let me connect you directly to support services. Please call Tele-MANAS at 14416."
+)
+CRISIS_FALLBACK = "I hear how much pain you are in right now. Please know you are not alone."
+DEFAULT_SPOKEN_RESPONSE = "I am here for you. Can you tell me more?"
+
+# Crisis asset cache: built offline with `python crisis_cache.py`, loaded at
+# startup, and optionally filled in the background when CRISIS_CACHE_WARM is set.
+CRISIS_ASSETS_PATH = os.getenv("CRISIS_ASSETS_PATH", DEFAULT_ASSETS_PATH)
+CRISIS_CACHE_WARM = os.getenv("CRISIS_CACHE_WARM", "false").lower() in ("1", "true", "yes")
+CRISIS_CACHE_SPEAKERS = [s.strip() for s in os.getenv("CRISIS_CACHE_SPEAKERS", "ritu").split(",") if s.strip()]
+crisis_assets = CrisisAssetCache()
+
+# Crisis fast path: a local lexicon match on the transcript starts the safety
+# message before any LLM call; Gemini still runs alongside for the telemetry.
+CRISIS_FAST_PATH = os.getenv("CRISIS_FAST_PATH", "true").lower() in ("1", "true", "yes")
+CRISIS_LEXICON_PATH = os.getenv("CRISIS_LEXICON_PATH", DEFAULT_LEXICON_PATH)
+crisis_detector = CrisisDetector.from_file(CRISIS_LEXICON_PATH) if CRISIS_FAST_PATH else None
+
+# Bulbul settings, and the TTS cache in front of them: in-memory LRU bounded
+# by TTS_CACHE_MAX_BYTES, plus an sqlite tier when TTS_CACHE_DB is set. The
+# sqlite tier keeps at most TTS_CACHE_DB_MAX_BYTES (least recently used rows
+# go first), and no row longer than TTS_CACHE_DB_MAX_AGE_S: it holds the
+# audio of users' replies, not only the prewarmed phrases.
+TTS_MODEL = "bulbul:v3"
+TTS_PACE = 1.0
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+TTS_CACHE_DB = os.getenv("TTS_CACHE_DB") or None
+TTS_CACHE_DB_MAX_BYTES = int(os.getenv("TTS_CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+TTS_CACHE_DB_MAX_AGE_S = float(os.getenv("TTS_CACHE_DB_MAX_AGE_S", str(7 * 86400)))
+TTS_PREWARM_FILE = os.getenv("TTS_PREWARM_FILE", os.path.join(os.path.dirname(__file__), "tts_prewarm.txt"))
+TTS_PREWARM_SPEAKERS = [s.strip() for s in os.getenv("TTS_PREWARM_SPEAKERS", "ritu").split(",") if s.strip()]
+tts_cache = TTSCache(max_bytes=TTS_CACHE_MAX_BYTES, disk_path=TTS_CACHE_DB,
+                     disk_max_bytes=TTS_CACHE_DB_MAX_BYTES, disk_max_age_s=TTS_CACHE_DB_MAX_AGE_S)
+
+# Compressed reply audio (see audio_codec.py). WAV stays the default; clients
+# opt in with ?audio=opus|mp3&bitrate=<kbps> (REST: audio_format / audio_bitrate).
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+AUDIO_BITRATE_KBPS = int(os.getenv("AUDIO_BITRATE_KBPS", "32"))
+AUDIO_CHUNK_BYTES = int(os.getenv("AUDIO_CHUNK_BYTES", "16384"))
+AUDIO_ENCODE_WORKERS = int(os.getenv("AUDIO_ENCODE_WORKERS", "4"))
+audio_encoder = AudioEncoder(ffmpeg=FFMPEG_BIN, workers=AUDIO_ENCODE_WORKERS)
+
+# Max concurrent Bulbul calls for the sentences of a single streamed reply
+STREAM_TTS_CONCURRENCY = int(os.getenv("STREAM_TTS_CONCURRENCY", "3"))
+
+# Upstream audio for streaming STT (see audio_ingest.py): client frames are
+# coalesced into STT_PACKET_MS packets (0 forwards each frame), and with
+# STT_SILENCE_GATE on, silence more than STT_SILENCE_HANGOVER_MS after speech
+# is held back, keeping the last STT_PREROLL_MS for the next speech onset.
+STT_PACKET_MS = int(os.getenv("STT_PACKET_MS", "100"))
+STT_SILENCE_GATE = os.getenv("STT_SILENCE_GATE", "true").lower() in ("1", "true", "yes")
+STT_SILENCE_DBFS = float(os.getenv("STT_SILENCE_DBFS", "-50"))
+STT_PREROLL_MS = int(os.getenv("STT_PREROLL_MS", "300"))
+STT_SILENCE_HANGOVER_MS = int(os.getenv("STT_SILENCE_HANGOVER_MS", "1000"))
+STT_KEEPALIVE_MS = int(os.getenv("STT_KEEPALIVE_MS", "5000"))
+
+# Default reply mode for /ws/conversation; clients override with ?stream=1|0
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# Acknowledgments (see acknowledgments.py): short phrases synthesized at
+# startup; one is sent as a turn starts when its reply is expected, from the
+# measured stage latencies, to take longer than ACK_THRESHOLD_S. An empty
+# ACK_PHRASES_FILE turns them off.
+ACK_PHRASES_FILE = os.getenv("ACK_PHRASES_FILE", os.path.join(os.path.dirname(__file__), "acknowledgments.txt"))
+ACK_SPEAKERS = [s.strip() for s in os.getenv("ACK_SPEAKERS", "ritu").split(",") if s.strip()]
+ACK_THRESHOLD_S = float(os.getenv("ACK_THRESHOLD_S", "1.5"))
+# Stages between a turn starting and its first reply audio, by reply mode
+# (stream or full); the llm and tts spans include their queue waits.
+ACK_STAGES = {
+    True: ("gemini_queue", "llm_first_token", "tts"),
+    False: ("llm", "tts"),
+}
+acknowledgments = AcknowledgmentLibrary()
+stage_latency = StageLatency()
+add_stage_listener(stage_latency.observe)
+
+# Conversation memory: last K turns verbatim, older turns folded into a summary
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "6"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", GEMINI_MODEL)
+MAX_CHAT_HISTORY_BYTES = int(os.getenv("MAX_CHAT_HISTORY_BYTES", str(64 * 1024)))
 
-    print(f"[PIPELINE] Language: {detected_lang} ({detected_lang_name})")
-    print(f"[PIPELINE] Transcript: {transcript[:100]}")
+# Session state behind resume tokens (memory | sqlite:<path> | redis://... |
+# fake-redis, see sessions.py); written behind the turn, in batches
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", "1800"))
+SESSION_FLUSH_INTERVAL_S = float(os.getenv("SESSION_FLUSH_INTERVAL_S", "0.5"))
+session_store = make_store(SESSION_STORE, ttl_s=SESSION_TTL_S, flush_interval_s=SESSION_FLUSH_INTERVAL_S)
+
+# Per-turn clinical telemetry, appended to day partitions under TELEMETRY_DIR
+# (unset: not persisted) and queried through /api/v1/telemetry/*, which needs
+# TELEMETRY_API_KEY as a bearer token. See telemetry_store.py.
+TELEMETRY_DIR = os.getenv("TELEMETRY_DIR", "")
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "500"))
+TELEMETRY_FLUSH_INTERVAL_S = float(os.getenv("TELEMETRY_FLUSH_INTERVAL_S", "1.0"))
+TELEMETRY_MAX_QUEUE = int(os.getenv("TELEMETRY_MAX_QUEUE", "10000"))
+TELEMETRY_RETENTION_DAYS = int(os.getenv("TELEMETRY_RETENTION_DAYS", "0"))
+TELEMETRY_API_KEY = os.getenv("TELEMETRY_API_KEY", "")
+telemetry_sink = TelemetrySink(
+    TELEMETRY_DIR,
+    batch_size=TELEMETRY_BATCH_SIZE,
+    flush_interval_s=TELEMETRY_FLUSH_INTERVAL_S,
+    max_queue=TELEMETRY_MAX_QUEUE,
+    retention_days=TELEMETRY_RETENTION_DAYS,
+) if TELEMETRY_DIR else None
+telemetry_query = TelemetryQuery(TELEMETRY_DIR) if TELEMETRY_DIR else None
+
+# Per-session turn queue (see turns.py for the merge / stale / overflow policies)
+TURN_QUEUE_MAXSIZE = int(os.getenv("TURN_QUEUE_MAXSIZE", "3"))
+TURN_MERGE_WINDOW_S = float(os.getenv("TURN_MERGE_WINDOW_S", "2.0"))
+TURN_MAX_AGE_S = float(os.getenv("TURN_MAX_AGE_S", "30"))
+# Cancel the running turn when the user starts speaking over it
+BARGE_IN = os.getenv("BARGE_IN", "true").lower() in ("1", "true", "yes")
+
+# Saaras streaming STT. Sessions take an already-open socket from the warm
+# pool (STT_POOL_SIZE=0 disables it) and connect directly when it is empty.
+STT_STREAM_PARAMS = dict(
+    language_code="unknown",
+    model="saaras:v3",
+    mode="transcribe",
+    high_vad_sensitivity="true",
+    vad_signals="true",
+    input_audio_codec="pcm_s16le",
+    sample_rate="16000",
+)
+stt_pool = STTConnectionPool(
+    connect=lambda: sarvam_client.speech_to_text_streaming.connect(**STT_STREAM_PARAMS),
+    size=int(os.getenv("STT_POOL_SIZE", "2")),
+    max_size=int(os.getenv("STT_POOL_MAX", "32")),
+    max_idle_s=float(os.getenv("STT_POOL_MAX_IDLE_S", "60")),
+    health_interval_s=float(os.getenv("STT_POOL_HEALTH_INTERVAL_S", "15")),
+)
+
+SUMMARY_PROMPT = """
+You maintain a running summary of a mental health screening conversation between a student and MindWell.
+Update the summary with the new turns below. Keep what matters for continuity of care: the student's
+main concerns, life context, coping strategies discussed, and any mention of self-harm or crisis.
+Write at most 120 words, in English, as plain prose. Respond with ONLY the updated summary.
+"""
+
+
+def history_content(sender: str, text: str):
+    """
+    Content object for one history message. Not cached process-wide, which
+    would keep users' words beyond their session: a WebSocket session's
+    ConversationMemory.as_messages(history_content) keeps them per turn.
+    """
+    return types.Content(role="user" if sender == "user" else "model", parts=[types.Part.from_text(text=text)])
+
+
+def build_gemini_messages(transcript: str, detected_lang: str, chat_history: list) -> list:
+    """
+    Prior turns + the new utterance with a language hint (system prompt goes
+    via config). chat_history holds {sender, text} dicts, or Content objects
+    already built by history_content.
+    """
+    detected_lang_name = LANGUAGE_NAMES.get(detected_lang, detected_lang)
 
-    # ─── Build Gemini Messages ───
     messages = [
-        types.Content(role="user", parts=[types.Part.from_text(text=f"System Context: {SYSTEM_PROMPT}")])
+        history_content(msg.get("sender"), msg.get("text", "")) if isinstance(msg, dict) else msg
+        for msg in chat_history
     ]
 
-    for msg in chat_history:
-        messages.append(types.Content(
-            role="user" if msg.get("sender") == "user" else "model",
-            parts=[types.Part.from_text(text=msg.get("text", ""))]
-        ))
-
     lang_hint = f"[The user is speaking in {detected_lang_name} ({detected_lang}). Respond in {detected_lang_name}.]"
     messages.append(types.Content(
         role="user",
         parts=[types.Part.from_text(text=f"{lang_hint}\n\nUser says: {transcript}")]
     ))
+    return messages
 
-    # ─── Gemini Call ───
-    gemini_response = gemini_client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=messages,
-        config=types.GenerateContentConfig(
-            response_mime_type="application/json",
-            temperature=0.4
-        )
+
+def reply_config():
+    """
+    JSON reply config, with the system prompt as system_instruction. It comes
+    first and never changes, so Gemini's implicit prefix caching covers it
+    whenever the whole prompt is long enough; no explicit cache is kept, as
+    the ~300-token prompt is under every model's explicit-cache minimum.
+    """
+    return types.GenerateContentConfig(
+        system_instruction=SYSTEM_PROMPT,
+        response_mime_type="application/json",
+        temperature=0.4
     )
 
-    ai_output = json.loads(gemini_response.text)
-    spoken_text = ai_output.get("spoken_response", "I am here for you. Can you tell me more?")
-    telemetry = ai_output.get("clinical_telemetry", {})
-
-    print(f"[PIPELINE] AI Response: {spoken_text[:100]}")
-
-    # ─── Crisis Handling ───
-    if telemetry.get("requires_crisis_intervention"):
-        crisis_msgs = [
-            types.Content(role="user", parts=[types.Part.from_text(
-                text=f"Translate this crisis message into {detected_lang_name}: "
-                     f"'I hear how much pain you are in right now. Please know you are not alone. "
-                     f"Let me connect you directly to support services. Please call Tele-MANAS at 14416.'"
-                     f"\n\nRespond with ONLY the translated text, nothing else."
-            )])
-        ]
+
+def log_usage(usage, label: str = "reply"):
+    """Per-turn input-token accounting; cached= shows Gemini's implicit prefix-cache hits."""
+    if usage is None:
+        return
+    log.info(f"[TOKENS] {label}: input={usage.prompt_token_count} "
+             f"cached={usage.cached_content_token_count or 0} "
+             f"output={usage.candidates_token_count}")
+
+
+def record_route(route: Route, attempts: list, usage=None):
+    """Per-turn routing record: latency of each model attempt, estimated cost, one [ROUTER] line."""
+    if not attempts:
+        return
+    for attempt in attempts:
+        LLM_CALL_SECONDS.observe(attempt.seconds, model=attempt.tier.model, outcome=attempt.outcome)
+    final = attempts[-1]
+    cost = final.tier.cost_usd(usage) if final.outcome == "ok" else 0.0
+    if cost:
+        LLM_COST_USD.inc(cost, model=final.tier.model)
+    latency_ms = round(sum(attempt.seconds for attempt in attempts) * 1000, 1)
+    log.info(f"[ROUTER] {route.reason} -> {final.tier.name} ({final.tier.model}): {final.outcome}, "
+             f"{len(attempts)} attempt(s), {latency_ms:.0f}ms, ${cost:.6f}",
+             extra={"route_reason": route.reason, "tier": final.tier.name, "model": final.tier.model,
+                    "attempts": len(attempts), "latency_ms": latency_ms, "cost_usd": round(cost, 8)})
+
+
+async def generate_reply(contents, model: str = GEMINI_MODEL, timeout_s: float = None):
+    """Reply call; logs its token usage."""
+    response = await generate_gemini(contents=contents, config=reply_config(), model=model, timeout_s=timeout_s)
+    log_usage(getattr(response, "usage_metadata", None))
+    return response
+
+
+async def close_stream(stream):
+    """Close a Gemini response stream early, releasing its upstream HTTP stream."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
         try:
-            crisis_response = gemini_client.models.generate_content(
-                model="gemini-2.5-flash",
-                contents=crisis_msgs,
-                config=types.GenerateContentConfig(temperature=0.1)
-            )
-            spoken_text = crisis_response.text.strip().strip('"')
+            await aclose()
+        except Exception as e:
+            log.debug(f"[LLM] Closing reply stream failed: {e}")
+
+
+async def open_reply_stream(contents, model: str, timeout_s: float = None):
+    """
+    Streamed reply call. Waits for the first chunk (within timeout_s) so a
+    slow or failing model can still be swapped out; returns (first chunk or
+    None, rest of the stream). A stream that times out or fails before its
+    first chunk is closed before the error propagates.
+    """
+    async def first_chunk():
+        stream = await gemini_client.aio.models.generate_content_stream(
+            model=model, contents=contents, config=reply_config()
+        )
+        try:
+            return await anext(aiter(stream)), stream
+        except StopAsyncIteration:
+            return None, stream
+        except BaseException:
+            # Includes the cancellation wait_for uses for the timeout
+            await close_stream(stream)
+            raise
+
+    return await asyncio.wait_for(first_chunk(), timeout_s)
+
+
+async def crisis_text_for(detected_lang: str) -> str:
+    """
+    Tele-MANAS safety message in the user's language (live Gemini translation).
+    Raises on failure so callers never cache the English fallback by mistake.
+    """
+    if detected_lang == "en-IN":
+        return CRISIS_MESSAGE
+
+    detected_lang_name = LANGUAGE_NAMES.get(detected_lang, detected_lang)
+    crisis_msgs = [
+        types.Content(role="user", parts=[types.Part.from_text(
+            text=f"Translate this crisis message into {detected_lang_name}: "
+                 f"'{CRISIS_MESSAGE}'"
+                 f"\n\nRespond with ONLY the translated text, nothing else."
+        )])
+    ]
+    async with span("crisis_translate", language_label(detected_lang)):
+        crisis_response = await generate_gemini(
+            contents=crisis_msgs,
+            config=types.GenerateContentConfig(temperature=0.1)
+        )
+    return crisis_response.text.strip().strip('"')
+
+
+async def crisis_response(detected_lang: str, voice_id: str):
+    """
+    Safety message text + audio for a crisis turn.
+    Served from the crisis asset cache with zero upstream calls; on a miss it
+    is translated and synthesized live, and the result is cached.
+    """
+    _, selected_speaker = resolve_voice(detected_lang, voice_id)
+
+    asset = crisis_assets.get(detected_lang, selected_speaker)
+    if asset:
+        log.info(f"[CRISIS] Served cached asset ({detected_lang}, {selected_speaker})")
+        return asset.text, asset.audio_base64
+
+    text = crisis_assets.text(detected_lang)
+    cacheable = True
+    if text is None:
+        try:
+            text = await crisis_text_for(detected_lang)
         except Exception:
-            spoken_text = "I hear how much pain you are in right now. Please know you are not alone."
+            text = CRISIS_FALLBACK
+            cacheable = False
+
+    audio_base64 = await synthesize_speech(text, detected_lang, voice_id)
+    if cacheable:
+        crisis_assets.put(detected_lang, selected_speaker, text, audio_base64)
+    return text, audio_base64
+
+
+def detect_crisis(transcript: str):
+    """Lexicon check on the transcript, before any LLM call. None when the fast path is off."""
+    if crisis_detector is None:
+        return None
+    started = time.perf_counter()
+    detection = crisis_detector.detect(transcript)
+    observe_stage("crisis_detect", time.perf_counter() - started)
+    if detection.high:
+        log.info(f"[CRISIS] Fast path: lexicon hit ({', '.join(detection.languages)})")
+    return detection
+
+
+async def fast_crisis_reply(transcript: str, detected_lang: str, chat_history: list, voice_id: str,
+                            progress: TurnProgress, send_chunk=None):
+    """
+    Crisis turn flagged by detect_crisis(): the safety message is fetched at
+    once — and passed to send_chunk(0, text, audio_base64) as soon as it is
+    ready — while the Gemini call runs alongside to fill in the telemetry.
+    Both run at crisis priority, ahead of every other queued upstream call.
+    progress.protected is set until the message is sent (by the caller when
+    there is no send_chunk), so barge-in cannot cut it off.
+    Returns (spoken_text, audio_base64, telemetry).
+    """
+    with upstream_priority(CRISIS):
+        draft = asyncio.create_task(draft_reply(transcript, detected_lang, chat_history, TurnProgress(),
+                                                model_router.strong_route("crisis")))
+    try:
+        progress.stage = "tts"
+        progress.protected = True
+        with upstream_priority(CRISIS):
+            spoken_text, audio_base64 = await crisis_response(detected_lang, voice_id)
+        if send_chunk is not None:
+            await send_chunk(0, spoken_text, audio_base64)
+            progress.delivered.append(spoken_text)
+            progress.protected = False
+        try:
+            _, telemetry = await draft
+            outcome = "confirmed" if telemetry.get("requires_crisis_intervention") else "overruled"
+        except Exception as e:
+            log.warning(f"[CRISIS] Telemetry call failed on a fast-path turn: {e}")
+            telemetry, outcome = {}, "llm_failed"
+    except BaseException:
+        draft.cancel()
+        await asyncio.gather(draft, return_exceptions=True)
+        raise
 
-    # ─── TTS ───
+    CRISIS_FAST_PATH_TURNS.inc(outcome=outcome)
+    # The safety message has been given either way; record it as such
+    return spoken_text, audio_base64, {**telemetry, "requires_crisis_intervention": True, "crisis_fast_path": True}
+
+
+def record_telemetry(session_id, channel: str, detected_lang: str, telemetry: dict):
+    """Queue a turn's telemetry for the telemetry store, if one is configured."""
+    if telemetry_sink is not None and telemetry:
+        telemetry_sink.record(session_id, channel, detected_lang, telemetry)
+
+
+async def summarize_turns(previous_summary: str, turns: list) -> str:
+    """Background memory fold: previous summary + evicted turns -> new summary."""
+    transcript = "\n".join(
+        f"Student: {turn.user_text}\nMindWell: {turn.ai_text}" for turn in turns
+    )
+    with upstream_priority(BACKGROUND):
+        response = await generate_gemini(
+            contents=[types.Content(role="user", parts=[types.Part.from_text(
+                text=f"{SUMMARY_PROMPT}\nCurrent summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}"
+            )])],
+            config=types.GenerateContentConfig(temperature=0.2),
+            model=MEMORY_SUMMARY_MODEL
+        )
+    return response.text
+
+
+def resolve_voice(detected_lang: str, voice_id: str):
+    """Map the detected language / requested voice onto what Bulbul supports."""
     tts_language = detected_lang if detected_lang in TTS_SUPPORTED_LANGUAGES else "hi-IN"
     selected_speaker = voice_id if voice_id in VALID_SPEAKERS else "ritu"
+    return tts_language, selected_speaker
 
-    tts_response = await sarvam_client.text_to_speech.convert(
-        text=spoken_text,
-        target_language_code=tts_language,
-        speaker=selected_speaker,
-        model="bulbul:v3",
-        pace=1.0,
-        enable_preprocessing=True
-    )
 
-    print(f"[PIPELINE] TTS Language: {tts_language}, Speaker: {selected_speaker}")
+async def synthesize_speech(text: str, detected_lang: str, voice_id: str) -> str:
+    """Bulbul v3 TTS behind the content-addressed TTS cache; returns base64 WAV."""
+    tts_language, selected_speaker = resolve_voice(detected_lang, voice_id)
+    upstream = False
+
+    async def convert():
+        nonlocal upstream
+        upstream = True
+        async with upstream_slot(tts_limiter):
+            tts_response = await sarvam_client.text_to_speech.convert(
+                text=text,
+                target_language_code=tts_language,
+                speaker=selected_speaker,
+                model=TTS_MODEL,
+                pace=TTS_PACE,
+                enable_preprocessing=True
+            )
+        return tts_response.audios[0]
+
+    key = tts_cache_key(text, tts_language, selected_speaker, TTS_MODEL, TTS_PACE)
+    async with span("tts", language_label(tts_language)) as tts_span:
+        audio_base64 = await tts_cache.get_or_synthesize(key, convert)
+        if not upstream:
+            tts_span.outcome = "cached"
+    return audio_base64
+
+
+async def process_transcript(transcript: str, detected_lang: str, chat_history: list,
+                             voice_id: str = "ritu", progress: TurnProgress = None, route: Route = None):
+    """
+    Shared pipeline: Gemini reasoning + TTS synthesis.
+    Returns a dict with spoken_response, audio_base64, telemetry, detected_language.
+    progress, if given, tracks the stage reached for barge-in accounting.
+    route picks the Gemini model (model_router); the strong model by default.
+    """
+    progress = progress or TurnProgress()
+    spoken_text, telemetry = await draft_reply(transcript, detected_lang, chat_history, progress, route)
+    spoken_text, audio_base64 = await voice_reply(spoken_text, telemetry, detected_lang, voice_id, progress)
+
+    return {
+        "user_transcript": transcript,
+        "spoken_response": spoken_text,
+        "audio_base64": audio_base64,
+        "telemetry": telemetry,
+        "detected_language": {
+            "code": detected_lang,
+            "name": LANGUAGE_NAMES.get(detected_lang, detected_lang),
+        }
+    }
+
+
+async def draft_reply(transcript: str, detected_lang: str, chat_history: list, progress: TurnProgress,
+                      route: Route = None):
+    """Gemini half of process_transcript: (spoken_text, telemetry)."""
+    log.info(f"[PIPELINE] Language: {detected_lang} ({LANGUAGE_NAMES.get(detected_lang, detected_lang)})")
+    log.debug(f"[PIPELINE] Transcript: {transcript[:100]}")
+
+    route = route or model_router.strong_route()
+    contents = build_gemini_messages(transcript, detected_lang, chat_history)
+    attempts = []
+    usage = None
+
+    async def attempt(tier: ModelTier):
+        nonlocal usage
+        response = await generate_reply(contents, tier.model, tier.timeout_s)
+        # Parsed here so a malformed reply falls back like a failed call
+        ai_output = json.loads(response.text)
+        usage = getattr(response, "usage_metadata", None)
+        return ai_output
+
+    progress.stage = "llm"
+    try:
+        async with span("llm", language_label(detected_lang)):
+            ai_output, _ = await model_router.call(route, attempt, attempts)
+    finally:
+        record_route(route, attempts, usage)
+
+    spoken_text = ai_output.get("spoken_response", DEFAULT_SPOKEN_RESPONSE)
+    log.debug(f"[PIPELINE] AI Response: {spoken_text[:100]}")
+    return spoken_text, ai_output.get("clinical_telemetry", {})
+
+
+async def voice_reply(spoken_text: str, telemetry: dict, detected_lang: str, voice_id: str,
+                      progress: TurnProgress):
+    """
+    Crisis handling + TTS half of process_transcript: (spoken_text, audio_base64).
+    On a crisis turn the text is replaced by the translated safety message,
+    and progress.protected is left set for the caller to clear once sent.
+    """
+    progress.stage = "tts"
+    try:
+        if telemetry.get("requires_crisis_intervention"):
+            progress.protected = True
+            with upstream_priority(CRISIS):
+                spoken_text, audio_base64 = await crisis_response(detected_lang, voice_id)
+        else:
+            audio_base64 = await synthesize_speech(spoken_text, detected_lang, voice_id)
+    except asyncio.CancelledError:
+        progress.tts_cancelled += 1
+        raise
+
+    tts_language, selected_speaker = resolve_voice(detected_lang, voice_id)
+    log.info(f"[PIPELINE] TTS Language: {tts_language}, Speaker: {selected_speaker}")
+    return spoken_text, audio_base64
+
+
+async def stream_transcript(transcript: str, detected_lang: str, chat_history: list,
+                            send_chunk, voice_id: str = "ritu", progress: TurnProgress = None,
+                            route: Route = None):
+    """
+    Streaming variant of process_transcript.
+
+    Gemini's JSON is streamed; each sentence of spoken_response goes to TTS as
+    soon as it is complete, and send_chunk(seq, text, audio_base64) is awaited
+    for every sentence, in order, while the rest is still generating.
+    On a crisis turn, as soon as requires_crisis_intervention streams in (at
+    the latest once the JSON is complete), the model's undelivered sentences
+    are dropped, no more of its text is scheduled, and the safety message is
+    the next chunk sent; progress.protected is set until it has gone out.
+    Returns the same dict as process_transcript, with audio_base64=None.
+    Sentences are appended to progress.delivered as they are sent, so a
+    cancelled (barged-in) turn knows exactly what the user heard.
+    route picks the Gemini model; models can only be switched before the
+    first chunk arrives.
+    """
+    progress = progress or TurnProgress()
+    route = route or model_router.strong_route()
+    detected_lang_name = LANGUAGE_NAMES.get(detected_lang, detected_lang)
+
+    log.info(f"[PIPELINE] Language: {detected_lang} ({detected_lang_name}) [streaming]")
+    log.debug(f"[PIPELINE] Transcript: {transcript[:100]}")
+
+    tts_slots = asyncio.Semaphore(STREAM_TTS_CONCURRENCY)
+    pending = asyncio.Queue()   # tasks returning (text, audio_base64), in delivery order
+    scheduled = []
+    tts_tasks = []
+    delivered = progress.delivered
+    crisis_watch = JSONFlagWatcher("requires_crisis_intervention")
+    safety = None               # task fetching the crisis message, once a crisis is flagged
+
+    async def tts(sentence: str):
+        async with tts_slots:
+            return sentence, await synthesize_speech(sentence, detected_lang, voice_id)
+
+    def schedule(sentence: str):
+        scheduled.append(sentence)
+        task = asyncio.create_task(tts(sentence))
+        tts_tasks.append(task)
+        pending.put_nowait(task)
+
+    def flag_crisis():
+        """Drop the model's undelivered sentences and queue the safety message."""
+        nonlocal safety
+        progress.protected = True
+        dropped = sum(not task.done() for task in tts_tasks)
+        for task in tts_tasks:
+            task.cancel()
+        with upstream_priority(CRISIS):
+            safety = asyncio.create_task(crisis_response(detected_lang, voice_id))
+        tts_tasks[:] = [safety]
+        pending.put_nowait(safety)
+        log.info(f"[CRISIS] Flagged mid-stream after {len(delivered)} chunks; {dropped} TTS requests dropped")
+
+    async def deliver():
+        """Send synthesized sentences strictly in order; after a crisis flag, only the safety message."""
+        seq = 0
+        while True:
+            task = await pending.get()
+            if task is None:
+                return
+            await asyncio.wait({task})
+            if safety is not None and task is not safety:
+                if not task.cancelled():
+                    task.exception()   # superseded; a failure here no longer matters
+                continue
+            sentence, audio_base64 = task.result()
+            await send_chunk(seq, sentence, audio_base64)
+            delivered.append(sentence)
+            seq += 1
+            if task is safety:
+                progress.protected = False
+
+    sender = asyncio.create_task(deliver())
+    extractor = SpokenResponseExtractor()
+    splitter = SentenceSplitter()
+    raw = []
+
+    contents = build_gemini_messages(transcript, detected_lang, chat_history)
+    attempts = []
+    usage = None
+
+    def consume(chunk):
+        nonlocal usage
+        text = chunk.text or ""
+        raw.append(text)
+        usage = getattr(chunk, "usage_metadata", None) or usage
+        if safety is None:
+            for sentence in splitter.feed(extractor.feed(text)):
+                schedule(sentence)
+            if crisis_watch.feed(text):
+                flag_crisis()
+
+    try:
+        # ─── Streamed Gemini Call ───
+        progress.stage = "llm"
+        try:
+            async with span("llm", language_label(detected_lang)), upstream_slot(gemini_limiter):
+                started = time.perf_counter()
+                (first, stream), _ = await model_router.call(
+                    route, lambda tier: open_reply_stream(contents, tier.model, tier.timeout_s), attempts
+                )
+                try:
+                    if first is not None:
+                        observe_stage("llm_first_token", time.perf_counter() - started,
+                                      language_label(detected_lang))
+                        consume(first)
+                        async for chunk in stream:
+                            consume(chunk)
+                finally:
+                    # A barge-in or error mid-reply leaves the stream unread
+                    await close_stream(stream)
+        finally:
+            record_route(route, attempts, usage)
+        log_usage(usage)
+        progress.stage = "tts"
+
+        try:
+            ai_output = json.loads("".join(raw))
+        except json.JSONDecodeError:
+            ai_output = {}
+        telemetry = ai_output.get("clinical_telemetry", {})
+
+        # ─── Crisis Handling ───
+        if safety is None and telemetry.get("requires_crisis_intervention"):
+            flag_crisis()   # not spotted while streaming
+        if safety is not None:
+            telemetry = {**telemetry, "requires_crisis_intervention": True}
+        else:
+            for sentence in splitter.flush():
+                schedule(sentence)
+            if not scheduled:
+                # Nothing speakable came back — say the default line.
+                schedule(ai_output.get("spoken_response") or DEFAULT_SPOKEN_RESPONSE)
+
+        pending.put_nowait(None)
+        await sender
+    except BaseException:
+        sender.cancel()
+        for task in tts_tasks:
+            task.cancel()
+        # Cancellation reaches the sentence being delivered through the
+        # sender, so count every synthesis that ended cancelled.
+        await asyncio.gather(sender, *tts_tasks, return_exceptions=True)
+        progress.tts_cancelled += sum(task.cancelled() for task in tts_tasks)
+        raise
+
+    spoken_text = " ".join(delivered)
+    log.debug(f"[PIPELINE] AI Response: {spoken_text[:100]} ({len(delivered)} chunks)")
 
     return {
         "user_transcript": transcript,
         "spoken_response": spoken_text,
-        "audio_base64": tts_response.audios[0],
+        "audio_base64": None,
+        "streamed": True,
         "telemetry": telemetry,
         "detected_language": {
             "code": detected_lang,
@@ -184,6 +994,131 @@ async def process_transcript(transcript: str, detected_lang: str, chat_history:
     }
 
 
+# ═══════════════════════════════════════════
+# ═══ METRICS ═══
+# ═══════════════════════════════════════════
+
+# Turn queues of the open sessions, for the queue-depth gauge
+active_turn_queues = set()
+
+TURNS_DROPPED = REGISTRY.counter(
+    "mindwell_turns_dropped_total", "Queued turns skipped before processing.", ("reason",))
+REGISTRY.callback(
+    "mindwell_turn_queue_depth", "Turns waiting across all sessions.",
+    lambda: sum(len(q) for q in active_turn_queues))
+REGISTRY.callback(
+    "mindwell_tts_cache_bytes", "Audio held in the in-memory TTS cache.",
+    lambda: tts_cache.size_bytes)
+REGISTRY.callback(
+    "mindwell_tts_cache_disk_bytes", "Audio held in the sqlite TTS cache tier.",
+    lambda: tts_cache.disk_bytes)
+REGISTRY.callback(
+    "mindwell_tts_cache_events_total", "TTS cache lookups and evictions.",
+    lambda: dict(tts_cache.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_crisis_cache_events_total", "Crisis asset cache lookups.",
+    lambda: {"hit": crisis_assets.hits, "miss": crisis_assets.misses}, labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_barge_in_total", "Turns cancelled by barge-in, and the upstream work avoided.",
+    lambda: dict(BARGE_IN_STATS), labels=("event",), kind="counter")
+CRISIS_FAST_PATH_TURNS = REGISTRY.counter(
+    "mindwell_crisis_fast_path_total",
+    "Lexicon-flagged crisis turns, by whether Gemini's telemetry agreed.", ("outcome",))
+REPLY_AUDIO_BYTES = REGISTRY.counter(
+    "mindwell_reply_audio_bytes_total", "Reply audio bytes sent, before base64, by format.", ("format",))
+REGISTRY.callback(
+    "mindwell_audio_encode_events_total", "Reply audio encodes, encode cache hits and WAV fallbacks; upload decodes.",
+    lambda: dict(audio_encoder.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_stt_pool_connections", "Streaming STT sockets held by the warm pool, by state.",
+    stt_pool.counts, labels=("state",))
+REGISTRY.callback(
+    "mindwell_stt_pool_events_total", "Warm STT pool hits, misses (direct connects) and socket churn.",
+    lambda: dict(stt_pool.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_upstream_calls", "Upstream calls in flight or queued for a slot, by provider.",
+    lambda: {(l.name, state): getattr(l, state) for l in upstream_limiters for state in ("inflight", "waiting")},
+    labels=("provider", "state"))
+REGISTRY.callback(
+    "mindwell_upstream_queued", "Upstream calls queued for a slot, by provider and priority.",
+    lambda: {(l.name, priority): count for l in upstream_limiters
+             for priority, count in l.waiting_by_priority().items()},
+    labels=("provider", "priority"))
+REGISTRY.callback(
+    "mindwell_upstream_events_total", "Upstream slots granted, queued, shed and abandoned, by provider.",
+    lambda: {(l.name, event): count for l in upstream_limiters for event, count in l.stats.items()},
+    labels=("provider", "event"), kind="counter")
+REGISTRY.callback(
+    "mindwell_admission_pressure", "Fullest upstream queue, 0..1; new work is refused at ADMISSION_SHED_PRESSURE.",
+    lambda: admission.pressure)
+REGISTRY.callback(
+    "mindwell_admission_rejected_total", "Sessions and REST requests refused by admission control.",
+    lambda: dict(admission.rejected), labels=("reason",), kind="counter")
+REGISTRY.callback(
+    "mindwell_session_store_events_total", "Session store loads, hits, saves, batched writes and errors.",
+    lambda: dict(session_store.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_session_store_pending", "Sessions with a save not yet written to the store.",
+    lambda: session_store.pending)
+REGISTRY.callback(
+    "mindwell_stt_ingest_total",
+    "Client audio frames / bytes in and upstream packets / bytes out; silence_dropped_bytes never sent.",
+    lambda: dict(INGEST_STATS), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_acknowledgments_total",
+    "Turn starts by acknowledgment decision: sent, fast (reply expected soon), no_fit, missing (no phrases).",
+    lambda: dict(acknowledgments.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_expected_first_audio_seconds", "Expected wait for a reply's first audio, from stage averages.",
+    lambda: {("stream" if stream else "full"): stage_latency.expected_s(stages)
+             for stream, stages in ACK_STAGES.items()}, labels=("mode",))
+REGISTRY.callback(
+    "mindwell_model_routes_total", "Reply turns by the model tier they were routed to and why.",
+    lambda: dict(model_router.stats), labels=("tier", "reason"), kind="counter")
+REGISTRY.callback(
+    "mindwell_model_fallbacks_total", "Reply calls moved to another model after a timeout or upstream error.",
+    lambda: dict(model_router.fallbacks), labels=("from_model", "to_model"), kind="counter")
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "mindwell_llm_call_seconds",
+    "Reply calls per model attempt (to the first chunk when streamed), by outcome: ok, timeout, error.",
+    ("model", "outcome"))
+LLM_COST_USD = REGISTRY.counter(
+    "mindwell_llm_cost_usd_total", "Estimated Gemini reply spend from token usage and GEMINI_PRICES.", ("model",))
+REGISTRY.callback(
+    "mindwell_rest_idempotency_total",
+    "REST voice turns executed, retries joined to a running turn or replayed, failed runs, key conflicts.",
+    lambda: dict(idempotent_requests.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_transcript_cache_events_total", "REST transcript cache lookups by audio hash.",
+    lambda: dict(transcript_cache.stats), labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_telemetry_events_total", "Turn telemetry records queued, dropped (queue full) and written.",
+    lambda: dict(telemetry_sink.stats) if telemetry_sink else {}, labels=("event",), kind="counter")
+REGISTRY.callback(
+    "mindwell_telemetry_queue_depth", "Telemetry records waiting to be written.",
+    lambda: telemetry_sink.queued if telemetry_sink else 0)
+
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving. Never touches a provider."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: 503 until the background client warm-up (CLIENT_WARMUP) has finished."""
+    if providers_ready(types, sarvam_client, gemini_client) or CLIENT_WARMUP != "background":
+        return {"status": "ready"}
+    return JSONResponse(status_code=503, content={"status": "starting"})
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of stage latencies, gauges and cache counters."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # ═══════════════════════════════════════════
 # ═══ WEBSOCKET STREAMING ENDPOINT ═══
 # ═══════════════════════════════════════════
@@ -193,64 +1128,324 @@ async def websocket_conversation(websocket: WebSocket):
     """
     WebSocket endpoint for natural streaming conversation.
     
+    Query parameters:
+      stream=1|0                                     — streamed replies (default: STREAM_RESPONSES)
+      resume=<token>                                 — continue the conversation of an earlier
+                                                       session (see sessions.py)
+      audio=wav|opus|mp3, bitrate=<kbps>             — reply audio format (default: wav); opus/mp3
+                                                       replies carry audio_stream + audio_mime and
+                                                       the audio follows as audio_chunk messages
+                                                       then audio_end (see ws_protocol.py)
+
+    Subprotocol "mindwell.binary.v1" switches audio to binary frames in both
+    directions (see ws_protocol.py); without it the JSON protocol below applies.
+
     Frontend sends:
       {"type": "audio", "audio": "<base64_pcm>"}   — raw PCM audio chunks
+                                                       (binary protocol: raw PCM frame)
+      {"type": "interrupt"}                          — stop the reply being generated/spoken
       {"type": "end"}                                — end conversation
     
+    A new speech start (with BARGE_IN on) or an interrupt cancels the running
+    turn, including any TTS still pending; only the sentences already sent are
+    kept in the conversation memory.
+
     Backend sends:
+      {"type": "session", "session_id", "resume_token", "resumed", "turns"}
+                                                     — first message; reconnect with
+                                                       ?resume=<resume_token> to continue
       {"type": "speech_start"}                       — VAD detected speech start
       {"type": "speech_end"}                         — VAD detected speech end
-      {"type": "processing"}                         — transcript received, processing
-      {"type": "response", ...}                      — full response with audio
+      {"type": "processing", "transcript"}          — turn started (back-to-back transcripts
+                                                       may arrive merged into one)
+      {"type": "turn_dropped", "transcript"}        — queued turn skipped as stale/overflow
+      {"type": "ack", "text", "audio_base64"}       — short acknowledgment played while a slow
+                                                       reply is prepared; the reply follows it
+      {"type": "response_chunk", "seq", "text", "audio_base64"}
+                                                     — one synthesized sentence (stream mode)
+      {"type": "response", ...}                      — full response with audio; in stream
+                                                       mode audio_base64 is null and this
+                                                       carries the telemetry after the chunks
       {"type": "ready"}                              — ready for next utterance
-      {"type": "error", "detail": "..."}             — error message
+      {"type": "interrupted", "reason", "delivered_chunks"}
+                                                     — running turn cancelled; stop playback
+      {"type": "error", "detail": "..."}             — error message; carries retry_after_s
+                                                       when the turn was shed under load
+
+    While the gateway is saturated (see admission.py) a new session gets an
+    error with retry_after_s and is closed with code 1013 (Try Again Later).
     """
-    await websocket.accept()
-    print("[WS] Client connected")
+    stream_param = websocket.query_params.get("stream")
+    stream_responses = STREAM_RESPONSES if stream_param is None else stream_param.lower() in ("1", "true", "yes")
+
+    audio_format = AudioFormat.negotiate(
+        websocket.query_params.get("audio"), websocket.query_params.get("bitrate"), AUDIO_BITRATE_KBPS)
 
-    chat_history = []
+    client = ClientConnection(websocket)
+    await client.accept()
+    try:
+        end_session = admission.admit_session()
+    except Overloaded as e:
+        # Accept first so the client gets a reason, not just a failed handshake
+        log.warning(f"[ADMISSION] Session refused: {e.reason}")
+        try:
+            await client.send({"type": "error", "detail": "The service is busy. Please try again shortly.",
+                               "retry_after_s": e.retry_after_s})
+            await websocket.close(code=WS_TRY_AGAIN_LATER, reason="overloaded")
+        except Exception:
+            pass
+        return
+    log.info(f"[WS] Client connected (stream={stream_responses}, binary={client.binary}, "
+             f"audio={audio_format.codec})")
+    ACTIVE_SESSIONS.inc()
+
+    memory_options = dict(
+        summarize=summarize_turns,
+        recent_turns=MEMORY_RECENT_TURNS,
+        token_budget=MEMORY_TOKEN_BUDGET,
+    )
+    resume_token = websocket.query_params.get("resume")
+    state = await session_store.load(resume_token) if resume_token else None
+    if state is not None:
+        memory = ConversationMemory.from_state(state, **memory_options)
+        session_id = state.get("session_id") or new_session_id()
+        log.info(f"[WS] Resumed session {session_id} ({len(memory)} recent turns)")
+    else:
+        resume_token = new_token()
+        memory = ConversationMemory(**memory_options)
+        session_id = new_session_id()
+
+    def save_session():
+        session_store.save(resume_token, {**memory.to_state(), "session_id": session_id})
     should_stop = False
 
+    turn_queue = TurnQueue(
+        maxsize=TURN_QUEUE_MAXSIZE,
+        merge_window_s=TURN_MERGE_WINDOW_S,
+        max_age_s=TURN_MAX_AGE_S,
+    )
+    active_turn_queues.add(turn_queue)
+
+    async def notify_dropped(dropped: list, reason: str):
+        for turn in dropped:
+            log.info(f"[TURN] Dropped {reason} turn", extra={"reason": reason})
+            TURNS_DROPPED.inc(reason=reason)
+            await client.send({"type": "turn_dropped", "transcript": turn.transcript})
+
+    current_turn = None      # task running the active turn, if any
+    current_progress = None  # its TurnProgress
+    interrupt_reason = None
+    last_ack = None          # text of the last acknowledgment, not repeated back to back
+
+    def interrupt(reason: str):
+        """Barge-in: cancel the running turn, if there is one and it is not delivering the crisis message."""
+        nonlocal interrupt_reason
+        if current_turn and not current_turn.done():
+            if current_progress.protected:
+                log.info(f"[TURN] Barge-in ({reason}) ignored: crisis message in delivery")
+                BARGE_IN_STATS["ignored_during_crisis"] += 1
+                return
+            log.info(f"[TURN] Interrupted ({reason})")
+            interrupt_reason = reason
+            current_turn.cancel()
+
+    async def run_turn(turn, progress: TurnProgress) -> bool:
+        """One Gemini + TTS turn for a queued PendingTurn. Returns False once the client is gone."""
+        nonlocal last_ack
+        transcript, detected_lang = turn.transcript, turn.language_code
+        new_turn_id()
+        first_audio_sent = False
+        ack_sending = None   # task sending the acknowledgment, if one was chosen
+
+        async def send_audio(msg: dict, reply: bool = True):
+            """WebSocket send, timed; the first reply audio of the turn marks time-to-first-audio."""
+            nonlocal first_audio_sent
+            if reply and ack_sending is not None:
+                await asyncio.wait({ack_sending})   # the reply goes out after the acknowledgment
+            if reply and progress.protected:
+                msg = {**msg, "crisis": True}   # the client keeps playing it through a barge-in
+            audio, mime = None, WAV_MIME
+            if msg.get("audio_base64"):
+                audio = base64.b64decode(msg["audio_base64"])
+                if audio_format.compressed:
+                    async with span("encode", language_label(detected_lang)):
+                        audio, mime = await audio_encoder.encode(audio, audio_format)
+            async with span("ws_send", language_label(detected_lang)):
+                if mime == WAV_MIME:
+                    await client.send_audio(msg)
+                else:
+                    await client.send_audio_stream(msg, audio, mime, AUDIO_CHUNK_BYTES)
+            if audio is not None:
+                REPLY_AUDIO_BYTES.inc(len(audio), format=audio_format.codec if mime != WAV_MIME else "wav")
+            if reply and msg.get("audio_base64") and not first_audio_sent:
+                first_audio_sent = True
+                TIME_TO_FIRST_AUDIO.observe(time.monotonic() - turn.received_at,
+                                            language=language_label(detected_lang),
+                                            mode="stream" if stream_responses else "full")
+
+        async def send_response_chunk(seq: int, text: str, audio_base64: str):
+            await send_audio({
+                "type": "response_chunk",
+                "seq": seq,
+                "text": text,
+                "audio_base64": audio_base64,
+            })
+
+        # Notify frontend we're processing
+        try:
+            await client.send({"type": "processing", "transcript": transcript})
+        except Exception:
+            return False
+
+        # Process through Gemini + TTS
+        try:
+            async with span("turn", language_label(detected_lang)):
+                detection = detect_crisis(transcript)
+                if detection is None or not detection.high:
+                    tts_language, speaker = resolve_voice(detected_lang, "ritu")
+                    expected_s = stage_latency.expected_s(ACK_STAGES[stream_responses], language_label(detected_lang))
+                    ack = acknowledgments.choose(tts_language, speaker, expected_s, ACK_THRESHOLD_S, previous=last_ack)
+                    if ack is not None:
+                        last_ack = ack.text
+                        ack_sending = asyncio.create_task(send_audio(
+                            {"type": "ack", "text": ack.text, "audio_base64": ack.audio_base64}, reply=False))
+                if detection is not None and detection.high:
+                    spoken_text, audio_base64, telemetry = await fast_crisis_reply(
+                        transcript, detected_lang, memory.as_messages(history_content), "ritu", progress,
+                        send_chunk=send_response_chunk if stream_responses else None)
+                    result = {
+                        "user_transcript": transcript,
+                        "spoken_response": spoken_text,
+                        # Non-stream sessions get the safety message in the response itself
+                        "audio_base64": None if stream_responses else audio_base64,
+                        **({"streamed": True} if stream_responses else {}),
+                        "telemetry": telemetry,
+                        "detected_language": {
+                            "code": detected_lang,
+                            "name": LANGUAGE_NAMES.get(detected_lang, detected_lang),
+                        }
+                    }
+                elif stream_responses:
+                    result = await stream_transcript(
+                        transcript=transcript,
+                        detected_lang=detected_lang,
+                        chat_history=memory.as_messages(history_content),
+                        send_chunk=send_response_chunk,
+                        voice_id="ritu",
+                        progress=progress,
+                        route=model_router.route(memory.risk_trajectory, detection, memory.crisis_ever)
+                    )
+                else:
+                    result = await process_transcript(
+                        transcript=transcript,
+                        detected_lang=detected_lang,
+                        chat_history=memory.as_messages(history_content),
+                        voice_id="ritu",
+                        progress=progress,
+                        route=model_router.route(memory.risk_trajectory, detection, memory.crisis_ever)
+                    )
+
+                # Send response to frontend
+                progress.stage = "send"
+                await send_audio({
+                    "type": "response",
+                    **result
+                })
+                progress.protected = False
+                progress.stage = "done"
+
+            # Update conversation memory
+            memory.add_turn(transcript, result["spoken_response"], result["telemetry"])
+            save_session()
+            record_telemetry(session_id, "ws", detected_lang, result["telemetry"])
+
+            # Signal ready for next utterance
+            await client.send({"type": "ready"})
+            log.info("[WS] Response sent, ready for next utterance")
+
+        except Overloaded as e:
+            log.warning(f"[ADMISSION] Turn shed: {e.reason}")
+            try:
+                await client.send({
+                    "type": "error",
+                    "detail": "The service is busy. Please say that again in a moment.",
+                    "retry_after_s": e.retry_after_s
+                })
+            except Exception:
+                return False
+        except Exception as e:
+            log.exception(f"[PIPELINE] Error: {e}")
+            try:
+                await client.send({
+                    "type": "error",
+                    "detail": f"Processing failed: {str(e)}"
+                })
+            except Exception:
+                return False
+        finally:
+            if ack_sending is not None:
+                ack_sending.cancel()
+                await asyncio.gather(ack_sending, return_exceptions=True)
+        return True
+
     try:
-        async with sarvam_client.speech_to_text_streaming.connect(
-            language_code="unknown",
-            model="saaras:v3",
-            mode="transcribe",
-            high_vad_sensitivity="true",
-            vad_signals="true",
-            input_audio_codec="pcm_s16le",
-            sample_rate="16000",
-        ) as stt_socket:
-            print("[WS] Sarvam streaming STT connected")
+        await client.send({"type": "session", "session_id": session_id, "resume_token": resume_token,
+                           "resumed": state is not None, "turns": len(memory)})
+
+        async with AsyncExitStack() as stack:
+            async with span("stt_connect"):
+                stt_socket = await stack.enter_async_context(stt_pool.connection())
+            log.info("[WS] Sarvam streaming STT connected")
+            speech_ended_at = None   # last END_SPEECH, for the STT stage latency
+
+            ingest = PCMIngest(
+                packet_ms=STT_PACKET_MS,
+                gate=STT_SILENCE_GATE,
+                silence_dbfs=STT_SILENCE_DBFS,
+                preroll_ms=STT_PREROLL_MS,
+                hangover_ms=STT_SILENCE_HANGOVER_MS,
+                keepalive_ms=STT_KEEPALIVE_MS,
+            )
+
+            async def send_packets(packets: list):
+                for packet in packets:
+                    await stt_socket.transcribe(
+                        audio=base64.b64encode(packet).decode("ascii"),
+                        encoding="audio/wav",
+                        sample_rate=16000
+                    )
 
             async def forward_audio_to_sarvam():
-                """Receive audio chunks from frontend and forward to Sarvam STT."""
+                """Receive audio chunks from frontend and forward them, coalesced and gated, to Sarvam STT."""
                 nonlocal should_stop
                 try:
                     while not should_stop:
-                        raw = await websocket.receive_text()
-                        msg = json.loads(raw)
-
-                        if msg.get("type") == "audio" and msg.get("audio"):
-                            await stt_socket.transcribe(
-                                audio=msg["audio"],
-                                encoding="audio/wav",
-                                sample_rate=16000
-                            )
-                        elif msg.get("type") == "end":
-                            print("[WS] Client requested end")
+                        # A partial packet goes out if the client pauses mid-packet
+                        try:
+                            msg_type, payload = await asyncio.wait_for(
+                                client.receive(), ingest.flush_after_s if ingest.pending else None)
+                        except asyncio.TimeoutError:
+                            await send_packets(ingest.flush())
+                            continue
+
+                        if msg_type == "audio" and payload:
+                            await send_packets(ingest.feed(payload))
+                        elif msg_type == "interrupt":
+                            interrupt("client")
+                        elif msg_type == "end":
+                            log.info("[WS] Client requested end")
                             should_stop = True
                             break
                 except WebSocketDisconnect:
-                    print("[WS] Client disconnected during audio forward")
+                    log.info("[WS] Client disconnected during audio forward")
                     should_stop = True
                 except Exception as e:
-                    print(f"[WS] Audio forward error: {e}")
+                    log.warning(f"[WS] Audio forward error: {e}")
                     should_stop = True
 
             async def receive_sarvam_events():
                 """Receive events from Sarvam STT (VAD signals + transcripts)."""
-                nonlocal should_stop
+                nonlocal should_stop, speech_ended_at
                 try:
                     while not should_stop:
                         response = await stt_socket.recv()
@@ -260,16 +1455,19 @@ async def websocket_conversation(websocket: WebSocket):
                             signal = getattr(event_data, 'signal_type', None)
 
                             if signal == "START_SPEECH":
-                                print("[VAD] Speech started")
+                                log.debug("[VAD] Speech started")
+                                if BARGE_IN:
+                                    interrupt("speech")
                                 try:
-                                    await websocket.send_json({"type": "speech_start"})
+                                    await client.send({"type": "speech_start"})
                                 except Exception:
                                     break
 
                             elif signal == "END_SPEECH":
-                                print("[VAD] Speech ended")
+                                log.debug("[VAD] Speech ended")
+                                speech_ended_at = time.perf_counter()
                                 try:
-                                    await websocket.send_json({"type": "speech_end"})
+                                    await client.send({"type": "speech_end"})
                                 except Exception:
                                     break
 
@@ -278,58 +1476,34 @@ async def websocket_conversation(websocket: WebSocket):
                             transcript = getattr(transcript_data, 'transcript', '')
                             detected_lang = getattr(transcript_data, 'language_code', 'en-IN') or 'en-IN'
 
+                            if speech_ended_at is not None:
+                                observe_stage("stt", time.perf_counter() - speech_ended_at,
+                                              language_label(detected_lang),
+                                              "ok" if transcript.strip() else "empty")
+                                speech_ended_at = None
+
                             if not transcript or not transcript.strip():
-                                print("[STT] Empty transcript, skipping")
+                                log.info("[STT] Empty transcript, skipping")
                                 continue
 
-                            print(f"[STT] Final transcript: {transcript}")
-                            print(f"[STT] Language: {detected_lang}")
+                            log.debug(f"[STT] Final transcript: {transcript}")
+                            log.info(f"[STT] Language: {detected_lang}")
 
-                            # Notify frontend we're processing
+                            # Hand off to the turn worker; never wait on Gemini/TTS here
+                            dropped = turn_queue.put(transcript, detected_lang)
                             try:
-                                await websocket.send_json({"type": "processing", "transcript": transcript})
+                                await notify_dropped(dropped, "overflow")
                             except Exception:
                                 break
 
-                            # Process through Gemini + TTS
-                            try:
-                                result = await process_transcript(
-                                    transcript=transcript,
-                                    detected_lang=detected_lang,
-                                    chat_history=chat_history,
-                                    voice_id="ritu"
-                                )
-
-                                # Update chat history
-                                chat_history.append({"sender": "user", "text": transcript})
-                                chat_history.append({"sender": "ai", "text": result["spoken_response"]})
-
-                                # Send response to frontend
-                                await websocket.send_json({
-                                    "type": "response",
-                                    **result
-                                })
-
-                                # Signal ready for next utterance
-                                await websocket.send_json({"type": "ready"})
-                                print("[WS] Response sent, ready for next utterance")
-
-                            except Exception as e:
-                                print(f"[PIPELINE] Error: {e}")
-                                traceback.print_exc()
-                                try:
-                                    await websocket.send_json({
-                                        "type": "error",
-                                        "detail": f"Processing failed: {str(e)}"
-                                    })
-                                except Exception:
-                                    break
-
                         elif response.type == "error":
                             error_data = response.data
-                            print(f"[STT] Error: {getattr(error_data, 'error', 'unknown')}")
+                            log.warning(f"[STT] Error: {getattr(error_data, 'error', 'unknown')}")
+                            if speech_ended_at is not None:
+                                observe_stage("stt", time.perf_counter() - speech_ended_at, outcome="error")
+                                speech_ended_at = None
                             try:
-                                await websocket.send_json({
+                                await client.send({
                                     "type": "error",
                                     "detail": f"STT error: {getattr(error_data, 'error', 'unknown')}"
                                 })
@@ -338,69 +1512,498 @@ async def websocket_conversation(websocket: WebSocket):
 
                 except Exception as e:
                     if not should_stop:
-                        print(f"[WS] Sarvam recv error: {e}")
-                        traceback.print_exc()
-
-            # Run both tasks concurrently
-            await asyncio.gather(
-                forward_audio_to_sarvam(),
-                receive_sarvam_events(),
-                return_exceptions=True
-            )
+                        log.exception(f"[WS] Sarvam recv error: {e}")
+
+            async def turn_worker():
+                """Process queued turns one at a time, in order."""
+                nonlocal current_turn, current_progress, interrupt_reason
+                while not should_stop:
+                    turn, dropped = await turn_queue.get()
+                    try:
+                        await notify_dropped(dropped, "stale")
+                    except Exception:
+                        return
+
+                    # Each turn runs as its own task so barge-in can cancel it
+                    # without cancelling the worker.
+                    progress = current_progress = TurnProgress()
+                    interrupt_reason = None
+                    current_turn = asyncio.create_task(run_turn(turn, progress))
+                    try:
+                        await asyncio.wait({current_turn})
+                    except asyncio.CancelledError:
+                        current_turn.cancel()
+                        raise
+
+                    if not current_turn.cancelled():
+                        if not current_turn.result():
+                            return
+                        continue
+                    if progress.stage == "done":
+                        continue    # reply fully sent; only "ready" was cut off
+
+                    # Keep only what the user actually heard
+                    record_cancellation(progress)
+                    memory.add_turn(turn.transcript, " ".join(progress.delivered))
+                    save_session()
+                    log.info(f"[TURN] Cancelled in {progress.stage}: "
+                             f"{len(progress.delivered)} chunks delivered, "
+                             f"{progress.tts_cancelled} TTS requests cancelled")
+                    try:
+                        await client.send({
+                            "type": "interrupted",
+                            "reason": interrupt_reason,
+                            "delivered_chunks": len(progress.delivered),
+                        })
+                    except Exception:
+                        return
+
+            # Run the tasks concurrently; when any ends (client said "end" /
+            # disconnected, or STT failed) tear down the others, which would
+            # otherwise sit in stt_socket.recv() or receive() forever.
+            tasks = [
+                asyncio.create_task(forward_audio_to_sarvam()),
+                asyncio.create_task(receive_sarvam_events()),
+                asyncio.create_task(turn_worker()),
+            ]
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            should_stop = True
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     except WebSocketDisconnect:
-        print("[WS] Client disconnected")
+        log.info("[WS] Client disconnected")
     except Exception as e:
-        print(f"[WS] Connection error: {e}")
-        traceback.print_exc()
+        log.exception(f"[WS] Connection error: {e}")
         try:
-            await websocket.send_json({"type": "error", "detail": str(e)})
+            await client.send({"type": "error", "detail": str(e)})
         except Exception:
             pass
     finally:
-        print("[WS] Session ended")
+        # Written now rather than on the next flush, so a reconnect on
+        # another worker finds the final state (summary included)
+        save_session()
+        await session_store.flush()
+        await memory.close()
+        active_turn_queues.discard(turn_queue)
+        ACTIVE_SESSIONS.dec()
+        end_session()
+        log.info("[WS] Session ended")
 
 
 # ═══════════════════════════════════════════
 # ═══ REST FALLBACK ENDPOINT ═══
 # ═══════════════════════════════════════════
 
+# Upload limits. Body size is enforced while the request streams in; the
+# duration before any upstream call, from the WAV header. Other formats are
+# decoded to 16 kHz PCM WAV with ffmpeg first (415 when that isn't possible);
+# without ffmpeg they go to Saaras as they are, in one request. Recordings
+# longer than STT_SEGMENT_SECONDS (Saaras REST takes at most 30 s) are
+# transcribed in segments, STT_SEGMENT_CONCURRENCY at a time.
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_AUDIO_SECONDS = float(os.getenv("MAX_AUDIO_SECONDS", "600"))
+STT_SEGMENT_SECONDS = float(os.getenv("STT_SEGMENT_SECONDS", "25"))
+STT_SEGMENT_CONCURRENCY = int(os.getenv("STT_SEGMENT_CONCURRENCY", "4"))
+app.add_middleware(UploadLimitMiddleware, paths=("/api/v1/voice-turn",), max_bytes=MAX_UPLOAD_BYTES)
+
+# Idempotent retries (see idempotency.py): a retry of a running turn joins it,
+# and a finished turn is replayed for IDEMPOTENCY_TTL_S (at most
+# IDEMPOTENCY_MAX_RESULTS kept). Transcripts are cached by audio hash for
+# TRANSCRIPT_CACHE_TTL_S, so a retry after a failed turn skips STT.
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", "600"))
+IDEMPOTENCY_MAX_RESULTS = int(os.getenv("IDEMPOTENCY_MAX_RESULTS", "128"))
+TRANSCRIPT_CACHE_TTL_S = float(os.getenv("TRANSCRIPT_CACHE_TTL_S", "3600"))
+TRANSCRIPT_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MAX_ENTRIES", "4096"))
+idempotent_requests = IdempotentRequests(IDEMPOTENCY_MAX_RESULTS, IDEMPOTENCY_TTL_S)
+transcript_cache = TTLCache(TRANSCRIPT_CACHE_MAX_ENTRIES, TRANSCRIPT_CACHE_TTL_S)
+
+
+def parse_chat_history(raw: str) -> list:
+    """Validate the REST chat_history form field: bounded size, list of {sender, text}."""
+    if len(raw.encode("utf-8")) > MAX_CHAT_HISTORY_BYTES:
+        raise HTTPException(status_code=413, detail=f"chat_history exceeds {MAX_CHAT_HISTORY_BYTES} bytes.")
+    try:
+        parsed = json.loads(raw)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="chat_history must be valid JSON.")
+    if not isinstance(parsed, list) or not all(isinstance(m, dict) for m in parsed):
+        raise HTTPException(status_code=400, detail="chat_history must be a list of {sender, text} objects.")
+    return parsed
+
+
+def rest_response_mode(request: Request) -> str:
+    """json (default), or ndjson / sse via ?response= or the Accept header."""
+    mode = request.query_params.get("response")
+    if mode in ("json", "ndjson", "sse"):
+        return mode
+    accept = request.headers.get("accept", "")
+    if "text/event-stream" in accept:
+        return "sse"
+    if "application/x-ndjson" in accept:
+        return "ndjson"
+    return "json"
+
+
+def check_duration(wav_info):
+    if wav_info.duration_s > MAX_AUDIO_SECONDS:
+        raise HTTPException(status_code=413, detail=f"Recording exceeds {MAX_AUDIO_SECONDS:.0f} seconds.")
+
+
+async def decode_upload(audio: UploadFile):
+    """
+    A non-WAV upload (WebM/Opus, MP3, ...) decoded to 16 kHz mono PCM WAV, so
+    it gets the same duration limit and segmenting as a WAV: (upload, wav_info).
+    415 if ffmpeg can't decode it. The caller closes the decoded file.
+    """
+    decoded = await audio_encoder.decode(audio.file, MAX_AUDIO_SECONDS)
+    if decoded is None:
+        raise HTTPException(status_code=415, detail="Unsupported audio format; send WAV, WebM/Opus or MP3.")
+    wav_info = read_wav_info(decoded)
+    try:
+        check_duration(wav_info)
+    except HTTPException:
+        decoded.close()
+        raise
+    return UploadFile(decoded, filename="audio.wav", headers=Headers({"content-type": WAV_MIME})), wav_info
+
+
+async def transcribe_upload(audio: UploadFile, wav_info, language_code: str):
+    """
+    STT for a REST upload: one request for short clips and undecoded non-WAV
+    uploads, otherwise WAV segments transcribed concurrently and stitched in order.
+    The upload is read from its spool file, never into one bytes object.
+    """
+    async with span("stt", language_label(language_code)) as stt_span:
+        if wav_info is None or wav_info.duration_s <= STT_SEGMENT_SECONDS:
+            async with upstream_slot(stt_limiter):
+                stt_response = await sarvam_client.speech_to_text.transcribe(
+                    file=(audio.filename or "audio.webm", audio.file, audio.content_type or "audio/webm"),
+                    model="saaras:v3",
+                    language_code=language_code,
+                    mode="transcribe"
+                )
+            transcript, detected_lang = stt_response.transcript, stt_response.language_code
+        else:
+            async def transcribe_segment(index: int, segment: bytes):
+                async with upstream_slot(stt_limiter):
+                    stt_response = await sarvam_client.speech_to_text.transcribe(
+                        file=(f"segment-{index}.wav", segment, "audio/wav"),
+                        model="saaras:v3",
+                        language_code=language_code,
+                        mode="transcribe"
+                    )
+                return stt_response.transcript, stt_response.language_code
+
+            segmenter = WavSegmenter(audio.file, segment_s=STT_SEGMENT_SECONDS)
+            try:
+                transcript, detected_lang = await transcribe_segments(
+                    segmenter, transcribe_segment, concurrency=STT_SEGMENT_CONCURRENCY)
+            finally:
+                segmenter.close()
+            log.info(f"[STT] {wav_info.duration_s:.0f}s upload transcribed in "
+                     f"{math.ceil(wav_info.duration_s / STT_SEGMENT_SECONDS)} segments")
+        stt_span.language = language_label(detected_lang or language_code)
+    return transcript, detected_lang
+
+
+async def voice_turn_events(audio: UploadFile, wav_info, language_code: str, voice_id: str,
+                            parsed_history: list, fmt: AudioFormat, session_id: str = None,
+                            audio_digest: str = None):
+    """
+    One REST turn as (event, payload) pairs, each yielded as soon as it is
+    ready: transcript, then response (text + telemetry), then audio.
+    wav_info is None for a non-WAV upload, which is decoded before STT when
+    ffmpeg is available and otherwise sent to Saaras as it is.
+    With audio_digest, the transcript comes from transcript_cache when it can.
+    """
+    transcript_key = (audio_digest, language_code)
+    cached = transcript_cache.get(transcript_key) if audio_digest else None
+    if cached is not None:
+        user_transcript, detected_lang = cached
+        log.info("[STT] Transcript cache hit, STT skipped")
+    else:
+        decoded = None
+        if wav_info is None and audio_encoder.available:
+            decoded, wav_info = await decode_upload(audio)
+        elif wav_info is None:
+            log.warning("[STT] ffmpeg not available; non-WAV upload sent as one request, "
+                        "without the duration limit or segmenting")
+        try:
+            user_transcript, detected_lang = await transcribe_upload(decoded or audio, wav_info, language_code)
+        finally:
+            if decoded is not None:
+                decoded.file.close()
+    if not user_transcript.strip():
+        raise HTTPException(status_code=400, detail="Could not transcribe audio.")
+    if cached is None and audio_digest:
+        transcript_cache.put(transcript_key, (user_transcript, detected_lang))
+
+    detected_lang = detected_lang or "en-IN"
+    yield "transcript", {
+        "user_transcript": user_transcript,
+        "detected_language": {"code": detected_lang, "name": LANGUAGE_NAMES.get(detected_lang, detected_lang)},
+    }
+
+    memory = ConversationMemory.from_history(
+        parsed_history,
+        recent_turns=MEMORY_RECENT_TURNS,
+        token_budget=MEMORY_TOKEN_BUDGET,
+    )
+    progress = TurnProgress()
+    detection = detect_crisis(user_transcript)
+    if detection is not None and detection.high:
+        spoken_text, audio_base64, telemetry = await fast_crisis_reply(
+            user_transcript, detected_lang, memory.as_chat_history(), voice_id, progress)
+        record_telemetry(session_id, "rest", detected_lang, telemetry)
+        yield "response", {"spoken_response": spoken_text, "telemetry": telemetry}
+    else:
+        spoken_text, telemetry = await draft_reply(user_transcript, detected_lang, memory.as_chat_history(), progress,
+                                                   model_router.route(memory.risk_trajectory, detection, memory.crisis_ever))
+        record_telemetry(session_id, "rest", detected_lang, telemetry)
+        crisis = telemetry.get("requires_crisis_intervention")
+        if not crisis:
+            # On a crisis turn the text is swapped for the safety message; wait for it
+            yield "response", {"spoken_response": spoken_text, "telemetry": telemetry}
+
+        spoken_text, audio_base64 = await voice_reply(spoken_text, telemetry, detected_lang, voice_id, progress)
+        if crisis:
+            yield "response", {"spoken_response": spoken_text, "telemetry": telemetry}
+
+    audio_mime = WAV_MIME
+    if audio_base64:
+        audio_bytes = base64.b64decode(audio_base64)
+        if fmt.compressed:
+            async with span("encode", language_label(detected_lang)):
+                audio_bytes, audio_mime = await audio_encoder.encode(audio_bytes, fmt)
+            audio_base64 = base64.b64encode(audio_bytes).decode("ascii")
+        REPLY_AUDIO_BYTES.inc(len(audio_bytes), format=fmt.codec if audio_mime != WAV_MIME else "wav")
+    yield "audio", {"audio_base64": audio_base64, "audio_mime": audio_mime}
+
+
+def format_event(mode: str, event: str, payload: dict) -> str:
+    if mode == "sse":
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+    return json.dumps({"type": event, **payload}, ensure_ascii=False) + "\n"
+
+
 @app.post("/api/v1/voice-turn")
 async def process_voice_turn(
+    request: Request,
     audio: UploadFile = File(...),
     language_code: str = Form("unknown"),
     voice_id: str = Form("ritu"),
-    chat_history: str = Form("[]")
+    chat_history: str = Form("[]"),
+    audio_format: str = Form("wav"),
+    audio_bitrate: int = Form(None),
+    session_id: str = Form(None)
 ):
-    """REST fallback endpoint for non-streaming voice turns."""
+    """
+    REST fallback endpoint for non-streaming voice turns.
+    The upload is WAV, or any format ffmpeg decodes (WebM/Opus, MP3, ...);
+    otherwise 415. Recordings over MAX_AUDIO_SECONDS get 413. Without ffmpeg,
+    non-WAV uploads go to Saaras unchecked, in one request.
+    audio_format=opus|mp3 returns compressed audio_base64; audio_mime names the format.
+    session_id, if given, groups the turn with the caller's other turns in the
+    telemetry store.
+
+    ?response=ndjson (or Accept: application/x-ndjson) streams one JSON object
+    per line as each part is ready — transcript, response, audio, then done —
+    and ?response=sse (or Accept: text/event-stream) sends the same events as
+    Server-Sent Events. A failure after the stream has started arrives as an
+    error event.
+
+    A saturated gateway answers 503 (429 past REST_MAX_INFLIGHT_PER_CLIENT
+    requests from one client) with a Retry-After header.
+
+    Retries are idempotent: a request with the same Idempotency-Key header,
+    or without one the same audio and form fields, joins the turn still
+    running or replays the finished one (Idempotent-Replayed: true) without
+    any upstream call. A key reused for a different request gets 422.
+    """
+    new_turn_id()
+    parsed_history = parse_chat_history(chat_history)
+
+    # Limits are checked before any upstream call. The body size was already
+    # capped while it streamed in (UploadLimitMiddleware); a non-WAV upload's
+    # duration is known once the turn has decoded it (decode_upload).
+    wav_info = read_wav_info(audio.file)
+    if wav_info is not None:
+        check_duration(wav_info)
+
+    fmt = AudioFormat.negotiate(audio_format, audio_bitrate, AUDIO_BITRATE_KBPS)
+    session_id = session_id[:64] if session_id else None
+    audio_digest = await asyncio.to_thread(file_digest, audio.file)
+    request_fingerprint = fingerprint(audio_digest, language_code, voice_id, chat_history,
+                                      fmt.codec, fmt.bitrate_kbps, session_id)
+    header_key = request.headers.get("Idempotency-Key")
+    key = f"key:{header_key[:256]}" if header_key else f"request:{request_fingerprint}"
     try:
-        audio_bytes = await audio.read()
+        run = idempotent_requests.find(key, request_fingerprint)
+    except KeyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    replayed = run is not None
 
-        stt_response = await sarvam_client.speech_to_text.transcribe(
-            file=(audio.filename or "audio.webm", audio_bytes, audio.content_type or "audio/webm"),
-            model="saaras:v3",
-            language_code=language_code,
-            mode="transcribe"
-        )
+    if run is None:
+        # Only new work is admitted; the turn runs to the end even if this
+        # client goes away, so its retry can pick the result up.
+        release = admission.admit_request(request.client.host if request.client else "unknown")
+        turn_audio = detach_upload(audio)
 
-        user_transcript = stt_response.transcript
-        if not user_transcript.strip():
-            raise HTTPException(status_code=400, detail="Could not transcribe audio.")
+        def finished():
+            release()
+            turn_audio.file.close()
 
-        detected_lang = stt_response.language_code or "en-IN"
-        parsed_history = json.loads(chat_history)
+        run = idempotent_requests.start(key, request_fingerprint, voice_turn_events(
+            turn_audio, wav_info, language_code, voice_id, parsed_history, fmt,
+            session_id=session_id, audio_digest=audio_digest), on_done=finished)
+    events = run.follow()
+    mode = rest_response_mode(request)
+    headers = {"Idempotent-Replayed": "true"} if replayed else {}
 
-        result = await process_transcript(
-            transcript=user_transcript,
-            detected_lang=detected_lang,
-            chat_history=parsed_history,
-            voice_id=voice_id
-        )
+    if mode != "json":
+        async def stream():
+            try:
+                async for event, payload in events:
+                    yield format_event(mode, event, payload)
+                yield format_event(mode, "done", {})
+            except HTTPException as e:
+                yield format_event(mode, "error", {"status": e.status_code, "detail": e.detail})
+            except Overloaded as e:
+                yield format_event(mode, "error", {"status": e.status_code, "detail": "The service is busy.",
+                                                   "retry_after_s": e.retry_after_s})
+            except Exception as e:
+                log.exception(f"[PIPELINE] REST turn failed: {e}")
+                yield format_event(mode, "error", {"status": 500, "detail": f"Pipeline processing failed: {str(e)}"})
 
-        return JSONResponse(content=result)
+        media_type = "text/event-stream" if mode == "sse" else "application/x-ndjson"
+        return StreamingResponse(stream(), media_type=media_type, headers={"Cache-Control": "no-cache", **headers})
 
-    except HTTPException:
+    try:
+        result = {}
+        async for _, payload in events:
+            result.update(payload)
+        return JSONResponse(headers=headers, content={
+            "user_transcript": result["user_transcript"],
+            "spoken_response": result["spoken_response"],
+            "audio_base64": result["audio_base64"],
+            "audio_mime": result["audio_mime"],
+            "telemetry": result["telemetry"],
+            "detected_language": result["detected_language"],
+        })
+
+    except (HTTPException, Overloaded):
         raise
     except Exception as e:
-        traceback.print_exc()
+        log.exception(f"[PIPELINE] REST turn failed: {e}")
         raise HTTPException(status_code=500, detail=f"Pipeline processing failed: {str(e)}")
+
+
+# ═══════════════════════════════════════════
+# ═══ BATCH SCREENING ENDPOINT ═══
+# ═══════════════════════════════════════════
+
+# Offline re-scoring (batch.py). One token bucket is shared by every batch
+# request, so parallel batches can't multiply the Gemini rate between them.
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_RATE_PER_S = float(os.getenv("BATCH_RATE_PER_S", "10"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "4"))
+BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(50 * 1024 * 1024)))
+batch_bucket = TokenBucket(BATCH_RATE_PER_S)
+app.add_middleware(UploadLimitMiddleware, paths=("/api/v1/batch-screen",), max_bytes=BATCH_MAX_BYTES)
+
+
+async def score_transcript(item: dict) -> dict:
+    """One batch item through the Gemini + telemetry half of a turn; no STT or TTS."""
+    new_turn_id()
+    with upstream_priority(BACKGROUND):
+        spoken_text, telemetry = await draft_reply(item["transcript"], item["language_code"],
+                                                   item["chat_history"], TurnProgress(),
+                                                   model_router.strong_route("batch"))
+    result = {"spoken_response": spoken_text, "telemetry": telemetry}
+    detection = detect_crisis(item["transcript"])
+    if detection is not None:
+        # Lets QA compare the fast path against the model, item by item
+        result["crisis_fast_path"] = detection.high
+    return result
+
+
+@app.post("/api/v1/batch-screen")
+async def batch_screen(request: Request, concurrency: int = BATCH_MAX_CONCURRENCY):
+    """
+    Text-only screening for many transcripts. The body is JSONL (see batch.py
+    for the item format); results stream back as JSONL in completion order,
+    followed by a {"done": true, ...counts} line. A stream that ends without
+    that line was cut short: resubmit the items missing from it.
+    Refused with 503 while the gateway is saturated.
+    """
+    admission.check()
+    # Spool the body first: once a StreamingResponse starts, Starlette may be
+    # listening for disconnects on the same receive channel.
+    body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    async for chunk in request.stream():
+        body.write(chunk)
+    body.seek(0)
+    lines = io.TextIOWrapper(body, encoding="utf-8", errors="replace")
+
+    runner = BatchRunner(score_transcript, concurrency=min(max(1, concurrency), BATCH_MAX_CONCURRENCY),
+                         retries=BATCH_MAX_RETRIES, bucket=batch_bucket)
+
+    async def stream():
+        try:
+            async for result in runner.run(file_lines(lines)):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        except Exception as e:
+            log.exception(f"[BATCH] Batch aborted: {e}")
+            yield json.dumps({"done": False, "error": str(e)}) + "\n"
+            return
+        finally:
+            lines.close()
+        log.info(f"[BATCH] {runner.stats}")
+        yield json.dumps({"done": True, **runner.stats}) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+
+# ═══════════════════════════════════════════
+# ═══ TELEMETRY QUERY ENDPOINTS ═══
+# ═══════════════════════════════════════════
+
+def telemetry_reader(request: Request) -> TelemetryQuery:
+    """The query API, for a caller holding TELEMETRY_API_KEY."""
+    if telemetry_query is None:
+        raise HTTPException(status_code=404, detail="Telemetry storage is not enabled (TELEMETRY_DIR).")
+    if not TELEMETRY_API_KEY:
+        raise HTTPException(status_code=403, detail="Set TELEMETRY_API_KEY to enable telemetry queries.")
+    if not secrets.compare_digest(request.headers.get("authorization", ""), f"Bearer {TELEMETRY_API_KEY}"):
+        raise HTTPException(status_code=401, detail="Invalid telemetry API key.")
+    return telemetry_query
+
+
+def parse_day(value: str, name: str):
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be YYYY-MM-DD.")
+
+
+@app.get("/api/v1/telemetry/sessions/{session_id}")
+async def telemetry_trajectory(request: Request, session_id: str, start: str = None, end: str = None,
+                               days: int = 30):
+    """One session's per-turn risk indicators, oldest first (last `days` days unless start is given)."""
+    query = telemetry_reader(request)
+    turns = await asyncio.to_thread(query.trajectory, session_id, parse_day(start, "start"),
+                                    parse_day(end, "end"), days)
+    return {"session_id": session_id, "turns": turns}
+
+
+@app.get("/api/v1/telemetry/cohort")
+async def telemetry_cohort(request: Request, start: str = None, end: str = None, days: int = 30):
+    """PHQ-9 / GAD-7 distribution and crisis rate by language over a date range."""
+    query = telemetry_reader(request)
+    started = time.perf_counter()
+    cohorts = await asyncio.to_thread(query.cohort, parse_day(start, "start"), parse_day(end, "end"), days)
+    return {"languages": cohorts, "query_ms": round((time.perf_counter() - started) * 1000)}
@@ -0,0 +1,242 @@
+"""
+Bounded conversation memory.
+
+Keeps the last K turns verbatim and folds older turns into a rolling summary
+that is updated by a background summarization call, off the turn hot path.
+Risk indicators from each turn's clinical_telemetry are kept as a compact
+trajectory of the last TRAJECTORY_KEEP points, plus running peaks and a
+"crisis ever" flag, so nothing clinically relevant is lost when turns are
+folded and the saved session state stays the same size however long the
+conversation runs. A token budget caps how much history goes into each prompt.
+
+as_messages() hands out each turn's prompt messages built once, and keeps them
+with the turn until it is evicted, so a session's prompt grows by the new turn
+rather than being rebuilt from the text every time.
+"""
+import asyncio
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+log = logging.getLogger("mindwell.memory")
+
+
+RISK_LEVELS = ("low", "moderate", "high", "severe")
+
+
+def _highest(levels):
+    """Most severe of the given risk levels (unknown values ignored), or None."""
+    known = [level for level in levels if level in RISK_LEVELS]
+    return max(known, key=RISK_LEVELS.index) if known else None
+
+# Trajectory points shown to the model, and kept in memory / session state
+# (the telemetry store has every turn)
+TRAJECTORY_IN_PROMPT = 8
+TRAJECTORY_KEEP = 32
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count. UTF-8 bytes / 4 tracks Gemini's tokenizer closely enough
+    for budgeting, and naturally weights Indic scripts (3 bytes/char) higher.
+    """
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+@dataclass
+class Turn:
+    user_text: str
+    ai_text: str
+    telemetry: dict = field(default_factory=dict)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.user_text) + estimate_tokens(self.ai_text)
+
+
+class ConversationMemory:
+    """
+    summarize(previous_summary, turns) -> new summary is an async callable;
+    without one, turns that fall out of the window are simply dropped (their
+    risk indicators are still kept in the trajectory).
+    """
+
+    def __init__(self, summarize=None, recent_turns: int = 6, token_budget: int = 1500):
+        self.summarize = summarize
+        self.recent_turns = recent_turns
+        self.token_budget = token_budget
+        self.summary = ""
+        self.risk_trajectory = []     # (phq9, gad7, crisis) per turn, last TRAJECTORY_KEEP turns
+        self.risk_turns = 0           # turns with telemetry, including those trimmed off
+        self.crisis_ever = False      # crisis intervention triggered at any point
+        self.peak_risk = (None, None) # highest (phq9, gad7) seen
+        self._recent = deque()
+        self._built = deque()         # per recent turn: its built prompt messages, or None
+        self._built_note = (None, None)
+        self._to_fold = []
+        self._summarizer = None
+
+    @classmethod
+    def from_history(cls, chat_history: list, **kwargs) -> "ConversationMemory":
+        """Memory from a client-supplied [{sender, text}, ...] list (REST path)."""
+        memory = cls(**kwargs)
+        user_text = None
+        for msg in chat_history:
+            text = str(msg.get("text", ""))
+            if msg.get("sender") == "user":
+                if user_text is not None:
+                    memory.add_turn(user_text, "")
+                user_text = text
+            else:
+                memory.add_turn(user_text or "", text)
+                user_text = None
+        if user_text is not None:
+            memory.add_turn(user_text, "")
+        return memory
+
+    @classmethod
+    def from_state(cls, state: dict, **kwargs) -> "ConversationMemory":
+        """Memory restored from to_state() output (a resumed session)."""
+        memory = cls(**kwargs)
+        memory.summary = state.get("summary", "")
+        points = [tuple(point) for point in state.get("risk_trajectory", [])]
+        memory.risk_trajectory = points[-TRAJECTORY_KEEP:]
+        memory.risk_turns = state.get("risk_turns", len(points))
+        memory.crisis_ever = state.get("crisis_ever", any(point[2] for point in points))
+        memory.peak_risk = tuple(state.get("peak_risk") or (
+            _highest(point[0] for point in points), _highest(point[1] for point in points)))
+        memory._recent.extend(Turn(**turn) for turn in state.get("recent", []))
+        memory._built.extend([None] * len(memory._recent))
+        memory._to_fold.extend(Turn(**turn) for turn in state.get("to_fold", []))
+        memory._enforce_budget()     # resumes a fold that was cut short
+        return memory
+
+    def to_state(self) -> dict:
+        """JSON-serializable snapshot, including turns evicted but not yet summarized."""
+        return {
+            "summary": self.summary,
+            "risk_trajectory": [list(point) for point in self.risk_trajectory],
+            "risk_turns": self.risk_turns,
+            "crisis_ever": self.crisis_ever,
+            "peak_risk": list(self.peak_risk),
+            "recent": [asdict(turn) for turn in self._recent],
+            "to_fold": [asdict(turn) for turn in self._to_fold],
+        }
+
+    def __len__(self):
+        return len(self._recent)
+
+    # ─── Updates ───
+
+    def add_turn(self, user_text: str, ai_text: str, telemetry: dict = None):
+        telemetry = telemetry or {}
+        self._recent.append(Turn(user_text, ai_text, telemetry))
+        self._built.append(None)
+        if telemetry:
+            point = (
+                telemetry.get("phq9_risk_indicator"),
+                telemetry.get("gad7_risk_indicator"),
+                bool(telemetry.get("requires_crisis_intervention")),
+            )
+            self.risk_trajectory.append(point)
+            del self.risk_trajectory[:-TRAJECTORY_KEEP]
+            self.risk_turns += 1
+            self.crisis_ever = self.crisis_ever or point[2]
+            self.peak_risk = (_highest((self.peak_risk[0], point[0])), _highest((self.peak_risk[1], point[1])))
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        """Evict oldest turns past K turns or past the token budget."""
+        while len(self._recent) > self.recent_turns or (
+                len(self._recent) > 1 and self._prompt_tokens() > self.token_budget):
+            self._to_fold.append(self._recent.popleft())
+            self._built.popleft()
+
+        if not self.summarize:
+            self._to_fold.clear()
+        elif self._to_fold and (self._summarizer is None or self._summarizer.done()):
+            self._summarizer = asyncio.create_task(self._fold())
+
+    async def _fold(self):
+        """Background: merge evicted turns into the running summary."""
+        while self._to_fold:
+            batch = list(self._to_fold)
+            try:
+                summary = await self.summarize(self.summary, batch)
+            except Exception as e:
+                log.warning(f"[MEMORY] Summarization failed, will retry on next fold: {e}")
+                # Don't let a failing summarizer grow the backlog without bound.
+                del self._to_fold[:max(0, len(self._to_fold) - self.recent_turns)]
+                return
+            self.summary = self._truncate(summary.strip(), self.token_budget // 3)
+            del self._to_fold[:len(batch)]
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        data = text.encode("utf-8")
+        if len(data) <= max_tokens * 4:
+            return text
+        return data[:max_tokens * 4].decode("utf-8", errors="ignore").rsplit(" ", 1)[0] + " …"
+
+    async def close(self):
+        if self._summarizer and not self._summarizer.done():
+            self._summarizer.cancel()
+
+    # ─── Prompt View ───
+
+    def latest_risk(self):
+        """(phq9, gad7, crisis) from the most recent turn with telemetry, or None."""
+        return self.risk_trajectory[-1] if self.risk_trajectory else None
+
+    def _context_note(self) -> str:
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of the earlier conversation: {self.summary}")
+        points = self.risk_trajectory[-TRAJECTORY_IN_PROMPT:]
+        if self.risk_turns > len(self._recent) and points:
+            phq9 = " → ".join(p[0] or "?" for p in points)
+            gad7 = " → ".join(p[1] or "?" for p in points)
+            note = f"Risk trajectory so far (oldest → newest): PHQ-9 {phq9}; GAD-7 {gad7}."
+            if self.risk_turns > len(points):
+                note += (f" Highest earlier in this conversation: PHQ-9 {self.peak_risk[0] or '?'}; "
+                         f"GAD-7 {self.peak_risk[1] or '?'}.")
+            if self.crisis_ever:
+                note += " Crisis intervention was triggered earlier in this conversation."
+            parts.append(note)
+        return "\n".join(parts)
+
+    def _prompt_tokens(self) -> int:
+        return estimate_tokens(self._context_note()) + sum(t.tokens for t in self._recent)
+
+    @staticmethod
+    def _turn_messages(turn: Turn):
+        return [(sender, text) for sender, text in (("user", turn.user_text), ("ai", turn.ai_text)) if text]
+
+    def as_chat_history(self) -> list:
+        """[{sender, text}, ...] for process_transcript: context note + recent turns."""
+        history = []
+        note = self._context_note()
+        if note:
+            history.append({"sender": "user", "text": f"[Conversation context]\n{note}"})
+        for turn in self._recent:
+            history.extend({"sender": sender, "text": text} for sender, text in self._turn_messages(turn))
+        return history
+
+    def as_messages(self, build) -> list:
+        """
+        as_chat_history() with each message passed through build(sender, text).
+        A turn's messages are built on first use and reused until it is
+        evicted; the context note is rebuilt only when it changes. Use one
+        build function per memory.
+        """
+        messages = []
+        note = self._context_note()
+        if note:
+            if self._built_note[0] != note:
+                self._built_note = (note, build("user", f"[Conversation context]\n{note}"))
+            messages.append(self._built_note[1])
+        for index, turn in enumerate(self._recent):
+            if self._built[index] is None:
+                self._built[index] = [build(sender, text) for sender, text in self._turn_messages(turn)]
+            messages.extend(self._built[index])
+        return messages
@@ -0,0 +1,275 @@
+"""
+Stage latency tracing and Prometheus metrics for the gateway.
+
+A turn runs through stages — STT final transcript, Gemini, crisis
+re-translation, TTS, WebSocket send. Each one is wrapped in a span:
+
+    async with span("llm", language=detected_lang):
+        ...
+
+which observes mindwell_stage_seconds{stage, language, outcome} (outcome is
+ok / error / cancelled) and emits a structured debug log record, which
+log_config tags with the current turn id. Gauges cover active sessions and
+queue depths; values that already live elsewhere (cache stats, barge-in
+counters) are exported through callbacks at scrape time rather than being
+duplicated.
+
+render() produces the Prometheus text exposition format served on /metrics.
+The registry is in-process and lock-free: every update happens on the event
+loop, so a multi-worker deployment exposes one /metrics per worker.
+"""
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+
+log = logging.getLogger("mindwell.metrics")
+
+# Seconds. Covers sub-frame sends up to slow Gemini generations.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.label_names)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """Gauge is +1 while the block runs (in-flight / waiting counts)."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self) -> list:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {value}"
+            for key, value in self._values.items()
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> list:
+        lines = self.header()
+        names = self.label_names + ("le",)
+        for key, series in self._series.items():
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {series[-1]}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {series[-2]}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Values read at scrape time from fn(): a number, or {label value(s): number}
+    for a metric with labels.
+    """
+
+    def __init__(self, name, help_text, fn, labels=(), kind="gauge"):
+        super().__init__(name, help_text, labels)
+        self.fn = fn
+        self.kind = kind
+
+    def render(self) -> list:
+        try:
+            values = self.fn()
+        except Exception as e:
+            log.warning(f"[METRICS] Collecting {self.name} failed: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = self.header()
+        for key, value in values.items():
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()) -> Gauge:
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def callback(self, name, help_text, fn, labels=(), kind="gauge") -> CallbackMetric:
+        return self.register(CallbackMetric(name, help_text, fn, labels, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "mindwell_stage_seconds", "Latency of one pipeline stage.", ("stage", "language", "outcome"))
+TIME_TO_FIRST_AUDIO = REGISTRY.histogram(
+    "mindwell_time_to_first_audio_seconds",
+    "Final transcript received to first reply audio sent.", ("language", "mode"))
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "mindwell_active_sessions", "Open /ws/conversation sessions.")
+
+_stage_listeners = []
+
+
+def add_stage_listener(fn):
+    """Also call fn(stage, language, outcome, duration_s) for every stage observed."""
+    _stage_listeners.append(fn)
+
+
+def _observe(stage: str, language: str, outcome: str, duration_s: float):
+    STAGE_SECONDS.observe(duration_s, stage=stage, language=language, outcome=outcome)
+    for fn in _stage_listeners:
+        fn(stage, language, outcome, duration_s)
+
+
+# ═══════════════════════════════════════════
+# ═══ SPANS ═══
+# ═══════════════════════════════════════════
+
+class Span:
+    """One timed stage. Set .outcome inside the block to override ok/error/cancelled."""
+
+    def __init__(self, stage: str, language: str):
+        self.stage = stage
+        self.language = language or "unknown"
+        self.outcome = None
+        self.start = time.perf_counter()
+
+    def finish(self, outcome: str) -> float:
+        duration = time.perf_counter() - self.start
+        outcome = self.outcome or outcome
+        _observe(self.stage, self.language, outcome, duration)
+        log.debug(f"[SPAN] {self.stage} {outcome} {duration * 1000:.1f}ms",
+                  extra={"stage": self.stage, "language": self.language, "outcome": outcome,
+                         "duration_ms": round(duration * 1000, 1)})
+        return duration
+
+
+class span:
+    """`with` / `async with` context manager timing a stage into STAGE_SECONDS."""
+
+    def __init__(self, stage: str, language: str = None):
+        self.stage = stage
+        self.language = language
+
+    def __enter__(self) -> Span:
+        self._span = Span(self.stage, self.language)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._span.finish("ok")
+        elif issubclass(exc_type, asyncio.CancelledError):
+            self._span.finish("cancelled")
+        else:
+            self._span.finish("error")
+        return False
+
+    async def __aenter__(self) -> Span:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+def observe_stage(stage: str, duration_s: float, language: str = None, outcome: str = "ok"):
+    """For stages timed elsewhere (e.g. STT, which ends at an event, not a call)."""
+    _observe(stage, language or "unknown", outcome, duration_s)
+
+
+def render() -> str:
+    return REGISTRY.render()
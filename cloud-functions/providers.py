@@ -0,0 +1,202 @@
+"""
+Provider interface for the gateway's upstream services.
+
+main.py talks to three providers through two SDK clients: Gemini (LLM) and
+Sarvam (streaming STT, batch STT, TTS). The Protocols below are the exact
+surface the pipeline uses, so any object that implements them can be
+dropped in — the real SDK clients, or the local fakes in fake_providers.py.
+
+make_clients() picks the implementation from PROVIDERS:
+  live (default) — AsyncSarvamAI + google-genai, using the API keys
+  fake           — deterministic local stand-ins, configured by FAKE_* env
+                   vars, for load tests that must not burn real quota
+
+Importing the two SDKs and building their clients is most of the gateway's
+cold start, so with lazy=True the clients are LazyClient wrappers: nothing
+is imported until the first attribute access or warm(), which the gateway
+runs in a thread after startup (see /readyz). LazyModule does the same for
+modules such as google.genai.types.
+"""
+import os
+import time
+import logging
+import importlib
+import threading
+from typing import Any, AsyncContextManager, AsyncIterator, Protocol
+
+log = logging.getLogger("mindwell.providers")
+
+
+# ═══════════════════════════════════════════
+# ═══ INTERFACE ═══
+# ═══════════════════════════════════════════
+
+class LLMModels(Protocol):
+    """gemini_client.aio.models"""
+
+    async def generate_content(self, model: str, contents: list, config: Any = None) -> Any: ...
+
+    async def generate_content_stream(self, model: str, contents: list,
+                                      config: Any = None) -> AsyncIterator[Any]: ...
+
+
+class LLMCaches(Protocol):
+    """gemini_client.aio.caches"""
+
+    async def create(self, model: str, config: Any = None) -> Any: ...
+
+    async def update(self, name: str, config: Any = None) -> Any: ...
+
+
+class STTSocket(Protocol):
+    """Open streaming STT session: recv() yields events / data / error messages."""
+
+    async def transcribe(self, audio: str, encoding: str, sample_rate: int): ...
+
+    async def recv(self) -> Any: ...
+
+
+class StreamingSTT(Protocol):
+    """sarvam_client.speech_to_text_streaming"""
+
+    def connect(self, **kwargs) -> AsyncContextManager[STTSocket]: ...
+
+
+class BatchSTT(Protocol):
+    """sarvam_client.speech_to_text"""
+
+    async def transcribe(self, file, model: str = None, language_code: str = None,
+                         mode: str = None) -> Any: ...
+
+
+class TTS(Protocol):
+    """sarvam_client.text_to_speech"""
+
+    async def convert(self, text: str, target_language_code: str, speaker: str,
+                      model: str = None, pace: float = 1.0,
+                      enable_preprocessing: bool = True) -> Any: ...
+
+
+# ═══════════════════════════════════════════
+# ═══ DEFERRED CONSTRUCTION ═══
+# ═══════════════════════════════════════════
+
+class LazyClient:
+    """Stands in for a client until first use, then builds it with factory() and delegates to it."""
+
+    def __init__(self, name: str, factory):
+        self._name = name
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+        self.build_s = None
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def warm(self):
+        """Build the client now (blocking; safe to call from a worker thread)."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    started = time.perf_counter()
+                    client = self._factory()
+                    self.build_s = time.perf_counter() - started
+                    self._client = client
+                    log.info(f"[PROVIDERS] {self._name} client ready in {self.build_s * 1000:.0f}ms")
+        return self._client
+
+    def __getattr__(self, name):
+        return getattr(self.warm(), name)
+
+
+class LazyModule:
+    """A module imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    @property
+    def ready(self) -> bool:
+        return self._module is not None
+
+    def warm(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, name):
+        return getattr(self.warm(), name)
+
+
+def warm(*objects):
+    """Build every LazyClient / import every LazyModule given; anything else is already live."""
+    for obj in objects:
+        if isinstance(obj, (LazyClient, LazyModule)):
+            obj.warm()
+
+
+def is_ready(*objects) -> bool:
+    return all(obj.ready for obj in objects if isinstance(obj, (LazyClient, LazyModule)))
+
+
+# ═══════════════════════════════════════════
+# ═══ FACTORY ═══
+# ═══════════════════════════════════════════
+
+PROVIDERS = os.getenv("PROVIDERS", "live").lower()
+
+
+def make_clients(sarvam_api_key: str = None, gemini_api_key: str = None, lazy: bool = False):
+    """(sarvam_client, gemini_client) for the configured PROVIDERS mode; lazy=True defers the SDKs."""
+    if PROVIDERS == "fake":
+        return make_fake_clients()
+    if PROVIDERS != "live":
+        raise ValueError(f"Unknown PROVIDERS={PROVIDERS!r} (expected 'live' or 'fake')")
+
+    def sarvam():
+        from sarvamai import AsyncSarvamAI
+        return AsyncSarvamAI(api_subscription_key=sarvam_api_key)
+
+    def gemini():
+        from google import genai
+        return genai.Client(api_key=gemini_api_key)
+
+    if lazy:
+        return LazyClient("Sarvam", sarvam), LazyClient("Gemini", gemini)
+    return sarvam(), gemini()
+
+
+def make_fake_clients():
+    """
+    Fake clients from FAKE_* env vars. Latencies take a Latency spec:
+    "0.8" (fixed), "uniform:0.8:0.2", "normal:0.8:0.2" or "lognormal:0.8:0.3".
+    FAKE_LLM_MODEL_LATENCY overrides FAKE_LLM_LATENCY per model:
+    "gemini-2.5-flash-lite=lognormal:0.5:0.2,gemini-2.5-flash=lognormal:1.2:0.4".
+    """
+    from fake_providers import FakeGeminiClient, FakeSarvamClient, Latency
+
+    seed = int(os.getenv("FAKE_SEED", "0"))
+    error_rate = float(os.getenv("FAKE_ERROR_RATE", "0"))
+    log.info(f"[PROVIDERS] Using local fakes (seed={seed}, error_rate={error_rate})")
+
+    gemini = FakeGeminiClient(
+        latency_s=Latency.parse(os.getenv("FAKE_LLM_LATENCY", "lognormal:1.0:0.3")),
+        error_rate=error_rate,
+        seed=seed,
+        unique_replies=os.getenv("FAKE_UNIQUE_REPLIES", "true").lower() in ("1", "true", "yes"),
+        model_latency_s={model.strip(): Latency.parse(spec.strip()) for model, spec in
+                         (entry.split("=", 1) for entry in os.getenv("FAKE_LLM_MODEL_LATENCY", "").split(",")
+                          if "=" in entry)},
+    )
+    sarvam = FakeSarvamClient(
+        tts_latency_s=Latency.parse(os.getenv("FAKE_TTS_LATENCY", "lognormal:0.4:0.1")),
+        stt_latency_s=Latency.parse(os.getenv("FAKE_STT_LATENCY", "lognormal:0.3:0.1")),
+        connect_latency_s=Latency.parse(os.getenv("FAKE_STT_CONNECT_LATENCY", "0.05")),
+        utterance_s=float(os.getenv("FAKE_UTTERANCE_S", "1.0")),
+        error_rate=error_rate,
+        seed=seed + 1,
+    )
+    return sarvam, gemini
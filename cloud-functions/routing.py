@@ -0,0 +1,166 @@
+"""
+Risk-aware Gemini model routing.
+
+Most turns are routine ("exams are stressful") and are answered well by a
+faster, cheaper model tier. A turn goes to the stronger model instead when
+the conversation looks risky:
+
+  risk     the last turn's PHQ-9 or GAD-7 indicator is at or above
+           escalate_at (default moderate)
+  crisis   crisis intervention was triggered earlier in the session, or the
+           crisis lexicon flagged this transcript (fast path)
+  signal   the lexicon found a softer distress signal in this transcript
+
+Batch screening and any caller without conversation context use the strong
+model too (Router.strong_route()).
+
+Each tier has its own latency budget: the whole call for a full reply, the
+first streamed chunk for a streamed one (once audio has gone out there is no
+switching models). A timeout, quota error (429), server error or malformed
+reply moves the turn to the next tier in its route; the strong model falls
+back to the fast one rather than failing a turn outright, and an optional
+third model backs up both.
+
+Router.call() records every attempt, failed ones included, so the gateway can
+report per-model latency, fallbacks and cost.
+"""
+import json
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from admission import Overloaded
+
+log = logging.getLogger("mindwell.routing")
+
+RISK_ORDER = {"low": 0, "moderate": 1, "high": 2, "severe": 3}
+FALLBACK_STATUS = {408, 429}
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str                    # fast | strong | fallback
+    model: str
+    timeout_s: float
+    # USD per million tokens: input, output, cached input
+    prices: tuple = (0.0, 0.0, 0.0)
+
+    def cost_usd(self, usage) -> float:
+        """Estimated cost of one call from its usage_metadata (0 when unknown)."""
+        if usage is None:
+            return 0.0
+        prompt = getattr(usage, "prompt_token_count", 0) or 0
+        cached = getattr(usage, "cached_content_token_count", 0) or 0
+        output = getattr(usage, "candidates_token_count", 0) or 0
+        input_price, output_price, cached_price = self.prices
+        return ((prompt - cached) * input_price + cached * cached_price + output * output_price) / 1e6
+
+
+@dataclass(frozen=True)
+class Route:
+    tiers: tuple                 # primary first, then fallbacks in order
+    reason: str
+
+    @property
+    def primary(self) -> ModelTier:
+        return self.tiers[0]
+
+
+@dataclass
+class Attempt:
+    tier: ModelTier
+    outcome: str                 # ok | timeout | error
+    seconds: float
+
+
+def parse_prices(spec: str) -> dict:
+    """"model=input/output/cached,..." (USD per million tokens) -> {model: (input, output, cached)}."""
+    prices = {}
+    for entry in (spec or "").split(","):
+        if "=" not in entry:
+            continue
+        model, values = entry.split("=", 1)
+        parts = [float(v) for v in values.split("/")]
+        prices[model.strip()] = tuple((parts + [0.0, 0.0, 0.0])[:3])
+    return prices
+
+
+def should_fall_back(e: BaseException) -> bool:
+    """Timeouts, quota and server errors, and unparseable replies; not bad requests or local shedding."""
+    if isinstance(e, Overloaded):
+        return False
+    if isinstance(e, (asyncio.TimeoutError, json.JSONDecodeError, ConnectionError)):
+        return True
+    code = getattr(e, "code", None) or getattr(e, "status_code", None)
+    return isinstance(code, int) and (code in FALLBACK_STATUS or code >= 500)
+
+
+class Router:
+    def __init__(self, fast: ModelTier, strong: ModelTier, fallback: ModelTier = None,
+                 escalate_at: str = "moderate"):
+        """fast=None sends every turn to the strong model."""
+        self.fast = fast
+        self.strong = strong
+        self.fallback = fallback
+        self.escalate_at = RISK_ORDER.get(escalate_at, 1)
+        self.stats = {}          # (tier, reason) -> turns routed
+        self.fallbacks = {}      # (from model, to model) -> count
+
+    def _route(self, primary: ModelTier, reason: str) -> Route:
+        tiers = [primary]
+        for tier in (self.strong, self.fallback, self.fast):
+            if tier is not None and tier.model not in {t.model for t in tiers}:
+                tiers.append(tier)
+        key = (primary.name, reason)
+        self.stats[key] = self.stats.get(key, 0) + 1
+        return Route(tuple(tiers), reason)
+
+    def strong_route(self, reason: str = "default") -> Route:
+        return self._route(self.strong, reason)
+
+    def route(self, risk_trajectory=(), detection=None, crisis_ever: bool = False) -> Route:
+        """
+        Route for a turn, from the session's recent (phq9, gad7, crisis)
+        trajectory and crisis flag (ConversationMemory.risk_trajectory,
+        .crisis_ever) and the crisis lexicon result.
+        """
+        if (detection is not None and detection.high or crisis_ever
+                or any(point[2] for point in risk_trajectory)):
+            return self._route(self.strong, "crisis")
+        if risk_trajectory:
+            phq9, gad7, _ = risk_trajectory[-1]
+            if max(RISK_ORDER.get(phq9, 0), RISK_ORDER.get(gad7, 0)) >= self.escalate_at:
+                return self._route(self.strong, "risk")
+        if detection is not None and detection.matches:
+            return self._route(self.strong, "signal")
+        if self.fast is None:
+            return self._route(self.strong, "routine")
+        return self._route(self.fast, "routine")
+
+    async def call(self, route: Route, attempt, attempts: list = None):
+        """
+        attempt(tier) for each tier of the route in turn until one succeeds;
+        attempt must apply tier.timeout_s to the upstream call itself (not to
+        any local queueing). Each try is appended to `attempts` as an Attempt.
+        Returns (result, tier). Errors that another model can't fix, and the
+        last tier's error, are raised.
+        """
+        attempts = [] if attempts is None else attempts
+        for index, tier in enumerate(route.tiers):
+            started = time.perf_counter()
+            try:
+                result = await attempt(tier)
+            except Exception as e:
+                timed_out = isinstance(e, asyncio.TimeoutError)
+                attempts.append(Attempt(tier, "timeout" if timed_out else "error", time.perf_counter() - started))
+                if index == len(route.tiers) - 1 or not should_fall_back(e):
+                    raise
+                following = route.tiers[index + 1]
+                key = (tier.model, following.model)
+                self.fallbacks[key] = self.fallbacks.get(key, 0) + 1
+                log.warning(f"[ROUTER] {tier.model} {'timed out' if timed_out else f'failed ({e})'}, "
+                            f"falling back to {following.model}")
+                continue
+            attempts.append(Attempt(tier, "ok", time.perf_counter() - started))
+            return result, tier
@@ -0,0 +1,247 @@
+"""
+Session state store: conversations that survive reconnects and span workers.
+
+A /ws/conversation session is identified by a resume token, sent to the
+client when the socket opens. Reconnecting with ?resume=<token> restores the
+conversation memory — recent turns, rolling summary, risk trajectory — from
+the store, on whichever worker the connection lands.
+
+Backends (SESSION_STORE):
+  memory            process-local dict; resumes only on the same worker
+  sqlite:<path>     one file shared by the workers on a host (WAL mode)
+  redis://...       any Redis-compatible server, shared across hosts
+                    (needs the redis package)
+  fake-redis        in-process Redis stand-in from fake_providers.py, for tests
+
+Writes are write-behind: save() only records the latest state for the
+session and returns, and a background task writes every pending session in
+one batch each flush_interval_s. A turn never waits on the store; a crash
+loses at most the last interval, and the WebSocket handler flushes as its
+session closes so a reconnect finds the final state. Only a hash of the
+token is used as the key, so a copy of the store can't be used to resume
+anyone's conversation. Sessions expire ttl_s after their last write.
+"""
+import json
+import math
+import time
+import asyncio
+import hashlib
+import logging
+import secrets
+import sqlite3
+import threading
+
+log = logging.getLogger("mindwell.sessions")
+
+KEY_PREFIX = "mindwell:session:"
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(24)
+
+
+def new_session_id() -> str:
+    """Public id for logs and telemetry; unlike the resume token it grants nothing."""
+    return secrets.token_hex(8)
+
+
+def session_key(token: str) -> str:
+    return KEY_PREFIX + hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# ═══════════════════════════════════════════
+# ═══ BACKENDS ═══
+# ═══════════════════════════════════════════
+
+class MemoryBackend:
+    """Process-local dict with expiry."""
+
+    SWEEP_INTERVAL_S = 60.0
+
+    def __init__(self):
+        self._data = {}          # key -> (serialized state, expires_at)
+        self._swept_at = time.monotonic()
+
+    async def get(self, key: str):
+        value, expires_at = self._data.get(key, (None, 0.0))
+        if value is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def put_many(self, items: dict, ttl_s: float):
+        now = time.monotonic()
+        for key, value in items.items():
+            self._data[key] = (value, now + ttl_s)
+        if now - self._swept_at >= self.SWEEP_INTERVAL_S:
+            self._swept_at = now
+            for key in [k for k, (_, expires_at) in self._data.items() if expires_at <= now]:
+                del self._data[key]
+
+    async def close(self):
+        pass
+
+
+class _SqliteFile:
+    """Blocking sqlite access; SqliteBackend runs every call in a worker thread."""
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                         "(key TEXT PRIMARY KEY, state TEXT NOT NULL, expires_at REAL NOT NULL)")
+        self._db.commit()
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT state FROM sessions WHERE key = ? AND expires_at > ?",
+                                   (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def put_many(self, items: dict, ttl_s: float):
+        now = time.time()
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO sessions (key, state, expires_at) VALUES (?, ?, ?)",
+                                 [(key, value, now + ttl_s) for key, value in items.items()])
+            self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class SqliteBackend:
+    def __init__(self, path: str):
+        self._file = _SqliteFile(path)
+
+    async def get(self, key: str):
+        return await asyncio.to_thread(self._file.get, key)
+
+    async def put_many(self, items: dict, ttl_s: float):
+        await asyncio.to_thread(self._file.put_many, items, ttl_s)
+
+    async def close(self):
+        await asyncio.to_thread(self._file.close)
+
+
+class RedisBackend:
+    """Any client with the redis.asyncio surface: get, pipeline().set(ex=), aclose."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str):
+        value = await self.client.get(key)
+        return value.decode("utf-8") if isinstance(value, bytes) else value
+
+    async def put_many(self, items: dict, ttl_s: float):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, value, ex=max(1, math.ceil(ttl_s)))
+            await pipe.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+# ═══════════════════════════════════════════
+# ═══ WRITE-BEHIND STORE ═══
+# ═══════════════════════════════════════════
+
+class SessionStore:
+    def __init__(self, backend, ttl_s: float = 1800.0, flush_interval_s: float = 0.5):
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self.flush_interval_s = flush_interval_s
+        self._pending = {}       # key -> latest unwritten state
+        self._write_lock = asyncio.Lock()
+        self._flusher = None
+        self.stats = {"loads": 0, "hits": 0, "misses": 0, "saves": 0, "coalesced": 0,
+                      "writes": 0, "flushes": 0, "errors": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def load(self, token: str):
+        """The session's last saved state, or None if unknown or expired."""
+        self.stats["loads"] += 1
+        key = session_key(token)
+        state = self._pending.get(key)
+        if state is None:
+            try:
+                raw = await self.backend.get(key)
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning(f"[SESSIONS] Load failed: {e}")
+                raw = None
+            state = json.loads(raw) if raw else None
+        self.stats["hits" if state is not None else "misses"] += 1
+        return state
+
+    def save(self, token: str, state: dict):
+        """Queue `state` for writing and return at once; only the latest state per session is written."""
+        key = session_key(token)
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = state
+        self.stats["saves"] += 1
+
+    async def flush(self):
+        """Write every pending session in one batch."""
+        async with self._write_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self.backend.put_many(
+                    {key: json.dumps(state, ensure_ascii=False) for key, state in batch.items()}, self.ttl_s)
+            except Exception as e:
+                self.stats["errors"] += 1
+                log.warning(f"[SESSIONS] Writing {len(batch)} sessions failed, will retry: {e}")
+                for key, state in batch.items():
+                    self._pending.setdefault(key, state)   # keep any newer save
+                return
+            self.stats["writes"] += len(batch)
+            self.stats["flushes"] += 1
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            await self.flush()
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+        await self.backend.close()
+
+
+def make_store(spec: str = "memory", ttl_s: float = 1800.0, flush_interval_s: float = 0.5) -> SessionStore:
+    """SessionStore for a SESSION_STORE value (see the module docstring)."""
+    spec = (spec or "memory").strip()
+    if spec == "memory":
+        backend = MemoryBackend()
+    elif spec.startswith("sqlite:"):
+        backend = SqliteBackend(spec[len("sqlite:"):])
+    elif spec.startswith(("redis://", "rediss://", "unix://")):
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("SESSION_STORE=redis://... needs the redis package (pip install redis)")
+        backend = RedisBackend(redis_asyncio.from_url(spec))
+    elif spec == "fake-redis":
+        from fake_providers import FakeRedis
+        backend = RedisBackend(FakeRedis())
+    else:
+        raise ValueError(f"Unknown SESSION_STORE {spec!r}: use memory, sqlite:<path>, redis://... or fake-redis")
+    log.info(f"[SESSIONS] Store: {type(backend).__name__}")
+    return SessionStore(backend, ttl_s=ttl_s, flush_interval_s=flush_interval_s)
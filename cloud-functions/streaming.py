@@ -0,0 +1,176 @@
+"""
+Incremental helpers for streamed Gemini replies.
+
+Gemini streams its JSON reply a few tokens at a time. SpokenResponseExtractor
+pulls the decoded text of the top-level "spoken_response" string out of that
+partial JSON as it arrives, and SentenceSplitter cuts the text into finished
+sentences so each one can go to TTS without waiting for the rest.
+JSONFlagWatcher reports a boolean field (requires_crisis_intervention) as
+soon as its value has streamed in, before the rest of the JSON is complete.
+"""
+import re
+
+# Sentence terminators: Latin, Devanagari danda / double danda, Urdu full stop
+# and question mark.
+SENTENCE_TERMINATORS = set(".!?।॥۔؟")
+
+# Fragments shorter than this are held back and merged with the next sentence,
+# so TTS isn't called for "Hmm." on its own.
+MIN_SENTENCE_CHARS = 20
+
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class SpokenResponseExtractor:
+    """
+    Streaming decoder for the "spoken_response" value of a JSON object.
+
+    feed() accepts arbitrary slices of the raw JSON text and returns whatever
+    new characters of the spoken response they completed. Escapes, including
+    \\uXXXX surrogate pairs split across chunks, are decoded.
+    """
+
+    def __init__(self, key: str = "spoken_response"):
+        self.key = key
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_buf = []
+        self._last_string = None
+        self._state = "seek"          # seek → await_value → value → done
+        self._unicode = None          # pending \\u hex digits while in value
+        self._high_surrogate = None
+
+    def feed(self, chunk: str) -> str:
+        out = []
+        for ch in chunk:
+            if self._state == "value":
+                self._feed_value(ch, out)
+            elif self._state == "await_value":
+                if ch == '"':
+                    self._state = "value"
+                elif not ch.isspace():
+                    # Not a string (null, number, ...) — nothing to speak.
+                    self._state = "seek"
+                    self._scan(ch)
+            elif self._state == "seek":
+                self._scan(ch)
+        return "".join(out)
+
+    def _scan(self, ch: str):
+        """Track structure outside the target value to find the key at depth 1."""
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._string_buf.append(ch)
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                self._last_string = "".join(self._string_buf)
+            else:
+                self._string_buf.append(ch)
+            return
+
+        if ch == '"':
+            self._in_string = True
+            self._string_buf = []
+        elif ch in "{[":
+            self._depth += 1
+            self._last_string = None
+        elif ch in "}]":
+            self._depth -= 1
+            self._last_string = None
+        elif ch == ":":
+            if self._depth == 1 and self._last_string == self.key:
+                self._state = "await_value"
+            self._last_string = None
+        elif ch == ",":
+            self._last_string = None
+
+    def _feed_value(self, ch: str, out: list):
+        if self._unicode is not None:
+            self._unicode += ch
+            if len(self._unicode) == 4:
+                code = int(self._unicode, 16)
+                self._unicode = None
+                if 0xD800 <= code <= 0xDBFF:
+                    self._high_surrogate = code
+                elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+                    combined = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                    self._high_surrogate = None
+                    out.append(chr(combined))
+                else:
+                    out.append(chr(code))
+        elif self._escape:
+            self._escape = False
+            if ch == "u":
+                self._unicode = ""
+            else:
+                out.append(_ESCAPES.get(ch, ch))
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            self._state = "done"
+            self.done = True
+        else:
+            out.append(ch)
+
+
+class SentenceSplitter:
+    """
+    Accumulates streamed text and yields complete sentences.
+
+    A sentence ends at a terminator followed by whitespace, so "3.5" or "U.S"
+    mid-token never splits. flush() returns whatever is left at end of stream.
+    """
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buf = ""
+
+    def feed(self, text: str) -> list:
+        self._buf += text
+        sentences = []
+        start = 0
+        for i in range(len(self._buf) - 1):
+            if self._buf[i] in SENTENCE_TERMINATORS and self._buf[i + 1].isspace():
+                if i + 1 - start >= self.min_chars:
+                    sentence = self._buf[start:i + 1].strip()
+                    if sentence:
+                        sentences.append(sentence)
+                    start = i + 1
+        self._buf = self._buf[start:]
+        return sentences
+
+    def flush(self) -> list:
+        rest = self._buf.strip()
+        self._buf = ""
+        return [rest] if rest else []
+
+
+class JSONFlagWatcher:
+    """
+    Spots `"key": true|false` in streamed JSON text, at any depth.
+
+    feed() takes arbitrary slices of the raw text and returns the value once
+    it has been seen (None until then). A quoted key inside a JSON string is
+    escaped (\\"), so text that merely mentions the key does not match.
+    """
+
+    def __init__(self, key: str):
+        self._pattern = re.compile(r'(?<!\\)"%s"\s*:\s*(true|false)' % re.escape(key))
+        self._keep = len(key) + 32     # enough of the tail to match across a chunk boundary
+        self._tail = ""
+        self.value = None
+
+    def feed(self, chunk: str):
+        if self.value is None:
+            text = self._tail + chunk
+            match = self._pattern.search(text)
+            if match:
+                self.value = match.group(1) == "true"
+            else:
+                self._tail = text[-self._keep:]
+        return self.value
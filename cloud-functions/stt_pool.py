@@ -0,0 +1,251 @@
+"""
+Warm pool of Saaras streaming STT connections.
+
+Every /ws/conversation session needs its own streaming socket, and opening one
+is a full WebSocket handshake with Sarvam before the first audio frame can be
+forwarded. The pool keeps `size` sockets already open; a new session takes one
+and a replacement is opened in the background. When the pool is empty (a burst
+of joins) the session connects directly, exactly as it would without a pool.
+
+Sockets are never shared or reused: Saaras keeps VAD and transcript state per
+connection, so a socket is closed when its session ends.
+
+    pool = STTConnectionPool(lambda: sarvam_client.speech_to_text_streaming.connect(**params))
+    await pool.start()
+    async with pool.connection() as stt_socket:
+        ...
+
+Idle sockets are pinged every `health_interval_s` and recycled after
+`max_idle_s`, since upstream drops connections that carry no audio for long.
+`max_size` caps the upstream sockets this worker holds (in use + warm); past
+it no warm sockets are opened and sessions fall back to direct connects.
+"""
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+log = logging.getLogger("mindwell.stt_pool")
+
+PING_TIMEOUT_S = 5.0
+MAX_BACKOFF_S = 30.0
+
+
+class _Connection:
+    """One upstream socket, held open by its own task until released."""
+
+    def __init__(self):
+        self.socket = None
+        self.opened_at = 0.0
+        self.release = asyncio.Event()
+        self.task = None
+
+    @property
+    def alive(self) -> bool:
+        """Still held open, and not closed from the upstream side."""
+        if self.socket is None or self.task.done():
+            return False
+        websocket = getattr(self.socket, "_websocket", None)
+        if websocket is None:
+            return True
+        # websockets' legacy protocol exposes .closed, the newer client .state
+        state = getattr(websocket, "state", None)
+        return not getattr(websocket, "closed", False) and getattr(state, "name", "OPEN") == "OPEN"
+
+
+class STTConnectionPool:
+    def __init__(self, connect, size: int = 2, max_size: int = 32,
+                 max_idle_s: float = 60.0, health_interval_s: float = 15.0):
+        """connect() returns the SDK's `speech_to_text_streaming.connect(...)` context manager."""
+        self._connect = connect
+        self.size = size
+        self.max_size = max_size
+        self.max_idle_s = max_idle_s
+        self.health_interval_s = health_interval_s
+        self._idle = []               # warm _Connections, oldest first
+        self._opening = 0
+        self._in_use = 0
+        self._wakeup = None
+        self._maintainer = None
+        self._closed = False
+        self.stats = {"hits": 0, "misses": 0, "opened": 0, "failed": 0, "recycled": 0, "unhealthy": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def counts(self) -> dict:
+        return {"idle": len(self._idle), "in_use": self._in_use, "opening": self._opening}
+
+    # ─── Lifecycle ───
+
+    async def start(self):
+        """Begin filling the pool in the background; returns immediately."""
+        if not self.enabled or self._maintainer is not None:
+            return
+        self._closed = False
+        self._wakeup = asyncio.Event()
+        self._maintainer = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        # The flag as well as cancel(): wait_for() can swallow a cancellation
+        # that lands just as its wait completes (Python < 3.12).
+        self._closed = True
+        if self._maintainer is not None:
+            self._wakeup.set()
+            self._maintainer.cancel()
+            await asyncio.gather(self._maintainer, return_exceptions=True)
+            self._maintainer = None
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self._discard(conn) for conn in idle), return_exceptions=True)
+
+    # ─── Sessions ───
+
+    @asynccontextmanager
+    async def connection(self):
+        """A streaming STT socket for one session: a warm one if available, else a direct connect."""
+        # Counted as in use from here, so the maintainer never fills past
+        # max_size while direct connects are still handshaking.
+        self._in_use += 1
+        conn = None
+        try:
+            conn = self._take_idle()
+            if conn is not None:
+                self.stats["hits"] += 1
+            else:
+                if self.enabled:
+                    self.stats["misses"] += 1
+                conn = await self._open()
+            self._refill()
+            yield conn.socket
+        finally:
+            self._in_use -= 1
+            if conn is not None:
+                await self._discard(conn)
+            self._refill()
+
+    def _take_idle(self):
+        while self._idle:
+            conn = self._idle.pop()    # newest first: least likely to have been dropped upstream
+            if conn.alive:
+                return conn
+            self.stats["unhealthy"] += 1
+        return None
+
+    def _refill(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    # ─── Upstream sockets ───
+
+    async def _open(self) -> _Connection:
+        conn = _Connection()
+        opened = asyncio.get_running_loop().create_future()
+        conn.task = asyncio.create_task(self._hold(conn, opened))
+        try:
+            await asyncio.shield(opened)
+        except asyncio.CancelledError:
+            conn.release.set()
+            conn.task.cancel()
+            raise
+        conn.opened_at = time.monotonic()
+        self.stats["opened"] += 1
+        return conn
+
+    async def _hold(self, conn: _Connection, opened: asyncio.Future):
+        """Enter and exit connect() in one task, whichever task ends up using the socket."""
+        try:
+            async with self._connect() as socket:
+                conn.socket = socket
+                opened.set_result(socket)
+                await conn.release.wait()
+        except BaseException as e:
+            if opened.done():
+                if not isinstance(e, asyncio.CancelledError):
+                    log.debug(f"[STT_POOL] Socket closed with error: {e}")
+            elif isinstance(e, asyncio.CancelledError):
+                opened.cancel()
+            else:
+                opened.set_exception(e)
+
+    async def _discard(self, conn: _Connection):
+        conn.release.set()
+        if conn.task is not None:
+            await asyncio.gather(conn.task, return_exceptions=True)
+
+    async def _healthy(self, conn: _Connection) -> bool:
+        if not conn.alive:
+            return False
+        websocket = getattr(conn.socket, "_websocket", None)
+        if websocket is None or not hasattr(websocket, "ping"):
+            return True
+        try:
+            pong = await websocket.ping()
+            await asyncio.wait_for(pong, PING_TIMEOUT_S)
+            return True
+        except Exception:
+            return False
+
+    # ─── Background maintenance ───
+
+    async def _maintain(self):
+        backoff = 1.0
+        last_check = time.monotonic()
+        while not self._closed:
+            if time.monotonic() - last_check >= self.health_interval_s:
+                await self._check_idle()
+                last_check = time.monotonic()
+
+            wanted = min(self.size - len(self._idle) - self._opening,
+                         self.max_size - len(self._idle) - self._opening - self._in_use)
+            if wanted > 0:
+                failed = await self._fill(wanted)
+                if failed:
+                    # Upstream is down or rejecting us: sessions connect
+                    # directly meanwhile, and we retry without hammering it.
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, MAX_BACKOFF_S)
+                    continue
+                backoff = 1.0
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.health_interval_s)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fill(self, count: int) -> bool:
+        """Open `count` warm sockets concurrently. Returns True if any failed."""
+        self._opening += count
+        try:
+            results = await asyncio.gather(*(self._open() for _ in range(count)), return_exceptions=True)
+        finally:
+            self._opening -= count
+        failed = [r for r in results if isinstance(r, BaseException)]
+        opened = [r for r in results if isinstance(r, _Connection)]
+        # Sessions may have connected directly meanwhile; stay within max_size
+        room = 0 if self._closed else max(0, self.max_size - len(self._idle) - self._in_use)
+        self._idle.extend(opened[:room])
+        await asyncio.gather(*(self._discard(conn) for conn in opened[room:]))
+        if failed:
+            self.stats["failed"] += len(failed)
+            log.warning(f"[STT_POOL] {len(failed)}/{count} warm connects failed: {failed[0]}")
+        return bool(failed)
+
+    async def _check_idle(self):
+        """Ping idle sockets; close dead ones and any idle longer than max_idle_s."""
+        now = time.monotonic()
+        stale = [conn for conn in self._idle if now - conn.opened_at > self.max_idle_s]
+        fresh = [conn for conn in self._idle if conn not in stale]
+        results = await asyncio.gather(*(self._healthy(conn) for conn in fresh))
+        unhealthy = [conn for conn, ok in zip(fresh, results) if not ok]
+
+        # A session may have taken one of these while we were pinging
+        drop = [conn for conn in stale + unhealthy if conn in self._idle]
+        if not drop:
+            return
+        self._idle = [conn for conn in self._idle if conn not in drop]
+        self.stats["recycled"] += len(stale)
+        self.stats["unhealthy"] += len(unhealthy)
+        await asyncio.gather(*(self._discard(conn) for conn in drop), return_exceptions=True)
+        log.info(f"[STT_POOL] Recycled {len(stale)} stale and {len(unhealthy)} unhealthy idle sockets")
@@ -0,0 +1,380 @@
+"""
+Append-only store for per-turn clinical telemetry, and the queries over it.
+
+Each turn's clinical_telemetry (PHQ-9/GAD-7 indicators, emotions, crisis
+flag) goes to the browser and, with TELEMETRY_DIR set, here too.
+TelemetrySink.record() puts it on an in-process queue and returns at once; a
+background task drains the queue and appends each batch from a worker thread,
+so a turn never waits on disk. When the queue is full, records are dropped and
+counted rather than slowing turns down.
+
+Storage is partitioned by UTC day: one sqlite file per day and writer process
+(telemetry-2026-10-18.<host>-<pid>.db), so workers never contend for a file
+and retention is deleting old files. Rows are a handful of small integers:
+risk levels are coded by rank, language / emotion / resource / session through
+a per-file dictionary table, emotions as a bitmask. A covering index answers
+cohort aggregates without reading the table.
+
+TelemetryQuery reads every partition in a date range:
+
+    query.trajectory(session_id)                 one session's turns, oldest first
+    query.cohort(start="2026-10-01")             risk distribution and crisis rate by language
+
+Usage:
+    python telemetry_store.py cohort --dir telemetry --start 2026-10-01
+    python telemetry_store.py trajectory 3f9c0a1b2d4e5f60 --dir telemetry
+bench_telemetry.py times both over millions of synthetic turns.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import asyncio
+import logging
+import sqlite3
+import argparse
+from datetime import datetime, timedelta, timezone
+
+log = logging.getLogger("mindwell.telemetry")
+
+RISK_LEVELS = ("low", "moderate", "high", "severe")
+CHANNELS = ("ws", "rest")
+EMOTION_BITS = 62        # distinct emotions per partition that fit the bitmask
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS labels (
+    kind TEXT NOT NULL, id INTEGER NOT NULL, value TEXT NOT NULL,
+    PRIMARY KEY (kind, id), UNIQUE (kind, value)
+);
+CREATE TABLE IF NOT EXISTS turns (
+    ts INTEGER NOT NULL,            -- unix ms
+    session INTEGER,                -- labels 'session'; NULL for anonymous REST turns
+    channel INTEGER NOT NULL,       -- CHANNELS index
+    language INTEGER NOT NULL,      -- labels 'language'
+    phq9 INTEGER,                   -- RISK_LEVELS index; NULL when not reported
+    gad7 INTEGER,
+    crisis INTEGER NOT NULL,
+    fast_path INTEGER NOT NULL,
+    emotions INTEGER NOT NULL,      -- bitmask over labels 'emotion'
+    resource INTEGER                -- labels 'resource'
+);
+CREATE INDEX IF NOT EXISTS turns_session ON turns (session, ts);
+CREATE INDEX IF NOT EXISTS turns_cohort ON turns (language, phq9, gad7, crisis, fast_path);
+"""
+
+
+def day_of(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+def _risk_code(value):
+    value = (value or "").strip().lower()
+    return RISK_LEVELS.index(value) if value in RISK_LEVELS else None
+
+
+def _risk_name(code):
+    return RISK_LEVELS[code] if code is not None else None
+
+
+# ═══════════════════════════════════════════
+# ═══ WRITE PATH ═══
+# ═══════════════════════════════════════════
+
+class _Partition:
+    """One day file opened for appending; only ever used from the writer thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.labels = {}         # kind -> {value: id}
+        for kind, label_id, value in self.db.execute("SELECT kind, id, value FROM labels"):
+            self.labels.setdefault(kind, {})[value] = label_id
+        self._new_labels = []
+        self.overflow = 0        # emotions past EMOTION_BITS, not recorded
+
+    def label(self, kind: str, value):
+        if value is None or value == "":
+            return None
+        ids = self.labels.setdefault(kind, {})
+        label_id = ids.get(value)
+        if label_id is None:
+            label_id = ids[value] = len(ids)
+            self._new_labels.append((kind, label_id, value))
+        return label_id
+
+    def encode(self, record) -> tuple:
+        ts, session_id, channel, language, telemetry = record
+        mask = 0
+        for emotion in telemetry.get("detected_emotions") or ():
+            bit = self.label("emotion", str(emotion).strip().lower())
+            if bit is None:
+                continue
+            if bit >= EMOTION_BITS:
+                self.overflow += 1
+                continue
+            mask |= 1 << bit
+        resource = telemetry.get("recommended_resource")
+        return (
+            int(ts * 1000),
+            self.label("session", session_id),
+            CHANNELS.index(channel),
+            self.label("language", language or "unknown"),
+            _risk_code(telemetry.get("phq9_risk_indicator")),
+            _risk_code(telemetry.get("gad7_risk_indicator")),
+            int(bool(telemetry.get("requires_crisis_intervention"))),
+            int(bool(telemetry.get("crisis_fast_path"))),
+            mask,
+            self.label("resource", str(resource)[:200] if resource else None),
+        )
+
+    def append(self, records: list):
+        rows = [self.encode(record) for record in records]
+        with self.db:
+            if self._new_labels:
+                self.db.executemany("INSERT INTO labels (kind, id, value) VALUES (?, ?, ?)", self._new_labels)
+            self.db.executemany("INSERT INTO turns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self._new_labels = []
+
+    def close(self):
+        self.db.close()
+
+
+class PartitionWriter:
+    """Routes records to their day's file; drops files older than retention_days."""
+
+    def __init__(self, directory: str, retention_days: int = 0, shard: str = None):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.shard = shard or f"{socket.gethostname()}-{os.getpid()}"
+        self._partitions = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, day: str) -> str:
+        return os.path.join(self.directory, f"telemetry-{day}.{self.shard}.db")
+
+    def append(self, records: list):
+        by_day = {}
+        for record in records:
+            by_day.setdefault(day_of(record[0]), []).append(record)
+        for day, day_records in by_day.items():
+            partition = self._partitions.get(day)
+            if partition is None:
+                partition = self._partitions[day] = _Partition(self.path_for(day))
+                self._rotate(day)
+            partition.append(day_records)
+
+    def _rotate(self, today: str):
+        """Close partitions no longer being written and delete expired days."""
+        for day in [d for d in self._partitions if d < today]:
+            self._partitions.pop(day).close()
+        if self.retention_days <= 0:
+            return
+        cutoff = (datetime.strptime(today, "%Y-%m-%d") - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for path in partition_files(self.directory):
+            if _file_day(path) < cutoff:
+                for suffix in ("", "-wal", "-shm"):
+                    try:
+                        os.remove(path + suffix)
+                    except FileNotFoundError:
+                        pass
+                log.info(f"[TELEMETRY] Retention: removed {os.path.basename(path)}")
+
+    def close(self):
+        for partition in self._partitions.values():
+            partition.close()
+        self._partitions.clear()
+
+
+class TelemetrySink:
+    def __init__(self, directory: str, batch_size: int = 500, flush_interval_s: float = 1.0,
+                 max_queue: int = 10000, retention_days: int = 0):
+        self.writer = PartitionWriter(directory, retention_days)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._pending = []       # taken off the queue, not yet handed to a write
+        self._writing = None     # the append in progress, which close() waits for
+        self._task = None
+        self.stats = {"recorded": 0, "dropped": 0, "written": 0, "batches": 0, "errors": 0}
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    def record(self, session_id, channel: str, language: str, telemetry: dict):
+        """Queue one turn's telemetry; never blocks. session_id None is an anonymous turn."""
+        try:
+            self._queue.put_nowait((time.time(), session_id, channel, language, telemetry or {}))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return
+        self.stats["recorded"] += 1
+
+    async def _drain(self):
+        while True:
+            self._pending.append(await self._queue.get())
+            if self._queue.qsize() < self.batch_size - 1:
+                # Let a batch build up rather than writing turn by turn
+                await asyncio.sleep(self.flush_interval_s)
+            batch, self._pending = self._take(self._pending), []
+            # Shielded: cancelling the drain must not leave the worker thread
+            # appending while close() writes to the same connection
+            self._writing = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._writing)
+
+    def _take(self, batch: list) -> list:
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: list):
+        try:
+            await asyncio.to_thread(self.writer.append, batch)
+        except Exception as e:
+            self.stats["errors"] += 1
+            log.warning(f"[TELEMETRY] Writing {len(batch)} records failed, dropped: {e}")
+            return
+        self.stats["written"] += len(batch)
+        self.stats["batches"] += 1
+
+    async def close(self):
+        """Stop draining, write everything recorded so far, then close the partitions."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._writing is not None:
+            await asyncio.gather(self._writing, return_exceptions=True)
+            self._writing = None
+        batch, self._pending = self._pending, []
+        while batch or not self._queue.empty():
+            await self._write(self._take(batch))
+            batch = []
+        await asyncio.to_thread(self.writer.close)
+
+
+# ═══════════════════════════════════════════
+# ═══ QUERIES ═══
+# ═══════════════════════════════════════════
+
+def partition_files(directory: str, start: str = None, end: str = None) -> list:
+    """Partition files for days in [start, end] (YYYY-MM-DD, inclusive), oldest first."""
+    paths = sorted(glob.glob(os.path.join(directory, "telemetry-*.db")))
+    return [p for p in paths if (start is None or _file_day(p) >= start) and (end is None or _file_day(p) <= end)]
+
+
+def _file_day(path: str) -> str:
+    return os.path.basename(path)[len("telemetry-"):len("telemetry-") + 10]
+
+
+def _connect_ro(path: str):
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _labels(db, kind: str) -> dict:
+    return dict(db.execute("SELECT id, value FROM labels WHERE kind = ?", (kind,)))
+
+
+def _default_start(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+class TelemetryQuery:
+    """Read side. Blocking; run it in a thread from async code."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def trajectory(self, session_id: str, start: str = None, end: str = None, days: int = 30) -> list:
+        """One session's turns, oldest first, from the last `days` days unless start is given."""
+        turns = []
+        for path in partition_files(self.directory, start or _default_start(days), end):
+            db = _connect_ro(path)
+            try:
+                row = db.execute("SELECT id FROM labels WHERE kind = 'session' AND value = ?",
+                                 (session_id,)).fetchone()
+                if row is None:
+                    continue
+                languages, emotions = _labels(db, "language"), _labels(db, "emotion")
+                resources = _labels(db, "resource")
+                for ts, channel, language, phq9, gad7, crisis, fast_path, mask, resource in db.execute(
+                        "SELECT ts, channel, language, phq9, gad7, crisis, fast_path, emotions, resource "
+                        "FROM turns WHERE session = ? ORDER BY ts", (row[0],)):
+                    turns.append({
+                        "ts": ts / 1000,
+                        "channel": CHANNELS[channel],
+                        "language": languages.get(language),
+                        "phq9_risk_indicator": _risk_name(phq9),
+                        "gad7_risk_indicator": _risk_name(gad7),
+                        "requires_crisis_intervention": bool(crisis),
+                        "crisis_fast_path": bool(fast_path),
+                        "detected_emotions": [name for bit, name in sorted(emotions.items()) if mask >> bit & 1],
+                        "recommended_resource": resources.get(resource),
+                    })
+            finally:
+                db.close()
+        turns.sort(key=lambda turn: turn["ts"])
+        return turns
+
+    def cohort(self, start: str = None, end: str = None, days: int = 30) -> dict:
+        """
+        {language: {turns, crisis, crisis_fast_path, crisis_rate, phq9: {level: n}, gad7: {level: n}}}
+        over the date range; levels include "unknown" for turns that didn't report one.
+        """
+        cohorts = {}
+        for path in partition_files(self.directory, start or _default_start(days), end):
+            db = _connect_ro(path)
+            try:
+                languages = _labels(db, "language")
+                rows = db.execute("SELECT language, phq9, gad7, SUM(crisis), SUM(fast_path), COUNT(*) "
+                                  "FROM turns GROUP BY language, phq9, gad7").fetchall()
+            finally:
+                db.close()
+            for language, phq9, gad7, crisis, fast_path, count in rows:
+                cohort = cohorts.setdefault(languages.get(language, "unknown"), {
+                    "turns": 0, "crisis": 0, "crisis_fast_path": 0,
+                    "phq9": dict.fromkeys(RISK_LEVELS + ("unknown",), 0),
+                    "gad7": dict.fromkeys(RISK_LEVELS + ("unknown",), 0),
+                })
+                cohort["turns"] += count
+                cohort["crisis"] += crisis
+                cohort["crisis_fast_path"] += fast_path
+                cohort["phq9"][_risk_name(phq9) or "unknown"] += count
+                cohort["gad7"][_risk_name(gad7) or "unknown"] += count
+        for cohort in cohorts.values():
+            cohort["crisis_rate"] = round(cohort["crisis"] / cohort["turns"], 4)
+        return dict(sorted(cohorts.items(), key=lambda item: -item[1]["turns"]))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("query", choices=("cohort", "trajectory"))
+    parser.add_argument("session_id", nargs="?", help="for trajectory")
+    parser.add_argument("--dir", default=os.getenv("TELEMETRY_DIR") or "telemetry")
+    parser.add_argument("--start", help="first day, YYYY-MM-DD (default: --days ago)")
+    parser.add_argument("--end", help="last day, YYYY-MM-DD (default: today)")
+    parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args()
+
+    query = TelemetryQuery(args.dir)
+    if args.query == "trajectory":
+        if not args.session_id:
+            parser.error("trajectory needs a session_id")
+        result = query.trajectory(args.session_id, args.start, args.end, args.days)
+    else:
+        result = query.cohort(args.start, args.end, args.days)
+    json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,50 @@
+"""
+Shared setup for the unit tests: the gateway runs on the local fakes
+(PROVIDERS=fake, see providers.py), so no API key or quota is needed.
+
+    cd cloud-functions && python -m pytest -q
+"""
+import os
+
+# Before main is imported anywhere: fakes, short latencies, no startup warm-ups
+for name, value in {
+    "PROVIDERS": "fake",
+    "SARVAM_API_KEY": "test",
+    "GEMINI_API_KEY": "test",
+    "FAKE_LLM_LATENCY": "0.02",
+    "FAKE_TTS_LATENCY": "0.02",
+    "FAKE_STT_LATENCY": "0.01",
+    "FAKE_STT_CONNECT_LATENCY": "0",
+    "FAKE_UTTERANCE_S": "0.32",
+    "TTS_PREWARM_FILE": "",
+    "ACK_PHRASES_FILE": "",
+    "CRISIS_ASSETS_PATH": "",
+    "STT_POOL_SIZE": "0",
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(name, value)
+
+import pytest
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """main with fresh fake clients and caches for one test; returns the module."""
+    import main
+    from fake_providers import FakeGeminiClient, FakeSarvamClient
+    from tts_cache import TTSCache
+    from audio_codec import AudioEncoder
+    from crisis_cache import CrisisAssetCache
+    from idempotency import IdempotentRequests, TTLCache
+
+    monkeypatch.setattr(main, "gemini_client", FakeGeminiClient(latency_s=0.02))
+    monkeypatch.setattr(main, "sarvam_client", FakeSarvamClient(
+        tts_latency_s=0.02, stt_latency_s=0.01, connect_latency_s=0, transcript="I feel a bit low today",
+        language_code="en-IN"))
+    monkeypatch.setattr(main, "tts_cache", TTSCache())
+    # The app's shutdown closes the encoder's pool, so each test gets its own
+    monkeypatch.setattr(main, "audio_encoder", AudioEncoder(ffmpeg=main.FFMPEG_BIN, workers=2))
+    monkeypatch.setattr(main, "crisis_assets", CrisisAssetCache())
+    monkeypatch.setattr(main, "idempotent_requests", IdempotentRequests())
+    monkeypatch.setattr(main, "transcript_cache", TTLCache())
+    return main
@@ -0,0 +1,40 @@
+import asyncio
+
+from acknowledgments import AcknowledgmentLibrary, StageLatency, wav_duration_s
+from fake_providers import silent_wav_base64
+
+
+def test_stage_latency_averages_per_language_with_a_global_fallback():
+    latency = StageLatency(alpha=0.5)
+    latency.observe("llm", "hi-IN", "ok", 2.0)
+    latency.observe("llm", "hi-IN", "ok", 1.0)
+    latency.observe("llm", "hi-IN", "error", 30.0)       # failures don't count
+    latency.observe("tts", "ta-IN", "ok", 0.4)
+    assert latency.get("llm", "hi-IN") == 1.5
+    assert latency.get("llm", "ta-IN") == 1.5            # no ta-IN samples: all languages
+    assert latency.expected_s(("llm", "tts", "gemini_queue"), "hi-IN") == 1.9
+
+
+def test_choose_fits_the_expected_wait_and_avoids_repeats():
+    library = AcknowledgmentLibrary(seed=1)
+    for text, seconds in (("Hmm.", 0.4), ("Okay, let me think.", 1.0), ("I hear you, give me a moment.", 2.0)):
+        assert library.put("en-IN", "ritu", text, silent_wav_base64(seconds))
+    assert not library.put("en-IN", "ritu", "broken", "not-a-wav")
+
+    assert library.choose("en-IN", "ritu", 1.0, threshold_s=1.5) is None          # reply is quick
+    assert library.choose("en-IN", "ritu", 3.0, 1.5, previous="I hear you, give me a moment.").text == \
+        "Okay, let me think."                                                       # 2.0 s fits 0.7 × 3 s
+    assert library.choose("ta-IN", "ritu", 3.0, 1.5) is None
+    assert library.stats == {"sent": 1, "fast": 1, "no_fit": 0, "missing": 1}
+    assert wav_duration_s(silent_wav_base64(0.5)) == 0.5
+
+
+def test_build_synthesizes_each_phrase_per_speaker():
+    async def synthesize(text, language_code, speaker):
+        if speaker == "anand":
+            raise RuntimeError("voice unavailable")
+        return silent_wav_base64(0.5)
+
+    library = AcknowledgmentLibrary()
+    asyncio.run(library.build([("hi-IN", "अच्छा।"), ("en-IN", "Okay.")], ["ritu", "anand"], synthesize))
+    assert len(library) == 2
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from admission import (UpstreamLimiter, AdmissionController, Overloaded, upstream_priority,
+                       CRISIS, INTERACTIVE, BACKGROUND)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def queue_call(limiter, priority, order, name):
+    with upstream_priority(priority):
+        async with limiter.slot():
+            order.append(name)
+            await settle()
+
+
+def test_waiters_are_served_by_priority_then_arrival():
+    async def scenario():
+        limiter = UpstreamLimiter("gemini", concurrency=1)
+        order = []
+        await limiter.acquire()                      # hold the only slot
+        tasks = [asyncio.create_task(queue_call(limiter, priority, order, name)) for priority, name in (
+            (BACKGROUND, "summary"), (INTERACTIVE, "turn-1"), (CRISIS, "crisis"), (INTERACTIVE, "turn-2"))]
+        await settle()
+        assert limiter.waiting == 4
+        assert limiter.waiting_by_priority() == {"crisis": 1, "interactive": 2, "background": 1}
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order, limiter
+
+    order, limiter = asyncio.run(scenario())
+    assert order == ["crisis", "turn-1", "turn-2", "summary"]
+    assert (limiter.inflight, limiter.waiting) == (0, 0)
+
+
+def test_full_queue_sheds_everything_but_crisis():
+    async def scenario():
+        limiter = UpstreamLimiter("tts", concurrency=1, max_waiting=1, retry_after_s=3)
+        await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await settle()
+        with pytest.raises(Overloaded) as shed:
+            with upstream_priority(BACKGROUND):
+                await limiter.acquire()
+        with upstream_priority(CRISIS):
+            crisis = asyncio.create_task(limiter.acquire())
+        await settle()
+        assert limiter.waiting == 2 and limiter.pressure == 1.0
+        limiter.release()
+        await crisis                                 # crisis first, though it queued last
+        assert not queued.done()
+        limiter.release()
+        await queued
+        limiter.release()
+        return shed.value, limiter
+
+    error, limiter = asyncio.run(scenario())
+    assert error.retry_after_s == 3 and error.status_code == 503
+    assert limiter.stats["shed"] == 1
+    assert limiter.inflight == 0
+
+
+def test_cancel_while_queued_gives_back_the_place():
+    async def scenario():
+        limiter = UpstreamLimiter("stt", concurrency=1)
+        await limiter.acquire()
+        cancelled = asyncio.create_task(limiter.acquire())
+        waiting = asyncio.create_task(limiter.acquire())
+        await settle()
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert limiter.waiting == 1 and limiter.stats["cancelled"] == 1
+        limiter.release()
+        await waiting
+        assert limiter.inflight == 1
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert (limiter.inflight, limiter.waiting) == (0, 0)
+
+
+def test_cancel_in_the_tick_of_the_grant_hands_the_slot_on():
+    async def scenario():
+        limiter = UpstreamLimiter("gemini", concurrency=1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await settle()
+        limiter.release()                            # grants `first`, which hasn't run yet
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        await asyncio.wait_for(second, 1)
+        assert limiter.inflight == 1
+        limiter.release()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert (limiter.inflight, limiter.waiting) == (0, 0)
+
+
+def test_controller_caps_requests_per_client():
+    controller = AdmissionController([], max_client_inflight=1)
+    release = controller.admit_request("10.0.0.1")
+    with pytest.raises(Overloaded) as error:
+        controller.admit_request("10.0.0.1")
+    assert error.value.status_code == 429
+    controller.admit_request("10.0.0.2")
+    release()
+    release()                                        # idempotent
+    controller.admit_request("10.0.0.1")
@@ -0,0 +1,41 @@
+import asyncio
+import struct
+
+import pytest
+
+from audio_codec import AudioEncoder, AudioFormat, pcm_wav_header, WAV_MIME
+
+
+@pytest.mark.parametrize("codec,bitrate,expected", [
+    (None, None, AudioFormat("wav", 32)),
+    ("OPUS", "24", AudioFormat("opus", 24)),
+    ("mp3", 1000, AudioFormat("mp3", 128)),
+    ("opus", 2, AudioFormat("opus", 12)),
+    ("opus", "fast", AudioFormat("opus", 32)),
+    ("flac", 64, AudioFormat("wav", 32)),
+])
+def test_negotiate_clamps_bitrates_and_falls_back_to_wav(codec, bitrate, expected):
+    assert AudioFormat.negotiate(codec, bitrate) == expected
+
+
+def test_mime_types():
+    assert AudioFormat().mime == WAV_MIME and not AudioFormat().compressed
+    assert AudioFormat("opus").mime.startswith("audio/webm")
+    assert AudioFormat("mp3").mime == "audio/mpeg"
+
+
+def test_pcm_wav_header_describes_16khz_mono_pcm():
+    header = pcm_wav_header(32000)
+    assert len(header) == 44 and header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+    channels, rate = struct.unpack("<HI", header[22:28])
+    assert (channels, rate, struct.unpack("<I", header[40:44])[0]) == (1, 16000, 32000)
+
+
+def test_without_ffmpeg_replies_stay_wav():
+    encoder = AudioEncoder(ffmpeg="definitely-not-ffmpeg", workers=1)
+    try:
+        assert asyncio.run(encoder.encode(b"RIFF....", AudioFormat("opus"))) == (b"RIFF....", WAV_MIME)
+        assert asyncio.run(encoder.decode(None, 10)) is None
+        assert encoder.stats["unavailable"] == 1 and encoder.stats["decode_failed"] == 1
+    finally:
+        encoder.close()
@@ -0,0 +1,55 @@
+from array import array
+
+from audio_ingest import PCMIngest
+from fake_providers import speech_pcm
+
+PACKET = 1600                                        # 100 ms at 16 kHz
+SILENCE = bytes(PACKET * 2)
+SPEECH = speech_pcm(PACKET)
+
+
+def ingest(**kwargs) -> PCMIngest:
+    options = dict(packet_ms=100, silence_dbfs=-50, preroll_ms=200, hangover_ms=200, keepalive_ms=0)
+    return PCMIngest(**{**options, **kwargs})
+
+
+def test_frames_are_coalesced_into_packets():
+    stream = ingest(gate=False)
+    frame = SPEECH[:1365 * 2 + 1]                   # odd length: the stray byte is carried over
+    packets = [packet for _ in range(3) for packet in stream.feed(frame)]
+    assert [len(packet) for packet in packets] == [PACKET * 2, PACKET * 2]
+    assert stream.pending
+    assert [len(packet) for packet in stream.flush()] == [(3 * 1365 - 2 * PACKET) * 2 + 2]
+    assert not stream.pending
+
+
+def test_silence_before_any_speech_is_held_back():
+    stream = ingest()
+    assert stream.feed(SILENCE * 5) == []
+
+
+def test_hangover_then_gate_then_preroll():
+    stream = ingest()
+    assert stream.feed(SPEECH) == [SPEECH]
+    # The pause that ends the utterance still reaches the VAD ...
+    assert stream.feed(SILENCE * 2) == [SILENCE, SILENCE]
+    # ... then silence is held back, keeping only the last preroll_ms of it
+    assert stream.feed(SILENCE * 5) == []
+    assert stream.feed(SPEECH) == [SILENCE, SILENCE, SPEECH]
+
+
+def test_keepalive_during_long_silence():
+    stream = ingest(keepalive_ms=500)
+    stream.feed(SPEECH)
+    stream.feed(SILENCE * 2)
+    # Every keepalive_ms one packet goes out, with the held-back preroll ahead of it
+    sent = [stream.feed(SILENCE) for _ in range(10)]
+    assert [len(packets) for packets in sent] == [0, 0, 0, 0, 3, 0, 0, 0, 0, 3]
+
+
+def test_quiet_fricatives_count_as_speech():
+    stream = ingest()
+    hiss = array("h", (60 if i % 2 else -60 for i in range(PACKET))).tobytes()    # ~ -55 dBFS, high ZCR
+    hum = array("h", [60] * PACKET).tobytes()                                      # same level, no crossings
+    assert stream.feed(hum) == []
+    assert stream.feed(hiss) == [hum, hiss]
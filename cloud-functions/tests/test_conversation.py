@@ -0,0 +1,109 @@
+"""/ws/conversation end to end on the fakes: barge-in and crisis delivery."""
+import base64
+import copy
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fake_providers import FAKE_GEMINI_REPLY, FakeGeminiClient, FakeSarvamClient, speech_pcm
+
+UTTERANCE = [{"type": "audio", "audio": base64.b64encode(speech_pcm(1024)).decode("ascii")}] * 5   # 0.32 s
+THREE_SENTENCES = ("This is the first full sentence here. This is the second sentence to say. "
+                   "And finally a third sentence for you.")
+
+
+def reply(spoken_response: str, crisis: bool = False) -> dict:
+    reply = copy.deepcopy(FAKE_GEMINI_REPLY)
+    reply["spoken_response"] = spoken_response
+    reply["clinical_telemetry"]["requires_crisis_intervention"] = crisis
+    return reply
+
+
+def converse(gateway, query: str = "", on_message=None) -> list:
+    """One utterance; every message up to ready / interrupted / error. on_message(ws, msg) may answer."""
+    messages = []
+    with TestClient(gateway.app) as client, client.websocket_connect("/ws/conversation" + query) as ws:
+        for message in UTTERANCE:
+            ws.send_json(message)
+        while True:
+            msg = ws.receive_json()
+            messages.append(msg)
+            if on_message is not None:
+                on_message(ws, msg)
+            if msg["type"] in ("ready", "interrupted", "error"):
+                break
+        ws.send_json({"type": "end"})
+    return messages
+
+
+def of_type(messages: list, *types) -> list:
+    return [msg for msg in messages if msg["type"] in types]
+
+
+def interrupt_after(msg_type: str):
+    def on_message(ws, msg):
+        if msg["type"] == msg_type:
+            ws.send_json({"type": "interrupt"})
+    return on_message
+
+
+@pytest.fixture
+def slow_tts(gateway, monkeypatch):
+    def use(transcript: str, gemini_reply: dict = None, tts_latency_s: float = 0.3):
+        monkeypatch.setattr(gateway, "gemini_client", FakeGeminiClient(
+            latency_s=0, reply=gemini_reply, stream_chunk_chars=20))
+        monkeypatch.setattr(gateway, "sarvam_client", FakeSarvamClient(
+            tts_latency_s=tts_latency_s, connect_latency_s=0, transcript=transcript, language_code="en-IN"))
+        monkeypatch.setattr(gateway, "STREAM_TTS_CONCURRENCY", 1)
+        return gateway
+    return use
+
+
+def test_barge_in_cancels_the_rest_of_a_streamed_reply(slow_tts):
+    gateway = slow_tts("I can't focus on anything", reply(THREE_SENTENCES))
+    before = dict(gateway.BARGE_IN_STATS)
+    messages = converse(gateway, "?stream=1", interrupt_after("response_chunk"))
+
+    interrupted = messages[-1]
+    assert interrupted["type"] == "interrupted" and interrupted["reason"] == "client"
+    assert interrupted["delivered_chunks"] == len(of_type(messages, "response_chunk")) == 1
+    assert not of_type(messages, "response")
+    assert gateway.BARGE_IN_STATS["turns_cancelled"] == before["turns_cancelled"] + 1
+    assert gateway.BARGE_IN_STATS["tts_requests_cancelled"] > before["tts_requests_cancelled"]
+
+
+def test_lexicon_crisis_uses_a_single_response_without_stream(slow_tts):
+    gateway = slow_tts("I just want to kill myself")
+    ignored = gateway.BARGE_IN_STATS["ignored_during_crisis"]
+    messages = converse(gateway, on_message=interrupt_after("processing"))
+
+    assert not of_type(messages, "response_chunk", "interrupted")
+    [response] = of_type(messages, "response")
+    assert response["audio_base64"] and response["crisis"] and "streamed" not in response
+    assert response["telemetry"]["crisis_fast_path"]
+    assert messages[-1]["type"] == "ready"
+    assert gateway.BARGE_IN_STATS["ignored_during_crisis"] == ignored + 1
+
+
+def test_lexicon_crisis_streams_one_protected_chunk(slow_tts):
+    gateway = slow_tts("I just want to kill myself")
+    messages = converse(gateway, "?stream=1", interrupt_after("processing"))
+
+    [chunk] = of_type(messages, "response_chunk")
+    assert chunk["crisis"] and chunk["audio_base64"]
+    [response] = of_type(messages, "response")
+    assert response["streamed"] and response["audio_base64"] is None
+    assert messages[-1]["type"] == "ready"
+
+
+def test_gemini_crisis_flag_replaces_undelivered_sentences(slow_tts):
+    gateway = slow_tts("Everything feels pointless", reply(THREE_SENTENCES, crisis=True))
+    messages = converse(gateway, "?stream=1")
+
+    chunks = of_type(messages, "response_chunk")
+    assert chunks[-1].get("crisis")
+    assert not any(chunk.get("crisis") for chunk in chunks[:-1])
+    assert len(chunks) < 4          # at least one model sentence was never spoken
+    [response] = of_type(messages, "response")
+    assert response["telemetry"]["requires_crisis_intervention"]
+    assert response["spoken_response"].endswith(chunks[-1]["text"])
@@ -0,0 +1,40 @@
+import asyncio
+
+from crisis_cache import CrisisAssetCache, build
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "crisis_assets.json")
+    cache = CrisisAssetCache()
+    cache.put("hi-IN", "ritu", "कृपया 14416 पर कॉल करें", "UklGRg==")
+    cache.put("ta-IN", None, "தயவுசெய்து 14416 அழைக்கவும்")
+    cache.save(path)
+
+    loaded = CrisisAssetCache()
+    assert loaded.load(path) and not CrisisAssetCache().load(str(tmp_path / "missing.json"))
+    asset = loaded.get("hi-IN", "ritu")
+    assert (asset.text, asset.audio_base64) == ("कृपया 14416 पर कॉल करें", "UklGRg==")
+    assert loaded.text("ta-IN") and loaded.get("ta-IN", "ritu") is None
+    assert (loaded.hits, loaded.misses) == (1, 1)
+
+
+def test_build_fills_missing_entries_and_skips_failures():
+    cache = CrisisAssetCache()
+    cache.put("hi-IN", "ritu", "already translated", "cached-audio")
+    translated, synthesized = [], []
+
+    async def translate(language_code):
+        if language_code == "od-IN":
+            raise RuntimeError("quota")
+        translated.append(language_code)
+        return f"text {language_code}"
+
+    async def synthesize(text, language_code, speaker):
+        synthesized.append((language_code, speaker))
+        return f"audio {language_code} {speaker}"
+
+    asyncio.run(build(cache, translate, synthesize, ["hi-IN", "ta-IN", "od-IN"], ["ritu", "anand"]))
+    assert translated == ["ta-IN"]
+    assert sorted(synthesized) == [("hi-IN", "anand"), ("ta-IN", "anand"), ("ta-IN", "ritu")]
+    assert cache.get("hi-IN", "ritu").audio_base64 == "cached-audio"
+    assert cache.get("od-IN", "ritu") is None
@@ -0,0 +1,59 @@
+import json
+import os
+
+import pytest
+
+from crisis_detector import CrisisDetector, DEFAULT_LEXICON_PATH, normalize
+
+CORPUS_PATH = os.path.join(os.path.dirname(DEFAULT_LEXICON_PATH), "crisis_corpus.jsonl")
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return CrisisDetector.from_file(DEFAULT_LEXICON_PATH)
+
+
+@pytest.mark.parametrize("text, high, negated", [
+    ("I want to kill myself", True, 0),
+    ("I would never kill myself", False, 1),                              # negation before the verb
+    ("I would never lie, but I want to kill myself", True, 0),            # clause boundary
+    ("not today, not me, not really, I want to kill myself", True, 0),    # negations in earlier clauses
+    ("no no no I am so sad and I want to kill myself", True, 0),          # "and" starts a new clause
+    ("khud ko khatam kar dunga", True, 0),
+    ("khud ko khatam kar dunga nahi yaar", False, 1),                      # Hindi negates after the verb
+    ("khud ko khatam kar dunga, nahi pata kyun", True, 0),                 # ... but not across a comma
+    ("zindagi khatam kar dunga ek do teen nahi", True, 0),                 # outside the window
+    ("main suicide kar lunga nahi", False, 1),
+])
+def test_negation_window(detector, text, high, negated):
+    detection = detector.detect(text)
+    assert (detection.high, detection.negated) == (high, negated)
+
+
+def test_idioms_are_excluded(detector):
+    detection = detector.detect("I was killing myself laughing at that video")
+    assert not detection.high and detection.excluded == 1
+
+
+def test_signal_words_are_reported_but_never_fire(detector):
+    detection = detector.detect("We discussed suicide prevention in class today")
+    assert not detection.high
+    assert [m.kind for m in detection.matches] == ["signal"]
+
+
+def test_normalize_splits_clauses_and_folds_text():
+    assert normalize("Main  MARNA chahta hoon... sach!") == "main marna chahta hoon | sach |"
+    assert normalize("मैं‍ ठीक हूँ।") == normalize("मैं ठीक हूं |")
+
+
+def test_hinglish_corpus(detector):
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+    hinglish = [item for item in corpus if item["language"] == "hi-IN" and item["text"].isascii()]
+    assert len(hinglish) >= 15
+
+    false_positives = [item["text"] for item in hinglish if not item["crisis"] and detector.detect(item["text"]).high]
+    assert false_positives == []
+    crisis = [item for item in hinglish if item["crisis"]]
+    caught = sum(detector.detect(item["text"]).high for item in crisis)
+    assert caught / len(crisis) >= 0.85
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from idempotency import TTLCache, IdempotentRequests, KeyConflict, fingerprint
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries():
+    clock = Clock()
+    cache = TTLCache(max_entries=8, ttl_s=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats == {"hits": 1, "misses": 1, "expired": 1, "evictions": 0}
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_s=60, clock=Clock())
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+    assert cache.stats["evictions"] == 1
+
+
+def test_ttl_cache_disabled_stores_nothing():
+    cache = TTLCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_fingerprint_distinguishes_fields():
+    assert fingerprint("audio", "en-IN", None) == fingerprint("audio", "en-IN", "")
+    assert fingerprint("audio", "en-IN") != fingerprint("audio", "hi-IN")
+    assert fingerprint("a", "bc") != fingerprint("ab", "c")
+
+
+async def turn(started: list, gate: asyncio.Event, fail: bool = False):
+    started.append(1)
+    yield "transcript", {"user_transcript": "hello"}
+    await gate.wait()
+    if fail:
+        raise RuntimeError("tts down")
+    yield "audio", {"audio_base64": "UklGRg=="}
+
+
+async def collect(run) -> list:
+    return [event async for event in run.follow()]
+
+
+def test_retry_joins_the_running_turn_then_replays_it():
+    async def scenario():
+        requests, started, gate = IdempotentRequests(), [], asyncio.Event()
+        assert requests.find("k", "fp") is None
+        run = requests.start("k", "fp", turn(started, gate))
+        await asyncio.sleep(0)
+        joined = requests.find("k", "fp")
+        assert joined is run and requests.running == 1
+        first, second = asyncio.create_task(collect(run)), asyncio.create_task(collect(joined))
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(first, second)
+        replayed = requests.find("k", "fp")
+        return requests, started, results, await collect(replayed)
+
+    requests, started, (first, second), replay = asyncio.run(scenario())
+    assert started == [1]                            # the turn ran once
+    assert first == second == replay and [event for event, _ in first] == ["transcript", "audio"]
+    assert requests.stats == {"executed": 1, "joined": 1, "replayed": 1, "failed": 0, "conflicts": 0}
+
+
+def test_key_reused_for_a_different_request_conflicts():
+    async def scenario():
+        requests, gate = IdempotentRequests(), asyncio.Event()
+        gate.set()
+        await collect(requests.start("key:abc", "fp-1", turn([], gate)))
+        with pytest.raises(KeyConflict):
+            requests.find("key:abc", "fp-2")
+        return requests
+
+    assert asyncio.run(scenario()).stats["conflicts"] == 1
+
+
+def test_failed_turn_is_not_replayed():
+    async def scenario():
+        requests, gate = IdempotentRequests(), asyncio.Event()
+        gate.set()
+        run = requests.start("k", "fp", turn([], gate, fail=True))
+        with pytest.raises(RuntimeError):
+            await collect(run)
+        return requests
+
+    requests = asyncio.run(scenario())
+    assert requests.find("k", "fp") is None
+    assert requests.stats["failed"] == 1
+
+
+def test_run_outlives_its_listeners():
+    async def scenario():
+        requests, started, gate = IdempotentRequests(), [], asyncio.Event()
+        done = []
+        run = requests.start("k", "fp", turn(started, gate), on_done=lambda: done.append(1))
+        listener = asyncio.create_task(collect(run))
+        await asyncio.sleep(0)
+        listener.cancel()                            # the client went away
+        gate.set()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return requests, run, done
+
+    requests, run, done = asyncio.run(scenario())
+    assert run.done and run.error is None and done == [1]
+    assert requests.find("k", "fp") is run
@@ -0,0 +1,133 @@
+import asyncio
+
+from memory import ConversationMemory, TRAJECTORY_KEEP, estimate_tokens
+
+
+def telemetry(phq9="low", gad7="low", crisis=False) -> dict:
+    return {"phq9_risk_indicator": phq9, "gad7_risk_indicator": gad7, "requires_crisis_intervention": crisis}
+
+
+def test_turns_past_the_window_are_dropped_without_a_summarizer():
+    memory = ConversationMemory(recent_turns=2)
+    for i in range(3):
+        memory.add_turn(f"user {i}", f"ai {i}")
+    assert len(memory) == 2
+    assert [m["text"] for m in memory.as_chat_history()] == ["user 1", "ai 1", "user 2", "ai 2"]
+
+
+def test_evicted_turns_are_folded_into_the_summary():
+    folded = []
+
+    async def summarize(previous: str, turns: list) -> str:
+        folded.append([turn.user_text for turn in turns])
+        return f"{previous} +{len(turns)}".strip()
+
+    async def scenario():
+        memory = ConversationMemory(summarize, recent_turns=2)
+        for i in range(4):
+            memory.add_turn(f"user {i}", f"ai {i}", telemetry())
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return memory
+
+    memory = asyncio.run(scenario())
+    assert [turn for batch in folded for turn in batch] == ["user 0", "user 1"]
+    assert memory.summary.endswith("+1") or memory.summary == "+2"
+    note = memory.as_chat_history()[0]
+    assert note["sender"] == "user" and "Summary of the earlier conversation" in note["text"]
+    assert memory.to_state()["to_fold"] == []
+
+
+def test_failing_summarizer_keeps_the_backlog_bounded():
+    async def summarize(previous, turns):
+        raise RuntimeError("quota")
+
+    async def scenario():
+        memory = ConversationMemory(summarize, recent_turns=2)
+        for i in range(12):
+            memory.add_turn(f"user {i}", f"ai {i}")
+            await asyncio.sleep(0)
+        return memory
+
+    memory = asyncio.run(scenario())
+    assert len(memory.to_state()["to_fold"]) <= 2 + 1
+
+
+def test_token_budget_evicts_long_turns_but_keeps_the_latest():
+    memory = ConversationMemory(recent_turns=10, token_budget=100)
+    long_text = "word " * 60                          # ~75 tokens
+    memory.add_turn(long_text, "ok")
+    memory.add_turn(long_text, "ok")
+    assert len(memory) == 1
+    memory.add_turn("x " * 400, "ok")                 # over budget on its own
+    assert len(memory) == 1
+    assert memory.as_chat_history()[0]["text"].startswith("x x")
+
+
+def test_summary_is_truncated_to_a_third_of_the_budget():
+    async def summarize(previous, turns):
+        return "long summary " * 500
+
+    async def scenario():
+        memory = ConversationMemory(summarize, recent_turns=1, token_budget=300)
+        memory.add_turn("a", "b")
+        memory.add_turn("c", "d")
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return memory
+
+    memory = asyncio.run(scenario())
+    assert estimate_tokens(memory.summary) <= 100 + 1 and memory.summary.endswith("…")
+
+
+def test_risk_trajectory_is_capped_with_running_peaks():
+    memory = ConversationMemory(recent_turns=2)
+    memory.add_turn("bad day", "…", telemetry("severe", "moderate", crisis=True))
+    for i in range(TRAJECTORY_KEEP + 10):
+        memory.add_turn(f"user {i}", "…", telemetry())
+
+    assert len(memory.risk_trajectory) == TRAJECTORY_KEEP
+    assert memory.risk_turns == TRAJECTORY_KEEP + 11
+    assert memory.crisis_ever and memory.peak_risk == ("severe", "moderate")
+    note = memory.as_chat_history()[0]["text"]
+    assert "Highest earlier in this conversation: PHQ-9 severe; GAD-7 moderate." in note
+    assert "Crisis intervention was triggered earlier" in note
+
+
+def test_state_round_trip_and_old_states():
+    memory = ConversationMemory(recent_turns=3)
+    memory.add_turn("hi", "hello", telemetry("moderate", "high"))
+    restored = ConversationMemory.from_state(memory.to_state(), recent_turns=3)
+    assert restored.to_state() == memory.to_state()
+
+    # Saved before the cap: an unbounded trajectory and no running flags
+    old = {"summary": "", "recent": [], "to_fold": [],
+           "risk_trajectory": [["high", "low", True]] + [["low", "low", False]] * 50}
+    restored = ConversationMemory.from_state(old, recent_turns=3)
+    assert len(restored.risk_trajectory) == TRAJECTORY_KEEP
+    assert (restored.risk_turns, restored.crisis_ever, restored.peak_risk) == (51, True, ("high", "low"))
+
+
+def test_messages_are_built_once_per_turn():
+    built = []
+
+    def build(sender, text):
+        built.append(text)
+        return (sender, text)
+
+    memory = ConversationMemory(recent_turns=2)
+    memory.add_turn("one", "reply one")
+    assert memory.as_messages(build) == [("user", "one"), ("ai", "reply one")]
+    memory.add_turn("two", "reply two", telemetry())
+    assert memory.as_messages(build)[-2:] == [("user", "two"), ("ai", "reply two")]
+    assert built == ["one", "reply one", "two", "reply two"]
+
+    # Evicted turns leave the trajectory to the context note, which is built once
+    memory.add_turn("three", "", telemetry())
+    memory.add_turn("four", "reply four", telemetry())
+    first = memory.as_messages(build)
+    assert memory.as_messages(build) == first
+    assert [text for _, text in first[1:]] == ["three", "four", "reply four"]
+    assert first[0][1].startswith("[Conversation context]")
+    assert built.count(first[0][1]) == 1 and built.count("three") == 1
+    assert [m["text"] for m in memory.as_chat_history()] == [text for _, text in first]
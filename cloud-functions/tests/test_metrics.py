@@ -0,0 +1,55 @@
+import json
+import base64
+
+from fastapi.testclient import TestClient
+
+from fake_providers import silent_wav_base64
+from metrics import Registry, span, add_stage_listener
+
+
+def test_registry_renders_counters_histograms_and_callbacks():
+    registry = Registry()
+    turns = registry.counter("demo_turns_total", "Turns.", ("mode",))
+    latency = registry.histogram("demo_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+    registry.callback("demo_depth", "Depth.", lambda: 3)
+    turns.inc(mode="stream")
+    turns.inc(2, mode="stream")
+    latency.observe(0.5, stage="llm")
+
+    text = registry.render()
+    assert 'demo_turns_total{mode="stream"} 3' in text
+    assert 'demo_seconds_bucket{stage="llm",le="0.1"} 0' in text
+    assert 'demo_seconds_bucket{stage="llm",le="1.0"} 1' in text
+    assert 'demo_seconds_count{stage="llm"} 1' in text
+    assert "demo_depth 3" in text
+
+
+def test_span_outcomes_reach_listeners():
+    seen = []
+    add_stage_listener(lambda stage, language, outcome, duration_s: seen.append((stage, language, outcome)))
+    with span("test_stage", "hi-IN"):
+        pass
+    try:
+        with span("test_stage"):
+            raise ValueError
+    except ValueError:
+        pass
+    assert seen[-2:] == [("test_stage", "hi-IN", "ok"), ("test_stage", "unknown", "error")]
+
+
+def test_client_language_codes_do_not_create_label_series(gateway):
+    assert gateway.language_label("ta-IN") == "ta-IN"
+    assert (gateway.language_label(None), gateway.language_label("unknown")) == ("unknown", "unknown")
+    assert gateway.language_label("zz-INJECTED-1") == "other"
+
+    wav = base64.b64decode(silent_wav_base64(0.5))
+    batch = "\n".join(json.dumps({"id": str(i), "transcript": "I feel tired", "language_code": f"zz-{i}"})
+                      for i in range(3))
+    with TestClient(gateway.app) as client:
+        response = client.post("/api/v1/voice-turn", files={"audio": ("a.wav", wav, "audio/wav")},
+                               data={"language_code": "zz-INJECTED-2"})
+        assert response.status_code == 200, response.text
+        assert client.post("/api/v1/batch-screen", content=batch).status_code == 200
+        text = client.get("/metrics").text
+    assert "zz-" not in text
+    assert 'mindwell_stage_seconds_count{stage="llm",language="other",outcome="ok"}' in text
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+
+class SlowStream:
+    """Response stream whose first chunk takes `delay` seconds; records aclose()."""
+
+    def __init__(self, delay: float, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503 UNAVAILABLE")
+        raise StopAsyncIteration
+
+    async def aclose(self):
+        self.closed = True
+
+
+def serve(gateway, monkeypatch, stream):
+    async def generate_content_stream(model, contents, config=None):
+        return stream
+    monkeypatch.setattr(gateway.gemini_client.aio.models, "generate_content_stream", generate_content_stream)
+
+
+def test_first_chunk_timeout_closes_the_stream(gateway, monkeypatch):
+    stream = SlowStream(delay=5)
+    serve(gateway, monkeypatch, stream)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(gateway.open_reply_stream([], "gemini-2.5-flash", timeout_s=0.05))
+    assert stream.closed
+
+
+def test_failed_first_chunk_closes_the_stream(gateway, monkeypatch):
+    stream = SlowStream(delay=0, fail=True)
+    serve(gateway, monkeypatch, stream)
+    with pytest.raises(RuntimeError):
+        asyncio.run(gateway.open_reply_stream([], "gemini-2.5-flash", timeout_s=1))
+    assert stream.closed
+
+
+def test_empty_stream_is_returned_open(gateway, monkeypatch):
+    stream = SlowStream(delay=0)
+    serve(gateway, monkeypatch, stream)
+    first, rest = asyncio.run(gateway.open_reply_stream([], "gemini-2.5-flash", timeout_s=1))
+    assert first is None and rest is stream and not stream.closed
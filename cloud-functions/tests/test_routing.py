@@ -0,0 +1,86 @@
+import json
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from admission import Overloaded
+from crisis_detector import CrisisMatch, Detection
+from routing import ModelTier, Router, parse_prices, should_fall_back
+
+FAST = ModelTier("fast", "flash-lite", 2.0, (0.10, 0.40, 0.01))
+STRONG = ModelTier("strong", "flash", 4.0)
+FALLBACK = ModelTier("fallback", "backup", 6.0)
+
+
+def router() -> Router:
+    return Router(FAST, STRONG, FALLBACK)
+
+
+@pytest.mark.parametrize("trajectory, detection, crisis_ever, expected", [
+    ((), None, False, ("fast", "routine")),
+    ((("low", "low", False),), None, False, ("fast", "routine")),
+    ((("low", "moderate", False),), None, False, ("strong", "risk")),
+    ((("severe", "low", False), ("low", "low", False)), None, False, ("fast", "routine")),
+    ((), Detection([CrisisMatch("hopeless", "en", "signal")]), False, ("strong", "signal")),
+    ((), Detection([CrisisMatch("kill myself", "en", "high")]), False, ("strong", "crisis")),
+    ((("low", "low", True), ("low", "low", False)), None, False, ("strong", "crisis")),
+    ((), None, True, ("strong", "crisis")),
+])
+def test_route_by_risk(trajectory, detection, crisis_ever, expected):
+    route = router().route(trajectory, detection, crisis_ever)
+    assert (route.primary.name, route.reason) == expected
+    assert len({tier.model for tier in route.tiers}) == len(route.tiers) == 3
+
+
+def test_strong_route_falls_back_to_the_backup_then_the_fast_model():
+    assert [tier.name for tier in router().strong_route().tiers] == ["strong", "fallback", "fast"]
+    assert [tier.name for tier in Router(None, STRONG).route().tiers] == ["strong"]
+
+
+def test_call_falls_back_on_timeout_and_server_errors():
+    r = router()
+    errors = {"flash-lite": asyncio.TimeoutError(), "flash": type("ServerError", (Exception,), {"code": 503})()}
+
+    async def attempt(tier):
+        if tier.model in errors:
+            raise errors[tier.model]
+        return f"reply from {tier.model}"
+
+    attempts = []
+    result, tier = asyncio.run(r.call(r.route(), attempt, attempts))
+    assert (result, tier.name) == ("reply from backup", "fallback")
+    assert [a.outcome for a in attempts] == ["timeout", "error", "ok"]
+    assert r.fallbacks == {("flash-lite", "flash"): 1, ("flash", "backup"): 1}
+
+
+@pytest.mark.parametrize("error", [
+    Overloaded("shed", 1.0),
+    type("ClientError", (Exception,), {"code": 400})(),
+    ValueError("bad request"),
+])
+def test_call_raises_errors_another_model_cannot_fix(error):
+    r = router()
+    calls = []
+
+    async def attempt(tier):
+        calls.append(tier.model)
+        raise error
+
+    with pytest.raises(type(error)):
+        asyncio.run(r.call(r.route(), attempt))
+    assert calls == ["flash-lite"]
+
+
+def test_should_fall_back():
+    assert should_fall_back(json.JSONDecodeError("x", "", 0))
+    assert should_fall_back(type("Quota", (Exception,), {"code": 429})())
+    assert not should_fall_back(Overloaded("queue full", 1.0, status=429))
+
+
+def test_prices_and_cost():
+    assert parse_prices("flash=0.30/2.50/0.03, lite=0.1/0.4") == {"flash": (0.30, 2.50, 0.03), "lite": (0.1, 0.4, 0.0)}
+    usage = SimpleNamespace(prompt_token_count=1_000_000, cached_content_token_count=500_000,
+                            candidates_token_count=100_000)
+    assert FAST.cost_usd(usage) == pytest.approx(0.05 + 0.005 + 0.04)
+    assert FAST.cost_usd(None) == 0.0
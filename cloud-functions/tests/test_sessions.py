@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from memory import ConversationMemory
+from sessions import SessionStore, MemoryBackend, SqliteBackend, make_store, new_token, session_key
+
+
+def conversation_state() -> dict:
+    memory = ConversationMemory(recent_turns=3)
+    memory.add_turn("exams are close", "That sounds like a lot.",
+                    {"phq9_risk_indicator": "moderate", "gad7_risk_indicator": "high",
+                     "requires_crisis_intervention": False})
+    memory.add_turn("नींद नहीं आती", "नींद की कमी थका देती है।")
+    return memory.to_state()
+
+
+@pytest.fixture(params=["memory", "sqlite", "fake-redis"])
+def spec(request, tmp_path):
+    return f"sqlite:{tmp_path / 'sessions.db'}" if request.param == "sqlite" else request.param
+
+
+def test_state_round_trips_through_each_backend(spec):
+    token, state = new_token(), conversation_state()
+
+    async def scenario():
+        store = make_store(spec)
+        store.save(token, state)
+        pending = await store.load(token)             # read back before the write-behind flush
+        await store.flush()
+        stored = await store.load(token)
+        missing = await store.load(new_token())
+        await store.close()
+        return pending, stored, missing, store.stats
+
+    pending, stored, missing, stats = asyncio.run(scenario())
+    assert pending == stored == state and missing is None
+    assert ConversationMemory.from_state(stored, recent_turns=3).to_state() == state
+    assert (stats["writes"], stats["hits"], stats["misses"]) == (1, 2, 1)
+
+
+def test_sqlite_sessions_survive_a_restart(tmp_path):
+    path, token, state = str(tmp_path / "sessions.db"), new_token(), conversation_state()
+
+    async def write():
+        store = SessionStore(SqliteBackend(path))
+        store.save(token, {"summary": "old"})
+        store.save(token, state)                      # coalesced: only the latest is written
+        await store.close()                           # close flushes
+        return store.stats
+
+    async def read():
+        store = SessionStore(SqliteBackend(path))
+        try:
+            return await store.load(token)
+        finally:
+            await store.close()
+
+    stats = asyncio.run(write())
+    assert (stats["coalesced"], stats["writes"]) == (1, 1)
+    assert asyncio.run(read()) == state
+
+
+def test_keys_are_token_hashes_and_sessions_expire():
+    token = new_token()
+
+    async def scenario():
+        backend = MemoryBackend()
+        store = SessionStore(backend, ttl_s=0.05)
+        store.save(token, {"summary": "s"})
+        await store.flush()
+        keys = list(backend._data)
+        await asyncio.sleep(0.1)
+        return keys, await store.load(token)
+
+    keys, expired = asyncio.run(scenario())
+    assert keys == [session_key(token)] and token not in keys[0]
+    assert expired is None
+
+
+def test_failed_write_is_retried_without_overwriting_newer_saves():
+    class FlakyBackend(MemoryBackend):
+        fail = True
+
+        async def put_many(self, items, ttl_s):
+            if self.fail:
+                raise ConnectionError("store down")
+            await super().put_many(items, ttl_s)
+
+    token = new_token()
+
+    async def scenario():
+        backend = FlakyBackend()
+        store = SessionStore(backend)
+        store.save(token, {"summary": "first"})
+        await store.flush()
+        store.save(token, {"summary": "second"})
+        backend.fail = False
+        await store.flush()
+        return store.stats, await backend.get(session_key(token))
+
+    stats, raw = asyncio.run(scenario())
+    assert stats["errors"] == 1 and stats["writes"] == 1
+    assert '"second"' in raw
+
+
+def test_unknown_store_spec_is_rejected():
+    with pytest.raises(ValueError):
+        make_store("postgres://nowhere")
@@ -0,0 +1,29 @@
+import os
+import subprocess
+import sys
+
+from bench_startup import DEFERRED_MODULES, ENV, HERE, parse_importtime
+
+
+def import_main(*preload):
+    """Module names `import main` pulls in, in a fresh interpreter with live providers."""
+    code = "".join(f"import {module}; " for module in preload) + "import main"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=HERE, env={**os.environ, **ENV}, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr[-2000:]
+    return [name for name, _, _, _ in parse_importtime(result.stderr)]
+
+
+def deferred(modules):
+    return sorted(name for name in modules
+                  if any(name == module or name.startswith(module + ".") for module in DEFERRED_MODULES))
+
+
+def test_provider_sdks_are_not_imported_with_main():
+    modules = import_main()
+    assert "main" in modules
+    assert deferred(modules) == []
+
+
+def test_an_eager_sdk_import_would_show_up():
+    assert "google.genai" in deferred(import_main("google.genai"))
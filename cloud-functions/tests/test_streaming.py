@@ -0,0 +1,57 @@
+from streaming import SpokenResponseExtractor, SentenceSplitter, JSONFlagWatcher
+
+
+def feed_all(extractor, text: str, size: int) -> str:
+    return "".join(extractor.feed(text[i:i + size]) for i in range(0, len(text), size))
+
+
+def test_extractor_decodes_spoken_response_at_any_chunk_size():
+    raw = ('{"spoken_response": "Line one.\\nSay \\"hi\\" \\u0928\\u092e\\u0938\\u094d\\u0924\\u0947 \\ud83d\\ude42", '
+           '"clinical_telemetry": {"spoken_response": "nested, not spoken"}}')
+    for size in (1, 2, 3, 5, 7, len(raw)):
+        extractor = SpokenResponseExtractor()
+        assert feed_all(extractor, raw, size) == 'Line one.\nSay "hi" नमस्ते 🙂'
+        assert extractor.done
+
+
+def test_extractor_ignores_the_key_inside_other_strings():
+    raw = '{"note": "spoken_response: nope", "spoken_response": "Yes."}'
+    assert feed_all(SpokenResponseExtractor(), raw, 4) == "Yes."
+
+
+def test_extractor_skips_non_string_value():
+    extractor = SpokenResponseExtractor()
+    assert feed_all(extractor, '{"spoken_response": null, "x": "y"}', 3) == ""
+    assert not extractor.done
+
+
+def test_splitter_yields_sentences_across_chunk_boundaries():
+    text = "This is the first sentence. यह दूसरा वाक्य है। Pi is 3.14 today, right? And the tail"
+    splitter = SentenceSplitter(min_chars=10)
+    sentences = []
+    for i in range(0, len(text), 4):
+        sentences += splitter.feed(text[i:i + 4])
+    assert sentences == ["This is the first sentence.", "यह दूसरा वाक्य है।", "Pi is 3.14 today, right?"]
+    assert splitter.flush() == ["And the tail"]
+    assert splitter.flush() == []
+
+
+def test_splitter_merges_short_fragments():
+    splitter = SentenceSplitter(min_chars=20)
+    assert splitter.feed("Hmm. Okay. That sounds really hard. ") == ["Hmm. Okay. That sounds really hard."]
+
+
+def test_flag_watcher_spots_the_flag_split_across_chunks():
+    raw = '{"spoken_response": "I hear you.", "clinical_telemetry": {"requires_crisis_intervention" :  true}}'
+    watcher = JSONFlagWatcher("requires_crisis_intervention")
+    seen = [watcher.feed(raw[i:i + 3]) for i in range(0, len(raw), 3)]
+    assert seen[-1] is True
+    assert seen.index(True) < len(seen) - 1     # before the JSON is complete
+
+
+def test_flag_watcher_ignores_the_key_quoted_inside_a_string():
+    raw = '{"spoken_response": "say \\"requires_crisis_intervention\\": true", "x": {"requires_crisis_intervention": false}}'
+    watcher = JSONFlagWatcher("requires_crisis_intervention")
+    for i in range(0, len(raw), 5):
+        watcher.feed(raw[i:i + 5])
+    assert watcher.value is False
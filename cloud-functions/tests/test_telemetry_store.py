@@ -0,0 +1,69 @@
+import time
+import asyncio
+
+from telemetry_store import TelemetrySink, TelemetryQuery
+
+TELEMETRY = {"phq9_risk_indicator": "moderate", "gad7_risk_indicator": "low",
+             "requires_crisis_intervention": False, "detected_emotions": ["sadness"],
+             "recommended_resource": "journaling"}
+
+
+def test_records_survive_an_immediate_close(tmp_path):
+    async def scenario():
+        sink = TelemetrySink(str(tmp_path), flush_interval_s=5.0)
+        sink.start()
+        sink.record("s1", "ws", "hi-IN", TELEMETRY)
+        await asyncio.sleep(0.01)         # the drain holds it while the batch builds up
+        sink.record("s1", "rest", "hi-IN", {**TELEMETRY, "requires_crisis_intervention": True})
+        await sink.close()
+        return sink.stats
+
+    stats = asyncio.run(scenario())
+    assert stats["written"] == stats["recorded"] == 2
+    turns = TelemetryQuery(str(tmp_path)).trajectory("s1")
+    assert [(t["channel"], t["requires_crisis_intervention"]) for t in turns] == [("ws", False), ("rest", True)]
+    assert turns[0]["detected_emotions"] == ["sadness"] and turns[0]["phq9_risk_indicator"] == "moderate"
+
+
+def test_close_waits_for_the_write_in_progress(tmp_path):
+    events = []
+
+    async def scenario():
+        sink = TelemetrySink(str(tmp_path), batch_size=1, flush_interval_s=0)
+        append, close = sink.writer.append, sink.writer.close
+
+        def slow_append(batch):
+            events.append("append")
+            time.sleep(0.2)
+            append(batch)
+            events.append("appended")
+
+        def closing():
+            events.append("close")
+            close()
+
+        sink.writer.append, sink.writer.close = slow_append, closing
+        sink.start()
+        sink.record("s2", "ws", "en-IN", TELEMETRY)
+        await asyncio.sleep(0.05)         # the worker thread is mid-append
+        sink.record("s2", "ws", "en-IN", TELEMETRY)
+        await sink.close()
+        return sink.stats
+
+    stats = asyncio.run(scenario())
+    assert events[:2] == ["append", "appended"] and events[-1] == "close"
+    assert stats["written"] == 2 and stats["errors"] == 0
+    assert len(TelemetryQuery(str(tmp_path)).trajectory("s2")) == 2
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    async def scenario():
+        sink = TelemetrySink(str(tmp_path), max_queue=2)
+        for _ in range(5):
+            sink.record(None, "rest", "en-IN", TELEMETRY)
+        await sink.close()
+        return sink.stats
+
+    stats = asyncio.run(scenario())
+    assert (stats["recorded"], stats["dropped"], stats["written"]) == (2, 3, 2)
+    assert TelemetryQuery(str(tmp_path)).cohort()["en-IN"]["turns"] == 2
@@ -0,0 +1,116 @@
+import asyncio
+import sqlite3
+
+from tts_cache import TTSCache, _DiskTier, cache_key
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def synthesizer(calls: list, audio: str = "A" * 100, delay: float = 0):
+    async def synthesize():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return audio
+    return synthesize
+
+
+def test_keys_normalize_whitespace_and_separate_voices():
+    assert cache_key("Take  a\nbreath ", "hi-IN", "ritu", "bulbul:v3", 1.0) == \
+        cache_key("Take a breath", "hi-IN", "ritu", "bulbul:v3", 1.0)
+    assert cache_key("Take a breath", "hi-IN", "ritu", "bulbul:v3", 1.0) != \
+        cache_key("Take a breath", "hi-IN", "anand", "bulbul:v3", 1.0)
+
+
+def test_memory_hits_and_lru_eviction_by_bytes():
+    calls = []
+
+    async def scenario():
+        cache = TTSCache(max_bytes=250)
+        for key in ("a", "b", "a", "c"):            # "a" used again, so "b" is the oldest
+            await cache.get_or_synthesize(key, synthesizer(calls))
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert len(calls) == 3 and cache.stats["memory_hits"] == 1
+    assert cache.stats["evictions"] == 1 and len(cache) == 2 and cache.size_bytes == 200
+
+
+def test_concurrent_requests_share_one_synthesis():
+    calls = []
+
+    async def scenario():
+        cache = TTSCache()
+        return await asyncio.gather(*(cache.get_or_synthesize("k", synthesizer(calls, delay=0.02))
+                                      for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["A" * 100] * 5
+    assert len(calls) == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    path, calls = str(tmp_path / "tts.db"), []
+
+    async def turn():
+        cache = TTSCache(disk_path=path)
+        try:
+            await cache.get_or_synthesize("k", synthesizer(calls))
+            return dict(cache.stats)
+        finally:
+            cache.close()
+
+    assert asyncio.run(turn())["misses"] == 1
+    assert asyncio.run(turn())["disk_hits"] == 1
+    assert len(calls) == 1
+
+
+def test_disk_tier_evicts_least_recently_used_over_budget(tmp_path):
+    clock, stats = Clock(), {}
+    disk = _DiskTier(str(tmp_path / "tts.db"), max_bytes=250, stats=stats, clock=clock)
+    for key in ("a", "b"):
+        disk.put(key, "x" * 100)
+        clock.now += 1
+    assert disk.get("a") is not None                  # "b" is now the least recently used
+    clock.now += 1
+    disk.put("c", "x" * 100)
+    assert disk.get("b") is None and disk.get("a") and disk.get("c")
+    assert disk.size_bytes == 200 and stats["disk_evictions"] == 1
+    disk.put("huge", "x" * 1000)                      # larger than the whole budget: not kept
+    assert disk.get("huge") is None and disk.size_bytes == 200
+    disk.close()
+
+
+def test_disk_tier_expires_old_rows_and_counts_bytes_after_reopen(tmp_path):
+    path, clock, stats = str(tmp_path / "tts.db"), Clock(), {}
+    disk = _DiskTier(path, max_age_s=60, stats=stats, clock=clock)
+    disk.put("old", "x" * 100)
+    clock.now += 30
+    disk.put("new", "x" * 50)
+    clock.now += 31
+    assert disk.get("old") is None and disk.get("new") == "x" * 50
+    assert disk.size_bytes == 50 and stats["disk_expired"] == 1
+    disk.close()
+
+    reopened = _DiskTier(path, max_age_s=60, clock=clock)
+    assert reopened.size_bytes == 50
+    reopened.close()
+
+
+def test_unbounded_table_from_before_the_budget_is_replaced(tmp_path):
+    path = str(tmp_path / "tts.db")
+    db = sqlite3.connect(path)
+    db.execute("CREATE TABLE tts_audio (key TEXT PRIMARY KEY, audio TEXT NOT NULL)")
+    db.execute("INSERT INTO tts_audio VALUES ('k', 'audio')")
+    db.commit()
+    db.close()
+
+    disk = _DiskTier(path, max_bytes=1000)
+    assert disk.get("k") is None and disk.size_bytes == 0
+    disk.put("k", "audio")
+    assert disk.get("k") == "audio"
+    disk.close()
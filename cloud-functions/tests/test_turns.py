@@ -0,0 +1,60 @@
+import time
+import asyncio
+
+import turns
+from turns import TurnQueue, TurnProgress, BARGE_IN_STATS, record_cancellation
+
+
+def test_merges_transcripts_inside_the_window():
+    queue = TurnQueue(merge_window_s=0.1)
+    queue.put("I have exams", "en-IN")
+    queue.put("and I can't sleep", "hi-IN")
+    time.sleep(0.15)
+    queue.put("what should I do", "en-IN")
+
+    assert len(queue) == 2
+    first, _ = asyncio.run(queue.get())
+    assert (first.transcript, first.language_code, first.merged) == ("I have exams and I can't sleep", "hi-IN", 2)
+    assert queue.stats["merged"] == 1
+
+
+def test_overflow_drops_the_oldest():
+    queue = TurnQueue(maxsize=2, merge_window_s=0)
+    assert queue.put("one", "en-IN") == []
+    queue.put("two", "en-IN")
+    dropped = queue.put("three", "en-IN")
+    assert [turn.transcript for turn in dropped] == ["one"]
+    assert [asyncio.run(queue.get())[0].transcript for _ in range(2)] == ["two", "three"]
+
+
+def test_stale_turns_are_skipped_on_get():
+    queue = TurnQueue(merge_window_s=0, max_age_s=0.1)
+    queue.put("old", "en-IN")
+    time.sleep(0.15)
+    queue.put("fresh", "en-IN")
+    turn, dropped = asyncio.run(queue.get())
+    assert turn.transcript == "fresh"
+    assert [t.transcript for t in dropped] == ["old"]
+    assert queue.stats["dropped_stale"] == 1
+
+
+def test_get_waits_for_a_turn():
+    async def scenario():
+        queue = TurnQueue()
+        waiter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        queue.put("hello", "en-IN")
+        turn, _ = await asyncio.wait_for(waiter, 1)
+        return turn.transcript
+
+    assert asyncio.run(scenario()) == "hello"
+
+
+def test_record_cancellation_counts_the_stage_reached(monkeypatch):
+    monkeypatch.setattr(turns, "BARGE_IN_STATS", dict.fromkeys(BARGE_IN_STATS, 0))
+    record_cancellation(TurnProgress(stage="tts", tts_cancelled=2))
+    record_cancellation(TurnProgress(stage="queued"))
+    assert turns.BARGE_IN_STATS["turns_cancelled"] == 2
+    assert turns.BARGE_IN_STATS["cancelled_in_tts"] == 1
+    assert turns.BARGE_IN_STATS["tts_requests_cancelled"] == 2
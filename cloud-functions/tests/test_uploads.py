@@ -0,0 +1,153 @@
+import io
+import wave
+import array
+import asyncio
+import subprocess
+
+import pytest
+from fastapi.testclient import TestClient
+
+from uploads import WavSegmenter, read_wav_info, transcribe_segments
+
+RATE = 8000
+
+
+def wav_file(samples) -> io.BytesIO:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(RATE)
+        out.writeframes(array.array("h", samples).tobytes())
+    buf.seek(0)
+    return buf
+
+
+def tone(seconds: float, amplitude: int = 8000) -> list:
+    return [amplitude if (i // 8) % 2 else -amplitude for i in range(int(seconds * RATE))]
+
+
+def silence(seconds: float) -> list:
+    return [0] * int(seconds * RATE)
+
+
+def segments(segmenter: WavSegmenter) -> list:
+    out = []
+    while (segment := segmenter.next_segment()) is not None:
+        with wave.open(io.BytesIO(segment), "rb") as reader:
+            out.append(reader.getnframes())
+    segmenter.close()
+    return out
+
+
+def test_read_wav_info_rejects_non_wav_and_rewinds():
+    assert read_wav_info(io.BytesIO(b"\x1aE\xdf\xa3 not a wav")) is None
+    file = wav_file(silence(1.5))
+    info = read_wav_info(file)
+    assert (info.channels, info.frame_rate, info.frames, info.duration_s) == (1, RATE, 12000, 1.5)
+    assert file.tell() == 0
+
+
+def test_segment_cut_moves_to_the_pause_near_the_boundary():
+    # A pause 0.6s before the nominal 2s boundary, inside the 1s search window
+    samples = tone(1.3) + silence(0.2) + tone(3.5)
+    frames = segments(WavSegmenter(wav_file(samples), segment_s=2.0, search_s=1.0))
+    assert int(1.3 * RATE) <= frames[0] <= int(1.5 * RATE)
+    assert sum(frames) == len(samples)
+
+
+def test_segment_cut_stays_at_the_boundary_without_a_pause():
+    samples = tone(5.0)
+    frames = segments(WavSegmenter(wav_file(samples), segment_s=2.0, search_s=0.0))
+    assert frames == [2 * RATE, 2 * RATE, 1 * RATE]
+
+
+def test_short_upload_is_a_single_segment():
+    frames = segments(WavSegmenter(wav_file(tone(2.5)), segment_s=2.0, search_s=1.0))
+    assert frames == [int(2.5 * RATE)]
+
+
+def test_transcribe_segments_keeps_order_and_takes_the_majority_language():
+    delays = [0.03, 0.0, 0.01]
+    languages = ["hi-IN", "en-IN", "hi-IN"]
+
+    async def transcribe(index, segment):
+        await asyncio.sleep(delays[index])
+        return f"part {index}", languages[index]
+
+    segmenter = WavSegmenter(wav_file(tone(5.0)), segment_s=2.0, search_s=0.0)
+    transcript, language = asyncio.run(transcribe_segments(segmenter, transcribe, concurrency=2))
+    segmenter.close()
+    assert (transcript, language) == ("part 0 part 1 part 2", "hi-IN")
+
+
+# ═══════════════════════════════════════════
+# ═══ NON-WAV UPLOADS ═══
+# ═══════════════════════════════════════════
+
+def webm_clip(ffmpeg: str, seconds: int) -> bytes:
+    return subprocess.run(
+        [ffmpeg, "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", f"sine=f=440:d={seconds}",
+         "-ac", "1", "-c:a", "libopus", "-f", "webm", "pipe:1"],
+        capture_output=True, check=True).stdout
+
+
+def record_stt(gateway, monkeypatch) -> list:
+    """Patches the fake STT to note each request's (name, frame rate, seconds); None for non-WAV."""
+    stt = gateway.sarvam_client.speech_to_text
+    transcribe, requests = stt.transcribe, []
+
+    async def recording(file, **kwargs):
+        name, data, _ = file
+        info = read_wav_info(io.BytesIO(data) if isinstance(data, bytes) else data)
+        requests.append((name, info.frame_rate, info.duration_s) if info else (name, None, None))
+        return await transcribe(file, **kwargs)
+
+    monkeypatch.setattr(stt, "transcribe", recording)
+    return requests
+
+
+def post(gateway, data: bytes, filename: str, mime: str):
+    with TestClient(gateway.app) as client:
+        return client.post("/api/v1/voice-turn", files={"audio": (filename, data, mime)})
+
+
+@pytest.fixture
+def ffmpeg(gateway):
+    if not gateway.audio_encoder.available:
+        pytest.skip("ffmpeg not installed (FFMPEG_BIN)")
+    return gateway.audio_encoder.ffmpeg
+
+
+def test_long_webm_upload_is_decoded_and_segmented(gateway, ffmpeg, monkeypatch):
+    requests = record_stt(gateway, monkeypatch)
+    response = post(gateway, webm_clip(ffmpeg, 40), "clip.webm", "audio/webm")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["user_transcript"] == "I feel a bit low today I feel a bit low today"
+    assert [name for name, _, _ in requests] == ["segment-0.wav", "segment-1.wav"]
+    assert all(rate == 16000 and 0 < seconds <= 26 for _, rate, seconds in requests)
+    assert abs(sum(seconds for _, _, seconds in requests) - 40) < 0.5
+
+
+def test_webm_over_the_duration_limit_is_rejected(gateway, ffmpeg, monkeypatch):
+    monkeypatch.setattr(gateway, "MAX_AUDIO_SECONDS", 30)
+    requests = record_stt(gateway, monkeypatch)
+    response = post(gateway, webm_clip(ffmpeg, 40), "clip.webm", "audio/webm")
+    assert response.status_code == 413
+    assert requests == []
+
+
+def test_undecodable_upload_is_unsupported(gateway, ffmpeg, monkeypatch):
+    requests = record_stt(gateway, monkeypatch)
+    response = post(gateway, b"this is not audio at all", "notes.txt", "text/plain")
+    assert response.status_code == 415
+    assert requests == []
+
+
+def test_without_ffmpeg_non_wav_uploads_go_to_stt_as_they_are(gateway, monkeypatch):
+    monkeypatch.setattr(gateway.audio_encoder, "ffmpeg", None)
+    requests = record_stt(gateway, monkeypatch)
+    response = post(gateway, b"\x1aE\xdf\xa3 opus frames", "clip.webm", "audio/webm")
+    assert response.status_code == 200, response.text
+    assert requests == [("clip.webm", None, None)]
@@ -0,0 +1,69 @@
+import asyncio
+import base64
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from ws_protocol import BINARY_SUBPROTOCOL, ClientConnection
+
+
+class RecordingSocket:
+    """Just enough of a Starlette WebSocket to record what the server sends."""
+
+    def __init__(self, subprotocols=(), incoming=()):
+        self.scope = {"subprotocols": list(subprotocols)}
+        self.incoming = list(incoming)
+        self.sent = []
+
+    async def receive(self):
+        return self.incoming.pop(0)
+
+    async def send_json(self, msg):
+        self.sent.append(msg)
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+
+def test_receive_yields_audio_under_either_protocol():
+    socket = RecordingSocket(incoming=[
+        {"type": "websocket.receive", "bytes": b"\x01\x02"},
+        {"type": "websocket.receive", "text": json.dumps({"type": "audio", "audio": base64.b64encode(b"\x03").decode()})},
+        {"type": "websocket.receive", "text": json.dumps({"type": "end_turn"})},
+        {"type": "websocket.disconnect", "code": 1001},
+    ])
+    conn = ClientConnection(socket)
+
+    async def drain():
+        return [await conn.receive() for _ in range(3)]
+
+    assert asyncio.run(drain()) == [("audio", b"\x01\x02"), ("audio", b"\x03"), ("end_turn", {"type": "end_turn"})]
+    with pytest.raises(WebSocketDisconnect):
+        asyncio.run(conn.receive())
+
+
+def test_binary_clients_get_audio_as_a_frame_after_its_header():
+    msg = {"type": "reply", "text": "hi", "audio_base64": base64.b64encode(b"RIFF1234").decode()}
+    json_socket, binary_socket = RecordingSocket(), RecordingSocket([BINARY_SUBPROTOCOL])
+    asyncio.run(ClientConnection(json_socket).send_audio(dict(msg)))
+    asyncio.run(ClientConnection(binary_socket).send_audio(dict(msg)))
+
+    assert json_socket.sent == [msg]
+    assert binary_socket.sent == [{"type": "reply", "text": "hi", "audio_bytes": 8}, b"RIFF1234"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_audio_stream_is_chunked_and_terminated(binary):
+    socket = RecordingSocket([BINARY_SUBPROTOCOL] if binary else [])
+    conn = ClientConnection(socket)
+    asyncio.run(conn.send_audio_stream({"type": "reply", "audio_base64": "x"}, b"abcdefg", "audio/mpeg", 3))
+
+    header, end = socket.sent[0], socket.sent[-1]
+    assert header == {"type": "reply", "audio_base64": None, "audio_stream": 1, "audio_mime": "audio/mpeg"}
+    assert end == {"type": "audio_end", "audio_stream": 1, "chunks": 3}
+    if binary:
+        assert socket.sent[2::2][:3] == [b"abc", b"def", b"g"]
+    else:
+        chunks = [base64.b64decode(m["audio_base64"]) for m in socket.sent[1:-1]]
+        assert chunks == [b"abc", b"def", b"g"]
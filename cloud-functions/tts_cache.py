@@ -0,0 +1,229 @@
+"""
+Content-addressed cache in front of Bulbul TTS.
+
+Keys hash the normalized text together with language, speaker, model and pace.
+Two tiers: an in-memory LRU bounded by total audio bytes, and an optional
+sqlite file that survives restarts. The sqlite tier has its own byte budget
+(least recently used rows go first) and a maximum age, so synthesized replies
+are neither kept on disk indefinitely nor allowed to fill it. Concurrent
+requests for the same key share one upstream call.
+"""
+import re
+import time
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+log = logging.getLogger("mindwell.tts_cache")
+
+
+def normalize_text(text: str) -> str:
+    """NFC, collapsed whitespace — spelling variants that sound identical share a key."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+def cache_key(text: str, language_code: str, speaker: str, model: str, pace: float) -> str:
+    raw = "\x1f".join((normalize_text(text), language_code, speaker, model, f"{pace:.2f}"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """
+    sqlite blob store bounded by max_bytes (least recently used rows are
+    deleted first) and max_age_s since a row was stored; 0 disables a bound.
+    Every call runs in a worker thread; evictions are counted in `stats`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, max_age_s: float = 0, stats: dict = None,
+                 clock=time.time):
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.stats = stats if stats is not None else {}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(tts_audio)")}
+        if columns and "used_at" not in columns:
+            # Unbounded table from before the budget: it is only a cache
+            log.info("[TTS-CACHE] Dropping the old unbounded disk cache")
+            self._db.execute("DROP TABLE tts_audio")
+        self._db.execute("CREATE TABLE IF NOT EXISTS tts_audio (key TEXT PRIMARY KEY, audio TEXT NOT NULL, "
+                         "bytes INTEGER NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tts_audio_used ON tts_audio (used_at)")
+        self._db.commit()
+        self._bytes = 0
+        with self._lock:
+            self._expire()
+            self._bytes = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM tts_audio").fetchone()[0]
+            self._db.commit()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute("SELECT audio, stored_at FROM tts_audio WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.max_age_s > 0 and row[1] <= self._clock() - self.max_age_s:
+                self._expire()
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE tts_audio SET used_at = ? WHERE key = ?", (self._clock(), key))
+            self._db.commit()
+        return row[0]
+
+    def put(self, key: str, audio_base64: str):
+        if self.max_bytes > 0 and len(audio_base64) > self.max_bytes:
+            return
+        with self._lock:
+            now = self._clock()
+            old = self._db.execute("SELECT bytes FROM tts_audio WHERE key = ?", (key,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO tts_audio (key, audio, bytes, stored_at, used_at) "
+                             "VALUES (?, ?, ?, ?, ?)", (key, audio_base64, len(audio_base64), now, now))
+            self._bytes += len(audio_base64) - (old[0] if old else 0)
+            self._expire()
+            if self.max_bytes > 0 and self._bytes > self.max_bytes:
+                self._evict(self._bytes - self.max_bytes)
+            self._db.commit()
+
+    def _expire(self):
+        """Delete rows older than max_age_s. Caller holds the lock and commits."""
+        if self.max_age_s <= 0:
+            return
+        cutoff = self._clock() - self.max_age_s
+        freed, count = self._db.execute("SELECT COALESCE(SUM(bytes), 0), COUNT(*) FROM tts_audio "
+                                        "WHERE stored_at <= ?", (cutoff,)).fetchone()
+        if count:
+            self._db.execute("DELETE FROM tts_audio WHERE stored_at <= ?", (cutoff,))
+            self._bytes -= freed
+            self.stats["disk_expired"] = self.stats.get("disk_expired", 0) + count
+
+    def _evict(self, excess: int):
+        """Delete least recently used rows until `excess` bytes are freed. Caller holds the lock and commits."""
+        keys, freed = [], 0
+        for key, size in self._db.execute("SELECT key, bytes FROM tts_audio ORDER BY used_at"):
+            if freed >= excess:
+                break
+            keys.append(key)
+            freed += size
+        self._db.executemany("DELETE FROM tts_audio WHERE key = ?", ((key,) for key in keys))
+        self._bytes -= freed
+        self.stats["disk_evictions"] = self.stats.get("disk_evictions", 0) + len(keys)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class TTSCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_path: str = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024, disk_max_age_s: float = 7 * 86400):
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()     # key -> base64 audio
+        self._bytes = 0
+        self._inflight = {}           # key -> [task shared by concurrent callers, waiter count]
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "cancelled": 0,
+                      "disk_evictions": 0, "disk_expired": 0}
+        self._disk = _DiskTier(disk_path, disk_max_bytes, disk_max_age_s, self.stats) if disk_path else None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk.size_bytes if self._disk else 0
+
+    def __len__(self):
+        return len(self._lru)
+
+    def _remember(self, key: str, audio_base64: str):
+        if key in self._lru:
+            self._bytes -= len(self._lru.pop(key))
+        self._lru[key] = audio_base64
+        self._bytes += len(audio_base64)
+        while self._bytes > self.max_bytes and len(self._lru) > 1:
+            _, evicted = self._lru.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    async def get_or_synthesize(self, key: str, synthesize):
+        """Cached audio for key, or the result of `await synthesize()` (then cached)."""
+        audio = self._lru.get(key)
+        if audio is not None:
+            self._lru.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return audio
+
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = self._inflight[key] = [asyncio.create_task(self._fill(key, synthesize)), 0]
+        else:
+            self.stats["memory_hits"] += 1
+
+        # The upstream call is shared: one caller cancelling (barge-in) must not
+        # fail the others, but once every caller has gone it is cancelled too.
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+                self.stats["cancelled"] += 1
+
+    async def _fill(self, key: str, synthesize):
+        try:
+            audio = await asyncio.to_thread(self._disk.get, key) if self._disk else None
+            if audio is not None:
+                self.stats["disk_hits"] += 1
+            else:
+                self.stats["misses"] += 1
+                audio = await synthesize()
+                if self._disk:
+                    await asyncio.to_thread(self._disk.put, key, audio)
+            self._remember(key, audio)
+            return audio
+        finally:
+            self._inflight.pop(key, None)
+
+    async def prewarm(self, items, synthesize, concurrency: int = 4):
+        """
+        Fill the cache for (text, language_code, speaker) items.
+        synthesize(text, language_code, speaker) must be the cache-aware
+        synthesis function, so keys are derived exactly as on a live turn.
+        """
+        slots = asyncio.Semaphore(concurrency)
+
+        async def warm(text, language_code, speaker):
+            async with slots:
+                try:
+                    await synthesize(text, language_code, speaker)
+                except Exception as e:
+                    log.warning(f"[TTS-CACHE] Prewarm failed for '{text[:40]}' ({language_code}): {e}")
+
+        await asyncio.gather(*(warm(*item) for item in items))
+
+    def close(self):
+        if self._disk:
+            self._disk.close()
+
+
+def load_phrase_list(path: str) -> list:
+    """`language_code|text` per line; blank lines and # comments are skipped."""
+    phrases = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#") or "|" not in line:
+                continue
+            language_code, text = line.split("|", 1)
+            phrases.append((language_code.strip(), text.strip()))
+    return phrases
@@ -0,0 +1,107 @@
+"""
+Per-session turn queue for /ws/conversation.
+
+STT events are drained continuously by one task; final transcripts go into
+this bounded queue and a worker processes them one at a time, in order. That
+keeps VAD feedback real-time no matter how long a Gemini + TTS turn takes.
+
+Queue policies:
+* merge — a transcript arriving within `merge_window_s` of the last queued
+  (not yet started) one is appended to it: Saaras often splits one thought
+  across two utterances at a pause, and the user wants a single reply.
+* stale — a turn that waited longer than `max_age_s` is dropped when dequeued;
+  the conversation has moved on by then.
+* overflow — when `maxsize` turns are already waiting, the oldest is dropped.
+"""
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class PendingTurn:
+    transcript: str
+    language_code: str
+    received_at: float = field(default_factory=time.monotonic)
+    updated_at: float = field(default_factory=time.monotonic)
+    merged: int = 1
+
+
+class TurnQueue:
+    def __init__(self, maxsize: int = 3, merge_window_s: float = 2.0, max_age_s: float = 30.0):
+        self.maxsize = maxsize
+        self.merge_window_s = merge_window_s
+        self.max_age_s = max_age_s
+        self._turns = deque()
+        self._ready = asyncio.Event()
+        self.stats = {"queued": 0, "merged": 0, "dropped_stale": 0, "dropped_overflow": 0}
+
+    def __len__(self):
+        return len(self._turns)
+
+    def put(self, transcript: str, language_code: str) -> list:
+        """Queue a final transcript. Returns any turns dropped to make room."""
+        now = time.monotonic()
+        tail = self._turns[-1] if self._turns else None
+        if tail and now - tail.updated_at <= self.merge_window_s:
+            tail.transcript = f"{tail.transcript} {transcript}"
+            tail.language_code = language_code
+            tail.updated_at = now
+            tail.merged += 1
+            self.stats["merged"] += 1
+            return []
+
+        dropped = []
+        while len(self._turns) >= self.maxsize:
+            dropped.append(self._turns.popleft())
+            self.stats["dropped_overflow"] += 1
+        self._turns.append(PendingTurn(transcript, language_code))
+        self.stats["queued"] += 1
+        self._ready.set()
+        return dropped
+
+    async def get(self):
+        """Next turn to process, plus any stale turns skipped on the way: (turn, dropped)."""
+        dropped = []
+        while True:
+            while not self._turns:
+                self._ready.clear()
+                await self._ready.wait()
+            turn = self._turns.popleft()
+            if time.monotonic() - turn.received_at > self.max_age_s:
+                dropped.append(turn)
+                self.stats["dropped_stale"] += 1
+                continue
+            return turn, dropped
+
+
+# ═══════════════════════════════════════════
+# ═══ BARGE-IN ═══
+# ═══════════════════════════════════════════
+
+@dataclass
+class TurnProgress:
+    """How far a turn got, so a cancelled one can be accounted for."""
+    stage: str = "queued"                          # queued → llm → tts → send → done
+    delivered: list = field(default_factory=list)  # sentences actually sent to the client
+    tts_cancelled: int = 0                         # TTS requests aborted mid-flight
+    protected: bool = False                        # crisis safety message in delivery; barge-in is ignored
+
+
+# Process-wide counters of the upstream work barge-in saved.
+BARGE_IN_STATS = {
+    "turns_cancelled": 0,
+    "cancelled_in_llm": 0,       # Gemini call aborted before it finished
+    "cancelled_in_tts": 0,       # reply generated, synthesis aborted
+    "cancelled_in_send": 0,      # everything done, delivery cut short
+    "tts_requests_cancelled": 0,
+    "ignored_during_crisis": 0,  # barge-in that would have cut off the safety message
+}
+
+
+def record_cancellation(progress: TurnProgress):
+    BARGE_IN_STATS["turns_cancelled"] += 1
+    if progress.stage in ("llm", "tts", "send"):
+        BARGE_IN_STATS[f"cancelled_in_{progress.stage}"] += 1
+    BARGE_IN_STATS["tts_requests_cancelled"] += progress.tts_cancelled
@@ -0,0 +1,221 @@
+"""
+Bounded REST uploads for /api/v1/voice-turn.
+
+* UploadLimitMiddleware rejects an oversized body with 413 before it is
+  parsed — from Content-Length when the client sends one, otherwise as soon
+  as the streamed body crosses the limit. Starlette's multipart parser
+  already spools file parts to disk past 1 MB, so with the cap in place
+  neither memory nor disk grows with the upload.
+* WavSegmenter cuts a long WAV into segments Saaras' REST API accepts (it
+  takes at most 30 s per request), reading a segment's worth of frames at a
+  time and cutting at the quietest 20 ms window near each boundary so words
+  aren't split.
+* transcribe_segments() runs the segments through STT concurrently, with
+  bounded fan-out, and stitches the transcripts back together in order.
+* file_digest() hashes an upload for the idempotency and transcript caches,
+  and detach_upload() hands its spool file to work that outlives the request.
+"""
+import io
+import sys
+import wave
+import array
+import asyncio
+import hashlib
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+from starlette.responses import JSONResponse
+
+WINDOW_S = 0.02
+
+
+class UploadLimitMiddleware:
+    """ASGI middleware capping the request body size for the given path prefixes."""
+
+    def __init__(self, app, paths: tuple, max_bytes: int):
+        self.app = app
+        self.paths = tuple(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def _detail(self) -> str:
+        return f"Upload exceeds {self.max_bytes} bytes."
+
+    async def _reject(self, scope, receive, send):
+        response = JSONResponse({"detail": self._detail()}, status_code=413)
+        await response(scope, receive, send)
+
+
+# ═══════════════════════════════════════════
+# ═══ SPOOLED UPLOADS ═══
+# ═══════════════════════════════════════════
+
+def file_digest(file, chunk_bytes: int = 1024 * 1024) -> str:
+    """SHA-256 of a spooled upload, read a chunk at a time. Leaves the file at the start."""
+    file.seek(0)
+    digest = hashlib.sha256()
+    while chunk := file.read(chunk_bytes):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def detach_upload(upload: UploadFile) -> UploadFile:
+    """
+    A new UploadFile owning `upload`'s spool file, which the caller must close.
+    FastAPI closes the request's files when the response ends; the original
+    is left holding an empty placeholder so that close() doesn't touch the data.
+    """
+    detached = UploadFile(upload.file, size=upload.size, filename=upload.filename, headers=upload.headers)
+    upload.file = tempfile.SpooledTemporaryFile()
+    return detached
+
+
+# ═══════════════════════════════════════════
+# ═══ WAV SEGMENTING ═══
+# ═══════════════════════════════════════════
+
+@dataclass
+class WavInfo:
+    channels: int
+    sample_width: int
+    frame_rate: int
+    frames: int
+
+    @property
+    def duration_s(self) -> float:
+        return self.frames / self.frame_rate if self.frame_rate else 0.0
+
+
+def read_wav_info(file):
+    """Header of a WAV upload, or None if it isn't a WAV. Leaves the file at the start."""
+    try:
+        with wave.open(file, "rb") as reader:
+            return WavInfo(reader.getnchannels(), reader.getsampwidth(),
+                           reader.getframerate(), reader.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    finally:
+        file.seek(0)
+
+
+def wav_bytes(info: WavInfo, frames: bytes) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as out:
+        out.setnchannels(info.channels)
+        out.setsampwidth(info.sample_width)
+        out.setframerate(info.frame_rate)
+        out.writeframes(frames)
+    return buf.getvalue()
+
+
+class WavSegmenter:
+    """
+    Reads a WAV file segment by segment. next_segment() blocks on file I/O,
+    so call it via asyncio.to_thread; it returns WAV bytes, or None at the end.
+    """
+
+    def __init__(self, file, segment_s: float = 25.0, search_s: float = 1.0):
+        self._reader = wave.open(file, "rb")
+        self.info = WavInfo(self._reader.getnchannels(), self._reader.getsampwidth(),
+                            self._reader.getframerate(), self._reader.getnframes())
+        self._frame_bytes = self.info.channels * self.info.sample_width
+        self._segment_frames = max(1, int(segment_s * self.info.frame_rate))
+        self._search_frames = int(search_s * self.info.frame_rate)
+        self._carry = b""
+
+    def next_segment(self):
+        wanted = self._segment_frames + self._search_frames
+        carried = len(self._carry) // self._frame_bytes
+        frames = self._carry + self._reader.readframes(wanted - carried)
+        if not frames:
+            return None
+        if len(frames) < wanted * self._frame_bytes:
+            # last segment
+            self._carry = b""
+            return wav_bytes(self.info, frames)
+
+        cut = self._quietest_cut(frames) * self._frame_bytes
+        self._carry = frames[cut:]
+        return wav_bytes(self.info, frames[:cut])
+
+    def _quietest_cut(self, frames: bytes) -> int:
+        """Frame index of the lowest-energy window within search_s of the nominal boundary."""
+        if self.info.sample_width != 2 or not self._search_frames:
+            return self._segment_frames
+        samples = array.array("h", frames)
+        if sys.byteorder == "big":
+            samples.byteswap()
+        channels = self.info.channels
+        window = max(1, int(WINDOW_S * self.info.frame_rate))
+        start = self._segment_frames - self._search_frames
+        end = self._segment_frames + self._search_frames - window
+
+        best, best_energy = self._segment_frames, None
+        for offset in range(start, end + 1, window):
+            energy = sum(s * s for s in samples[offset * channels:(offset + window) * channels:channels])
+            if best_energy is None or energy < best_energy:
+                best, best_energy = offset + window // 2, energy
+        return best
+
+    def close(self):
+        self._reader.close()
+
+
+async def transcribe_segments(segmenter: WavSegmenter, transcribe, concurrency: int = 4):
+    """
+    await transcribe(index, wav_bytes) -> (transcript, language_code) for every
+    segment, at most `concurrency` at once; segments are only read from the
+    file when a slot is free. Returns (stitched transcript, majority language).
+    """
+    slots = asyncio.Semaphore(concurrency)
+    tasks = []
+
+    async def run(index: int, segment: bytes):
+        try:
+            return await transcribe(index, segment)
+        finally:
+            slots.release()
+
+    try:
+        while True:
+            await slots.acquire()
+            segment = await asyncio.to_thread(segmenter.next_segment)
+            if segment is None:
+                slots.release()
+                break
+            tasks.append(asyncio.create_task(run(len(tasks), segment)))
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    transcript = " ".join(text.strip() for text, _ in results if text and text.strip())
+    languages = Counter(lang for text, lang in results if lang and text and text.strip())
+    return transcript, (languages.most_common(1)[0][0] if languages else None)
@@ -0,0 +1,108 @@
+"""
+Wire protocol for /ws/conversation.
+
+Two framings share one endpoint:
+
+* text (default, original protocol) — every message is JSON; audio travels as
+  base64 inside it: {"type": "audio", "audio": "<base64 pcm>"} upstream and
+  "audio_base64" fields downstream.
+* binary — negotiated by offering the "mindwell.binary.v1" WebSocket
+  subprotocol. Upstream audio is raw 16 kHz PCM s16le in binary frames;
+  control messages stay JSON text frames. Downstream, a JSON message that
+  carries audio has "audio_base64" replaced by "audio_bytes": <n> and is
+  followed immediately by one binary frame holding those n bytes.
+
+Compressed reply audio (?audio=opus|mp3, see audio_codec.py) is delivered as
+a stream so playback can start before the whole clip has arrived: the reply
+message carries "audio_stream": <id> and "audio_mime" instead of audio, then
+{"type": "audio_chunk", "audio_stream", "index", ...audio} messages follow —
+framed like any other audio under either protocol — and finally
+{"type": "audio_end", "audio_stream", "chunks"}.
+"""
+import json
+import base64
+import asyncio
+import itertools
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+BINARY_SUBPROTOCOL = "mindwell.binary.v1"
+
+
+class ClientConnection:
+    """A /ws/conversation client, speaking whichever protocol it negotiated."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.binary = BINARY_SUBPROTOCOL in websocket.scope.get("subprotocols", [])
+        # Header + binary frame pairs must not interleave with other sends.
+        self._send_lock = asyncio.Lock()
+        self._stream_ids = itertools.count(1)
+
+    async def accept(self):
+        await self.websocket.accept(subprotocol=BINARY_SUBPROTOCOL if self.binary else None)
+
+    async def receive(self):
+        """
+        Next client message as (type, payload).
+        Audio arrives as ("audio", pcm_bytes) under either protocol (see
+        audio_ingest.py for what happens to it next); control messages as
+        (type, dict). Raises WebSocketDisconnect when the client goes away.
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        if message.get("bytes") is not None:
+            return "audio", message["bytes"]
+
+        msg = json.loads(message["text"])
+        if msg.get("type") == "audio":
+            return "audio", base64.b64decode(msg.get("audio") or "")
+        return msg.get("type"), msg
+
+    async def send(self, msg: dict):
+        """JSON control message."""
+        async with self._send_lock:
+            await self.websocket.send_json(msg)
+
+    async def send_audio(self, msg: dict):
+        """
+        Message that may carry msg["audio_base64"]. In binary mode the audio is
+        sent as a raw binary frame right after its JSON header.
+        """
+        audio_base64 = msg.get("audio_base64")
+        if not self.binary or not audio_base64:
+            await self.send(msg)
+            return
+
+        audio = base64.b64decode(audio_base64)
+        header = {k: v for k, v in msg.items() if k != "audio_base64"}
+        header["audio_bytes"] = len(audio)
+        # Shielded so a cancelled turn (barge-in) never leaves a header
+        # without its frame; the client pairs them positionally.
+        await asyncio.shield(self._send_pair(header, audio))
+
+    async def send_audio_stream(self, msg: dict, audio: bytes, mime: str, chunk_bytes: int):
+        """Send msg (without its audio), then the audio in chunk_bytes pieces."""
+        stream_id = next(self._stream_ids)
+        header = {k: v for k, v in msg.items() if k != "audio_base64"}
+        header.update(audio_base64=None, audio_stream=stream_id, audio_mime=mime)
+        await self.send(header)
+
+        chunks = [audio[i:i + chunk_bytes] for i in range(0, len(audio), chunk_bytes)]
+        for index, chunk in enumerate(chunks):
+            chunk_header = {"type": "audio_chunk", "audio_stream": stream_id, "index": index}
+            if self.binary:
+                chunk_header["audio_bytes"] = len(chunk)
+                await asyncio.shield(self._send_pair(chunk_header, chunk))
+            else:
+                chunk_header["audio_base64"] = base64.b64encode(chunk).decode("ascii")
+                await self.send(chunk_header)
+        await self.send({"type": "audio_end", "audio_stream": stream_id, "chunks": len(chunks)})
+
+    async def _send_pair(self, header: dict, audio: bytes):
+        async with self._send_lock:
+            await self.websocket.send_json(header)
+            await self.websocket.send_bytes(audio)
@@ -2,10 +2,21 @@ import React, { useState, useRef, useEffect, useCallback } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 
 // ─── Constants ───
-const WS_URL = 'ws://localhost:8000/ws/conversation';
+const WS_URL = 'ws://localhost:8000/ws/conversation?stream=1';
 const SAMPLE_RATE = 16000;
 const BUFFER_SIZE = 4096;
+const BINARY_SUBPROTOCOL = 'mindwell.binary.v1'; // raw PCM / audio in binary frames
 const AUTO_RESUME_DELAY_MS = 600; // Delay after AI speaks before resuming mic stream
+const AUDIO_BITRATE_KBPS = 24;    // requested reply bitrate for Opus / MP3
+
+// Compressed reply audio is streamed into a MediaSource, so ask for whichever
+// codec this browser can append; otherwise keep the original WAV replies.
+const preferredAudioFormat = () => {
+  const MediaSource = window.MediaSource;
+  if (MediaSource?.isTypeSupported('audio/webm; codecs="opus"')) return 'opus';
+  if (MediaSource?.isTypeSupported('audio/mpeg')) return 'mp3';
+  return 'wav';
+};
 
 // ─── Animated Orb Component ───
 const VoiceOrb = ({ state = 'idle', volume = 0 }) => {
@@ -161,8 +172,13 @@ export default function Conversation({
   const volumeIntervalRef = useRef(null);
   const chatEndRef = useRef(null);
   const audioRef = useRef(null);
+  const audioQueueRef = useRef([]);   // Pending response audio URLs, played in order
+  const pendingHeaderRef = useRef(null); // JSON header waiting for its binary audio frame
+  const audioStreamsRef = useRef(new Map()); // audio_stream id -> chunked reply being received
   const isSpeakingRef = useRef(false);
+  const crisisPlayingRef = useRef(false); // safety message queued or playing; barge-in leaves it be
   const isStreamingRef = useRef(false);
+  const resumeTokenRef = useRef(null); // server session to continue on reconnect
 
   // Auto-scroll
   useEffect(() => {
@@ -189,13 +205,18 @@ export default function Conversation({
           ? 'idle'
           : 'idle';
 
-  // ─── Float32 PCM → Int16 PCM → Base64 ───
-  const float32ToBase64PCM = useCallback((float32Array) => {
+  // ─── Float32 PCM → Int16 PCM ───
+  const float32ToInt16PCM = useCallback((float32Array) => {
     const int16 = new Int16Array(float32Array.length);
     for (let i = 0; i < float32Array.length; i++) {
       const s = Math.max(-1, Math.min(1, float32Array[i]));
       int16[i] = s < 0 ? s * 0x8000 : s * 0x7FFF;
     }
+    return int16;
+  }, []);
+
+  // ─── Int16 PCM → Base64 (JSON protocol fallback) ───
+  const int16ToBase64 = useCallback((int16) => {
     const bytes = new Uint8Array(int16.buffer);
     let binary = '';
     for (let i = 0; i < bytes.length; i++) {
@@ -233,8 +254,11 @@ export default function Conversation({
       });
       streamRef.current = stream;
 
-      // 2. Open WebSocket to backend
-      const ws = new WebSocket(WS_URL);
+      // 2. Open WebSocket to backend (offer the binary audio protocol)
+      const audioQuery = `&audio=${preferredAudioFormat()}&bitrate=${AUDIO_BITRATE_KBPS}`;
+      const resumeQuery = resumeTokenRef.current ? `&resume=${encodeURIComponent(resumeTokenRef.current)}` : '';
+      const ws = new WebSocket(WS_URL + audioQuery + resumeQuery, [BINARY_SUBPROTOCOL]);
+      ws.binaryType = 'arraybuffer';
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -249,7 +273,23 @@ export default function Conversation({
       };
 
       ws.onmessage = (event) => {
+        if (event.data instanceof ArrayBuffer) {
+          // Binary audio frame: belongs to the header received just before it
+          const header = pendingHeaderRef.current;
+          pendingHeaderRef.current = null;
+          if (header?.type === 'audio_chunk') {
+            handleServerMessage({ ...header, audio_data: event.data });
+          } else if (header) {
+            handleServerMessage({ ...header, audio_url: audioBytesToUrl(event.data) });
+          }
+          return;
+        }
+
         const data = JSON.parse(event.data);
+        if (data.audio_bytes) {
+          pendingHeaderRef.current = data;
+          return;
+        }
         handleServerMessage(data);
       };
 
@@ -264,7 +304,8 @@ export default function Conversation({
         if (isStreamingRef.current) {
           setIsStreaming(false);
           isStreamingRef.current = false;
-          setStatusText('Connection closed');
+          // 1013 = Try Again Later: the gateway is at capacity
+          setStatusText(event.code === 1013 ? 'Server busy, please try again shortly' : 'Connection closed');
         }
       };
 
@@ -303,27 +344,40 @@ export default function Conversation({
 
     processor.onaudioprocess = (e) => {
       if (ws.readyState !== WebSocket.OPEN) return;
-      if (isSpeakingRef.current) return; // Don't send audio while AI is speaking
+      // Keep streaming while MindWell speaks (echo cancellation is on), so
+      // the backend's VAD can hear the user talk over it and barge in.
 
       const inputData = e.inputBuffer.getChannelData(0);
       const downsampled = downsample(inputData, audioContext.sampleRate, SAMPLE_RATE);
-      const base64Audio = float32ToBase64PCM(downsampled);
-
-      ws.send(JSON.stringify({
-        type: 'audio',
-        audio: base64Audio,
-      }));
+      const pcm = float32ToInt16PCM(downsampled);
+
+      if (ws.protocol === BINARY_SUBPROTOCOL) {
+        ws.send(pcm.buffer);
+      } else {
+        ws.send(JSON.stringify({
+          type: 'audio',
+          audio: int16ToBase64(pcm),
+        }));
+      }
     };
 
     source.connect(processor);
     processor.connect(audioContext.destination); // Required for processor to work
-  }, [downsample, float32ToBase64PCM]);
+  }, [downsample, float32ToInt16PCM, int16ToBase64]);
 
   // ─── Handle Messages from Backend WebSocket ───
   const handleServerMessage = useCallback((data) => {
     switch (data.type) {
+      case 'session':
+        // Reconnecting with this token continues the same conversation
+        resumeTokenRef.current = data.resume_token;
+        console.log(`[Session] ${data.resumed ? `Resumed (${data.turns} turns)` : 'New'}`);
+        break;
+
       case 'speech_start':
         console.log('[VAD] Speech started');
+        // barge-in: the user is talking over the reply (never over the crisis message)
+        if (!crisisPlayingRef.current) stopPlayback();
         setIsSpeechActive(true);
         setStatusText('Listening...');
         break;
@@ -342,6 +396,18 @@ export default function Conversation({
         setMessages(prev => [...prev, { sender: 'user', text: data.transcript }]);
         break;
 
+      case 'ack':
+        // Short acknowledgment while a slow reply is prepared; the reply is queued behind it
+        playResponseAudio(data);
+        break;
+
+      case 'response_chunk':
+        // Streamed reply: play each sentence as soon as it arrives
+        setIsProcessing(false);
+        if (setParentProcessing) setParentProcessing(false);
+        playResponseAudio(data);
+        break;
+
       case 'response':
         console.log('[Response] AI:', data.spoken_response?.substring(0, 60));
         setIsProcessing(false);
@@ -355,9 +421,23 @@ export default function Conversation({
         if (data.detected_language) setDetectedLanguage(data.detected_language);
 
         // Play audio
-        if (data.audio_base64) {
-          playAudioResponse(data.audio_base64);
-        }
+        playResponseAudio(data);
+        break;
+
+      case 'audio_chunk':
+        appendAudioChunk(data);
+        break;
+
+      case 'audio_end':
+        endAudioStream(data);
+        break;
+
+      case 'interrupted':
+        // Backend cancelled the turn; drop whatever audio is still queued
+        console.log('[Interrupted]', data.reason, 'after', data.delivered_chunks, 'chunks');
+        if (!crisisPlayingRef.current) stopPlayback();
+        setIsProcessing(false);
+        if (setParentProcessing) setParentProcessing(false);
         break;
 
       case 'ready':
@@ -380,32 +460,126 @@ export default function Conversation({
   }, [setParentProcessing]);
 
   // ─── Play Audio Response ───
-  const playAudioResponse = useCallback((audioBase64) => {
+  // Clips are queued so streamed sentences play back-to-back in order.
+  const audioBytesToUrl = (buffer) => URL.createObjectURL(new Blob([buffer], { type: 'audio/wav' }));
+
+  const finishSpeaking = useCallback(() => {
+    setIsSpeaking(false);
+    isSpeakingRef.current = false;
+    crisisPlayingRef.current = false;
+    setStatusText('Listening... speak naturally');
+  }, []);
+
+  // Drop queued and playing audio (barge-in / interrupt)
+  const stopPlayback = useCallback(() => {
+    audioQueueRef.current.forEach(url => url.startsWith('blob:') && URL.revokeObjectURL(url));
+    audioQueueRef.current = [];
+    pendingHeaderRef.current = null;
+    audioStreamsRef.current.clear();
+    if (audioRef.current) {
+      try { audioRef.current.pause(); } catch (e) {}
+      if (audioRef.current.src.startsWith('blob:')) URL.revokeObjectURL(audioRef.current.src);
+      audioRef.current = null;
+      finishSpeaking();
+    }
+  }, [finishSpeaking]);
+
+  const playNextInQueue = useCallback(() => {
+    if (audioRef.current?.src.startsWith('blob:')) {
+      URL.revokeObjectURL(audioRef.current.src);
+    }
+
+    const next = audioQueueRef.current.shift();
+    if (!next) {
+      audioRef.current = null;
+      finishSpeaking();
+      return;
+    }
+
+    const audio = new Audio(next);
+    audioRef.current = audio;
+
+    audio.onended = () => playNextInQueue();
+    audio.onerror = () => playNextInQueue();
+    audio.play().catch(() => playNextInQueue());
+  }, [finishSpeaking]);
+
+  const playAudioResponse = useCallback((url) => {
     setIsSpeaking(true);
     isSpeakingRef.current = true;
     setStatusText('MindWell is speaking...');
 
-    const audio = new Audio(`data:audio/wav;base64,${audioBase64}`);
-    audioRef.current = audio;
+    audioQueueRef.current.push(url);
+    if (!audioRef.current) {
+      playNextInQueue();
+    }
+  }, [playNextInQueue]);
+
+  // ─── Chunked (Opus / MP3) replies ───
+  // The reply header opens a MediaSource that is queued like any other clip;
+  // audio_chunk messages are appended as they arrive, so playback starts
+  // before the last chunk lands. Without MediaSource support the chunks are
+  // collected and played as one blob at audio_end.
+  const flushAudioStream = (stream) => {
+    const buffer = stream.sourceBuffer;
+    if (!buffer || buffer.updating || stream.mediaSource.readyState !== 'open') return;
+    if (stream.chunks.length) {
+      buffer.appendBuffer(stream.chunks.shift());
+    } else if (stream.ended) {
+      stream.mediaSource.endOfStream();
+    }
+  };
 
-    audio.onended = () => {
-      setIsSpeaking(false);
-      isSpeakingRef.current = false;
-      setStatusText('Listening... speak naturally');
-    };
+  const openAudioStream = useCallback((data) => {
+    const stream = { mime: data.audio_mime, chunks: [], ended: false, mediaSource: null, sourceBuffer: null };
+    audioStreamsRef.current.set(data.audio_stream, stream);
+    if (!window.MediaSource?.isTypeSupported(data.audio_mime)) return;
+
+    const mediaSource = new MediaSource();
+    stream.mediaSource = mediaSource;
+    mediaSource.addEventListener('sourceopen', () => {
+      stream.sourceBuffer = mediaSource.addSourceBuffer(data.audio_mime);
+      stream.sourceBuffer.addEventListener('updateend', () => flushAudioStream(stream));
+      flushAudioStream(stream);
+    }, { once: true });
+    playAudioResponse(URL.createObjectURL(mediaSource));
+  }, [playAudioResponse]);
+
+  const base64ToBytes = (b64) => Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+
+  const appendAudioChunk = useCallback((data) => {
+    const stream = audioStreamsRef.current.get(data.audio_stream);
+    if (!stream) return; // dropped by barge-in
+    stream.chunks.push(data.audio_data ?? base64ToBytes(data.audio_base64));
+    if (stream.mediaSource) flushAudioStream(stream);
+  }, []);
 
-    audio.onerror = () => {
-      setIsSpeaking(false);
-      isSpeakingRef.current = false;
-      setStatusText('Listening... speak naturally');
-    };
+  const endAudioStream = useCallback((data) => {
+    const stream = audioStreamsRef.current.get(data.audio_stream);
+    if (!stream) return;
+    audioStreamsRef.current.delete(data.audio_stream);
+    stream.ended = true;
+    if (stream.mediaSource) {
+      flushAudioStream(stream);
+    } else {
+      playAudioResponse(URL.createObjectURL(new Blob(stream.chunks, { type: stream.mime })));
+    }
+  }, [playAudioResponse]);
 
-    audio.play().catch(() => {
-      setIsSpeaking(false);
-      isSpeakingRef.current = false;
-      setStatusText('Listening... speak naturally');
-    });
-  }, []);
+  // Audio arrives as a binary frame (audio_url), inline base64 (JSON protocol),
+  // or as a chunked stream (audio_stream)
+  const playResponseAudio = useCallback((data) => {
+    if (data.crisis && (data.audio_stream || data.audio_url || data.audio_base64)) {
+      crisisPlayingRef.current = true;
+    }
+    if (data.audio_stream) {
+      openAudioStream(data);
+    } else if (data.audio_url) {
+      playAudioResponse(data.audio_url);
+    } else if (data.audio_base64) {
+      playAudioResponse(`data:audio/wav;base64,${data.audio_base64}`);
+    }
+  }, [playAudioResponse, openAudioStream]);
 
   // ─── Stop Conversation ───
   const stopConversation = useCallback(() => {
@@ -436,6 +610,10 @@ export default function Conversation({
     }
 
     // Stop any playing audio
+    audioQueueRef.current = [];
+    pendingHeaderRef.current = null;
+    audioStreamsRef.current.clear();
+    crisisPlayingRef.current = false;
     if (audioRef.current) {
       try { audioRef.current.pause(); } catch (e) {}
       audioRef.current = null;
@@ -463,13 +641,23 @@ export default function Conversation({
   }, []);
 
   // ─── Toggle ───
+  // Cut MindWell off mid-reply; the backend answers with 'interrupted'
+  const interruptResponse = useCallback(() => {
+    stopPlayback();
+    if (wsRef.current?.readyState === WebSocket.OPEN) {
+      wsRef.current.send(JSON.stringify({ type: 'interrupt' }));
+    }
+  }, [stopPlayback]);
+
   const toggleConversation = useCallback(() => {
-    if (isStreaming) {
+    if (isStreaming && (isProcessing || isSpeaking)) {
+      interruptResponse();
+    } else if (isStreaming) {
       stopConversation();
     } else {
       startConversation();
     }
-  }, [isStreaming, startConversation, stopConversation]);
+  }, [isStreaming, isProcessing, isSpeaking, interruptResponse, startConversation, stopConversation]);
 
   return (
     <div className="flex flex-col items-center w-full max-w-2xl mx-auto h-full">
@@ -594,15 +782,15 @@ export default function Conversation({
       <motion.button
         className={`mic-btn ${isStreaming ? 'recording' : ''}`}
         onClick={toggleConversation}
-        disabled={isProcessing || isSpeaking}
-        whileHover={{ scale: isProcessing || isSpeaking ? 1 : 1.08 }}
-        whileTap={{ scale: isProcessing || isSpeaking ? 1 : 0.92 }}
+        whileHover={{ scale: 1.08 }}
+        whileTap={{ scale: 0.92 }}
       >
         {isStreaming ? <StopIcon /> : <MicIcon />}
       </motion.button>
 
       <motion.span className="mt-3 text-[10px] tracking-widest text-white/15 uppercase">
-        {isStreaming ? 'Tap to end conversation' : 'Tap to start'}
+        {!isStreaming ? 'Tap to start'
+          : isProcessing || isSpeaking ? 'Tap to interrupt' : 'Tap to end conversation'}
       </motion.span>
 
       {/* ─── Error ─── */}
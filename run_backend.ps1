@@ -39,6 +39,10 @@ if (Test-Path $envFile) {
             $env:GEMINI_API_KEY = $matches[1]
             Write-Host "🔑 Found GEMINI_API_KEY!" -ForegroundColor Green
         }
+        if ($_ -match "SARVAM_API_KEY=(.*)") {
+            $env:SARVAM_API_KEY = $matches[1]
+            Write-Host "🔑 Found SARVAM_API_KEY!" -ForegroundColor Green
+        }
     }
 } else {
      Write-Host "⚠️ No .env file found in cloud-functions. Gemini API might fail." -ForegroundColor Yellow
@@ -46,6 +50,6 @@ if (Test-Path $envFile) {
 
 # 6. Run the function
 Write-Host "✅ Setup Complete!" -ForegroundColor Green
-Write-Host "Starting 'submit_screening_report' on http://localhost:8080..." -ForegroundColor Yellow
-Write-Host "To test other functions, change --target in this script."
-functions-framework --target=submit_screening_report --debug --port=8080
+Write-Host "Starting the MindWell gateway on http://localhost:8000..." -ForegroundColor Yellow
+Write-Host "Set `$env:PROVIDERS = 'fake' first to run without Gemini/Sarvam keys."
+uvicorn main:app --reload --port 8000
@@ -1,28 +1,63 @@
-import requests
+import io
+import sys
 import json
+import wave
+import requests
+
+# URL of your local backend (uvicorn main:app --port 8000, or run_backend.ps1)
+url = "http://localhost:8000/api/v1/voice-turn"
+
 
-# URL of your local backend (running from run_backend.ps1)
-url = "http://localhost:8080/submit_screening_report"
+def silent_wav() -> bytes:
+    """One second of silence — enough to exercise the pipeline end to end."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(b"\x00\x00" * 16000)
+    return buf.getvalue()
 
-# Fake data to simulate the Agent
-payload = {
-    "risk_score": 8,
-    "summary": "The patient feels extremely overwhelmed by exams and has stopped sleeping for two days."
-}
+
+# Pass a recording to test real speech: python test_backend.py hello.wav
+# Without one, a silent clip is sent. Against live Sarvam that returns
+# 400 "Could not transcribe audio"; with PROVIDERS=fake it returns a full turn.
+if len(sys.argv) > 1:
+    with open(sys.argv[1], "rb") as f:
+        audio = (sys.argv[1], f.read(), "audio/wav")
+else:
+    audio = ("silence.wav", silent_wav(), "audio/wav")
+
+chat_history = [
+    {"sender": "user", "text": "Exams are next week and I can't sleep."},
+    {"sender": "ai", "text": "That sounds exhausting. What keeps you up at night?"},
+]
 
 try:
-    print(f"📡 Sending test data to {url}...")
-    response = requests.post(url, json=payload)
-    
+    print(f"📡 Sending a voice turn to {url}...")
+    response = requests.post(
+        url,
+        files={"audio": audio},
+        data={"chat_history": json.dumps(chat_history), "voice_id": "ritu"},
+        timeout=60,
+    )
+
     print(f"Status Code: {response.status_code}")
-    print("Response Body:", response.json())
-    
+    body = response.json()
+
     if response.status_code == 200:
+        print(f"Transcript: {body['user_transcript']}")
+        print(f"AI Response: {body['spoken_response']}")
+        print(f"Telemetry: {json.dumps(body['telemetry'], indent=2)}")
+        print(f"Audio: {len(body['audio_base64'] or '')} base64 chars")
         print("\n✅ SUCCESS! Backend is working.")
-        print("👉 NOW CHECK FIRESTORE: You should see this record in your database.")
+    elif response.status_code == 400:
+        print(f"Response Body: {body}")
+        print("\n✅ Backend is up (no speech found in the clip — pass a recording to test a full turn).")
     else:
+        print("Response Body:", body)
         print("\n❌ FAILURE. The backend rejected the request.")
 
 except Exception as e:
     print(f"\n❌ CONNECTION ERROR: {e}")
-    print("Is your backend running? Did you run 'run_backend.ps1'?")
\ No newline at end of file
+    print("Is your backend running? Did you run 'run_backend.ps1'?")